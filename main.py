@@ -1,27 +1,39 @@
 import connexion
 from flask import request, Response
-import json
 from datetime import datetime
 
 from src.logics.balance_service import BalanceService
 from src.core.prototype import Prototype
 from src.dtos.filter_dto import FilterDto
+from src.models.period_type import PeriodType
 from src.start_service import StartService
 from src.logics.factory_entities import FactoryEntities
 from src.models.settings import Settings
 from src.core.common import common
-from src.core.validator import Validator, ArgumentException
+from src.core.validator import Validator, ArgumentException, OperationException
 from src.logics.turnover_report_service import TurnoverReportService
 from src.logics.export_service import ExportService
+from src.logics.import_service import ImportService
 from src.settings_manager import SettingsManager
 import os
+import sys
 from src.logics.reference_service import ReferenceService
+from src.logics.transaction_service import TransactionService
+from src.logics.current_balance_service import CurrentBalanceService
+from src.logics.daily_rollup_service import DailyRollupService
+from src.logics.transaction_index import TransactionIndex
+from src.logics.group_rollup import GroupRollup
+from src.logics.convert_factory import ConvertFactory
+from src.logics.json_encoder import JsonEncoder
+from src.models.reference_mode import ReferenceMode
 
 app = connexion.FlaskApp(__name__)
 
 # Инициализация сервисов
 start_service = StartService()
 reference_service = ReferenceService(start_service)
+import_service = ImportService(start_service)
+data_file_path = "data/data.json"
 
 # Загрузка настроек
 settings_manager = None
@@ -29,21 +41,35 @@ try:
     settings_manager = SettingsManager("settings.json")
     settings_manager.load()
     settings = settings_manager.settings
-    
-    # Если первый старт, инициализируем данные
-    if settings.first_start:
-        start_service.start()
-        settings.first_start = False
 except Exception as e:
     settings = Settings()
+
+# Если первый старт, инициализируем данные, иначе восстанавливаем сохраненные.
+# Ошибка в файле данных не отменяет загруженные настройки - о ней сообщается,
+# и сервис стартует со стартовыми данными
+if settings.first_start or not os.path.exists(data_file_path):
     start_service.start()
+    settings.first_start = False
+else:
+    try:
+        import_service.import_all_data(data_file_path)
+    except (ArgumentException, OperationException) as e:
+        print(f"Не удалось загрузить данные из {data_file_path}: {e}", file=sys.stderr)
+        start_service.start()
 
 factory = FactoryEntities(settings)
+convert_factory = ConvertFactory()
+json_encoder = JsonEncoder()
 
 # Инициализация сервисов
-turnover_service = TurnoverReportService(start_service)
+# Дневные итоги и индекс транзакций создаются один раз и передаются отчетам
+daily_rollup_service = DailyRollupService(start_service)
+transaction_index = TransactionIndex(start_service)
+turnover_service = TurnoverReportService(start_service, daily_rollup_service, transaction_index)
 export_service = ExportService(start_service)
-balance_service = BalanceService(start_service, settings_manager)
+balance_service = BalanceService(start_service, settings_manager, daily_rollup_service)
+transaction_service = TransactionService(start_service)
+current_balance_service = CurrentBalanceService(start_service)
 
 """
 Проверить доступность REST API
@@ -64,10 +90,23 @@ def get_models():
 
 """
 Получить данные в указанном формате
+Параметры в строке запроса: fields (опционально, через запятую),
+reference (опционально: id, name, full - вывод ссылок на другие модели),
+expand (опционально: глубина раскрытия ссылок - связанные модели выводятся
+один раз в таблице references по id), envelope (опционально: true - ответ
+в обертке {"result": ...}; включается автоматически вместе с expand),
+align (опционально, для markdown: true - колонки выровнены по ширине).
+Без обертки CSV, XML и Markdown выдаются по частям со своим Content-Type
 """
 @app.route("/api/data/<model_type>/<format_type>", methods=['GET'])
 def get_data(model_type: str, format_type: str):
     try:
+        fields_str = request.args.get('fields')
+        reference_str = request.args.get('reference')
+        expand_str = request.args.get('expand')
+        envelope = request.args.get('envelope', '').lower() in ("1", "true", "yes")
+        align = request.args.get('align', '').lower() in ("1", "true", "yes")
+        
         # Получаем данные в зависимости от типа модели
         data_map = {
             "units": list(start_service.units_measure.values()),
@@ -85,25 +124,67 @@ def get_data(model_type: str, format_type: str):
         
         # Создаем форматтер
         format_map = {
-            "csv": "CSV",
-            "markdown": "Markdown", 
-            "json": "Json",
-            "xml": "XML"
+            "csv": ("CSV", "text/csv; charset=utf-8"),
+            "markdown": ("Markdown", "text/markdown; charset=utf-8"),
+            "json": ("Json", "application/json"),
+            "xml": ("XML", "application/xml; charset=utf-8")
         }
         
         if format_type not in format_map:
             return {"error": f"Неизвестный формат: {format_type}"}, 400
         
-        formatter = factory.create(format_map[format_type])
-        result = formatter.build(format_type, data)
+        try:
+            expand_depth = int(expand_str) if expand_str else None
+        except ValueError:
+            return {"error": "Глубина раскрытия ссылок должна быть целым числом"}, 400
+        
+        # Таблица связанных моделей строится по исходным моделям до сериализации строк
+        references = convert_factory.expand(data, expand_depth) if expand_depth else None
+        
+        # Набор полей и режим ссылок применяются до сериализации -
+        # исключенные поля не читаются и не конвертируются
+        if fields_str or reference_str:
+            try:
+                reference_mode = ReferenceMode[reference_str.upper()] if reference_str else ReferenceMode.ID
+            except KeyError:
+                return {"error": "Неверный режим ссылок. Допустимые значения: id, name, full"}, 400
+            
+            fields = [field.strip() for field in fields_str.split(",")] if fields_str else None
+            data = [convert_factory.convert(item, fields, reference_mode) for item in data]
+        
+        formatter_name, content_type = format_map[format_type]
+        formatter = factory.create(formatter_name)
+        if align and format_type == "markdown":
+            formatter.align = True
+        
+        # Обертка по запросу - результат форматтера кладется строкой в JSON
+        if envelope or references is not None:
+            response = {"result": formatter.build(format_type, data)}
+            if references is not None:
+                response["references"] = references
+            
+            return Response(
+                status=200,
+                response=json_encoder.encode(response),
+                content_type="application/json"
+            )
+        
+        if format_type == "json":
+            return Response(
+                status=200,
+                response=json_encoder.encode(formatter.build(format_type, data) if data else []),
+                content_type=content_type
+            )
         
-        # Возвращаем результат в соответствующем Content-Type
+        # Текстовые форматы отдаются как есть, без повторного кодирования в JSON
         return Response(
+            formatter.stream_chunks(format_type, data),
             status=200,
-            response=json.dumps({"result": result}),
-            content_type="application/json"
+            content_type=content_type
         )
         
+    except ArgumentException as e:
+        return {"error": str(e)}, 400
     except Exception as e:
         return {"error": str(e)}, 500
 
@@ -123,7 +204,7 @@ def get_recipes():
         
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "count": len(recipes),
                 "recipes": result
@@ -134,7 +215,7 @@ def get_recipes():
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -158,7 +239,7 @@ def get_recipe(recipe_id: str):
         if not recipe:
             return Response(
                 status=404,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": f"Рецепт с ID '{recipe_id}' не найден"
                 }),
@@ -172,7 +253,7 @@ def get_recipe(recipe_id: str):
         
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "recipe": result
             }),
@@ -182,7 +263,7 @@ def get_recipe(recipe_id: str):
     except ArgumentException as e:
         return Response(
             status=400,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -191,7 +272,7 @@ def get_recipe(recipe_id: str):
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -200,7 +281,10 @@ def get_recipe(recipe_id: str):
 
 """
 GET Отчет - Оборотно-сальдовая ведомость
-Параметры в строке запроса: start_date, end_date, storage_id (опционально)
+Параметры в строке запроса: start_date, end_date, storage_id (опционально), unit_id (опционально),
+granularity (опционально: day, week, month - разбивка по периодам),
+groups (опционально: true - итоги по иерархии групп номенклатуры),
+fields (опционально, через запятую), reference (опционально: id, name, full; по умолчанию full)
 """
 @app.route("/api/reports/turnover", methods=['GET'])
 def get_turnover_report():
@@ -209,12 +293,17 @@ def get_turnover_report():
         start_date_str = request.args.get('start_date')
         end_date_str = request.args.get('end_date')
         storage_id = request.args.get('storage_id')
+        unit_id = request.args.get('unit_id')
+        granularity_str = request.args.get('granularity')
+        with_groups = request.args.get('groups', 'false').lower() == 'true'
+        fields_str = request.args.get('fields')
+        reference_str = request.args.get('reference')
         
         # Валидация обязательных параметров
         if not start_date_str or not end_date_str:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Обязательные параметры: start_date, end_date"
                 }),
@@ -228,7 +317,7 @@ def get_turnover_report():
         except ValueError:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
                 }),
@@ -246,34 +335,230 @@ def get_turnover_report():
             if not storage:
                 return Response(
                     status=404,
-                    response=json.dumps({
+                    response=json_encoder.encode({
                         "success": False,
                         "error": f"Склад с ID '{storage_id}' не найден"
                     }),
                     content_type="application/json"
                 )
         
+        # Поиск единицы вывода если указана
+        unit = None
+        if unit_id:
+            unit_list = list(start_service.units_measure.values())
+            unit = next((u for u in unit_list if u.id == unit_id), None)
+            
+            if not unit:
+                return Response(
+                    status=404,
+                    response=json_encoder.encode({
+                        "success": False,
+                        "error": f"Единица измерения с ID '{unit_id}' не найдена"
+                    }),
+                    content_type="application/json"
+                )
+        
+        # Парсинг разбивки по периодам
+        granularity = None
+        if granularity_str:
+            try:
+                granularity = PeriodType[granularity_str.upper()]
+            except KeyError:
+                return Response(
+                    status=400,
+                    response=json_encoder.encode({
+                        "success": False,
+                        "error": "Неверная разбивка. Допустимые значения: day, week, month"
+                    }),
+                    content_type="application/json"
+                )
+        
+        # Набор полей строк и режим вывода ссылок (номенклатура, единица)
+        fields = [field.strip() for field in fields_str.split(",")] if fields_str else None
+        try:
+            reference_mode = ReferenceMode[reference_str.upper()] if reference_str else ReferenceMode.FULL
+        except KeyError:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Неверный режим ссылок. Допустимые значения: id, name, full"
+                }),
+                content_type="application/json"
+            )
+        
         # Генерация отчета
-        report_data = turnover_service.generate_turnover_report(start_date, end_date, storage)
+        report_data = turnover_service.generate_turnover_report(start_date, end_date, storage, unit=unit,
+                                                                granularity=granularity, fields=fields,
+                                                                reference_mode=reference_mode)
+        
+        report = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "storage": storage.name if storage else "Все склады",
+            "granularity": granularity.value if granularity else None,
+            "data": report_data
+        }
+        
+        # Итоги по группам номенклатуры считаются по уже агрегированным строкам
+        if with_groups:
+            nomenclatures = list(start_service.nomenclatures.values())
+            fields = ["opening_balance", "income", "outcome", "closing_balance", "transaction_count"]
+            if granularity:
+                for period in report_data:
+                    period["groups"] = GroupRollup.build(period["data"], nomenclatures, fields, unit)
+            else:
+                report["groups"] = GroupRollup.build(report_data, nomenclatures, fields, unit)
         
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
-                "report": {
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat(),
-                    "storage": storage.name if storage else "Все склады",
-                    "data": report_data
-                }
+                "report": report
+            }),
+            content_type="application/json"
+        )
+        
+    except ArgumentException as e:
+        return Response(
+            status=400,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
             }),
             content_type="application/json"
         )
+
+"""
+GET Отчет - Оборотно-сальдовая ведомость потоком (chunked), для больших ведомостей
+Параметры в строке запроса: start_date, end_date, storage_id (опционально), unit_id (опционально),
+format (опционально: jsonl, csv, xml, markdown; по умолчанию jsonl),
+fields (опционально, через запятую), reference (опционально: id, name, full; по умолчанию full)
+"""
+@app.route("/api/reports/turnover/stream", methods=['GET'])
+def get_turnover_report_stream():
+    try:
+        start_date_str = request.args.get('start_date')
+        end_date_str = request.args.get('end_date')
+        storage_id = request.args.get('storage_id')
+        unit_id = request.args.get('unit_id')
+        format_type = request.args.get('format', 'jsonl')
+        fields_str = request.args.get('fields')
+        reference_str = request.args.get('reference')
+        
+        # Валидация обязательных параметров
+        if not start_date_str or not end_date_str:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Обязательные параметры: start_date, end_date"
+                }),
+                content_type="application/json"
+            )
+        
+        # Парсинг дат
+        try:
+            start_date = datetime.fromisoformat(start_date_str)
+            end_date = datetime.fromisoformat(end_date_str)
+        except ValueError:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
+                }),
+                content_type="application/json"
+            )
+        
+        format_map = {
+            "jsonl": ("JsonLines", "application/x-ndjson"),
+            "csv": ("CSV", "text/csv; charset=utf-8"),
+            "xml": ("XML", "application/xml; charset=utf-8"),
+            "markdown": ("Markdown", "text/markdown; charset=utf-8")
+        }
+        
+        if format_type not in format_map:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": f"Неизвестный формат: {format_type}"
+                }),
+                content_type="application/json"
+            )
+        
+        # Поиск склада если указан
+        storage = None
+        if storage_id:
+            storage_list = list(start_service.storages.values())
+            storage = next((s for s in storage_list if s.id == storage_id), None)
+            
+            if not storage:
+                return Response(
+                    status=404,
+                    response=json_encoder.encode({
+                        "success": False,
+                        "error": f"Склад с ID '{storage_id}' не найден"
+                    }),
+                    content_type="application/json"
+                )
+        
+        # Поиск единицы вывода если указана
+        unit = None
+        if unit_id:
+            unit_list = list(start_service.units_measure.values())
+            unit = next((u for u in unit_list if u.id == unit_id), None)
+            
+            if not unit:
+                return Response(
+                    status=404,
+                    response=json_encoder.encode({
+                        "success": False,
+                        "error": f"Единица измерения с ID '{unit_id}' не найдена"
+                    }),
+                    content_type="application/json"
+                )
+        
+        # Набор полей строк и режим вывода ссылок (номенклатура, единица)
+        fields = [field.strip() for field in fields_str.split(",")] if fields_str else None
+        try:
+            reference_mode = ReferenceMode[reference_str.upper()] if reference_str else ReferenceMode.FULL
+        except KeyError:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Неверный режим ссылок. Допустимые значения: id, name, full"
+                }),
+                content_type="application/json"
+            )
+        
+        # Строки ведомости создаются и отдаются по одной
+        rows = turnover_service.iter_turnover_report(start_date, end_date, storage, unit=unit,
+                                                     fields=fields, reference_mode=reference_mode)
+        formatter_name, content_type = format_map[format_type]
+        formatter = factory.create(formatter_name)
+        
+        return Response(
+            formatter.stream_chunks(format_type, rows),
+            status=200,
+            content_type=content_type
+        )
         
     except ArgumentException as e:
         return Response(
             status=400,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -282,7 +567,7 @@ def get_turnover_report():
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -302,7 +587,7 @@ def export_all_data():
         if not file_path:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Не указан путь к файлу (file_path) в строке запроса"
                 }),
@@ -315,7 +600,7 @@ def export_all_data():
         if success:
             return Response(
                 status=200,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": True,
                     "message": f"Данные успешно экспортированы в файл: {file_path}"
                 }),
@@ -324,7 +609,7 @@ def export_all_data():
         else:
             return Response(
                 status=500,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Ошибка при экспорте данных"
                 }),
@@ -334,7 +619,48 @@ def export_all_data():
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+
+"""
+Загрузить данные из файла экспорта (по умолчанию data/data.json) вместо текущих
+Параметры в строке запроса: file_path (опционально)
+"""
+@app.route("/api/import/data", methods=['POST'])
+def import_all_data():
+    try:
+        file_path = request.args.get('file_path') or data_file_path
+        
+        counts = import_service.import_all_data(file_path)
+        
+        return Response(
+            status=200,
+            response=json_encoder.encode({
+                "success": True,
+                "message": f"Данные успешно загружены из файла: {file_path}",
+                "counts": counts
+            }),
+            content_type="application/json"
+        )
+    
+    except ArgumentException as e:
+        return Response(
+            status=400,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -342,6 +668,11 @@ def export_all_data():
         )
 
 
+"""
+POST - Получить данные в указанном формате с фильтрацией через прототип
+Тело запроса: filters, expand (опционально), envelope (опционально: true - ответ
+в обертке {"success", "count", "result"}; включается автоматически вместе с expand)
+"""
 @app.route("/api/data/<model_type>/<format_type>/filter", methods=['POST'])
 def get_filtered_data(model_type: str, format_type: str):
     try:
@@ -351,7 +682,7 @@ def get_filtered_data(model_type: str, format_type: str):
         if not request_data or 'filters' not in request_data:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Не указаны фильтры в теле запроса"
                 }),
@@ -374,7 +705,7 @@ def get_filtered_data(model_type: str, format_type: str):
         if model_type not in data_map:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": f"Неизвестный тип модели: {model_type}"
                 }),
@@ -389,39 +720,79 @@ def get_filtered_data(model_type: str, format_type: str):
         
         # Создаем форматтер
         format_map = {
-            "csv": "CSV",
-            "markdown": "Markdown", 
-            "json": "Json",
-            "xml": "XML"
+            "csv": ("CSV", "text/csv; charset=utf-8"),
+            "markdown": ("Markdown", "text/markdown; charset=utf-8"),
+            "json": ("Json", "application/json"),
+            "xml": ("XML", "application/xml; charset=utf-8")
         }
         
         if format_type not in format_map:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": f"Неизвестный формат: {format_type}"
                 }),
                 content_type="application/json"
             )
         
-        formatter = factory.create(format_map[format_type])
-        result = formatter.build(format_type, filtered_data)
+        # Глубина раскрытия ссылок (опционально) - связанные модели выводятся таблицей references
+        expand_depth = request_data.get('expand')
+        if expand_depth is not None and (not isinstance(expand_depth, int) or isinstance(expand_depth, bool)):
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Глубина раскрытия ссылок должна быть целым числом"
+                }),
+                content_type="application/json"
+            )
         
-        return Response(
-            status=200,
-            response=json.dumps({
+        formatter_name, content_type = format_map[format_type]
+        formatter = factory.create(formatter_name)
+        
+        if request_data.get('envelope', False) or expand_depth:
+            response = {
                 "success": True,
                 "count": len(filtered_data),
-                "result": result
+                "result": formatter.build(format_type, filtered_data)
+            }
+            if expand_depth:
+                response["references"] = convert_factory.expand(filtered_data, expand_depth)
+            
+            return Response(
+                status=200,
+                response=json_encoder.encode(response),
+                content_type="application/json"
+            )
+        
+        if format_type == "json":
+            return Response(
+                status=200,
+                response=json_encoder.encode(formatter.build(format_type, filtered_data) if filtered_data else []),
+                content_type=content_type
+            )
+        
+        # Текстовые форматы отдаются как есть, без повторного кодирования в JSON
+        return Response(
+            formatter.stream_chunks(format_type, filtered_data),
+            status=200,
+            content_type=content_type
+        )
+        
+    except ArgumentException as e:
+        return Response(
+            status=400,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
             }),
             content_type="application/json"
         )
-        
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -441,7 +812,7 @@ def get_filtered_turnover_report():
         if not request_data:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Не указаны параметры в теле запроса"
                 }),
@@ -458,7 +829,7 @@ def get_filtered_turnover_report():
         if not start_date_str or not end_date_str:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Обязательные параметры: start_date, end_date"
                 }),
@@ -472,7 +843,7 @@ def get_filtered_turnover_report():
         except ValueError:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
                 }),
@@ -490,7 +861,7 @@ def get_filtered_turnover_report():
             if not storage:
                 return Response(
                     status=404,
-                    response=json.dumps({
+                    response=json_encoder.encode({
                         "success": False,
                         "error": f"Склад с ID '{storage_id}' не найден"
                     }),
@@ -505,7 +876,7 @@ def get_filtered_turnover_report():
         
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "report": {
                     "start_date": start_date.isoformat(),
@@ -521,7 +892,7 @@ def get_filtered_turnover_report():
     except ArgumentException as e:
         return Response(
             status=400,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -530,7 +901,7 @@ def get_filtered_turnover_report():
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -539,69 +910,194 @@ def get_filtered_turnover_report():
 
 
 """
-GET - Получить текущую дату блокировки
-"""
-@app.route("/api/settings/blocking-date", methods=['GET'])
-def get_blocking_date():
-    try:
-        blocking_date = settings_manager.settings.blocking_date
-        
-        return Response(
-            status=200,
-            response=json.dumps({
-                "success": True,
-                "blocking_date": blocking_date.isoformat() if blocking_date else None
-            }),
-            content_type="application/json"
-        )
-        
-    except Exception as e:
-        return Response(
-            status=500,
-            response=json.dumps({
-                "success": False,
-                "error": str(e)
-            }),
-            content_type="application/json"
-        )
-
-"""
-POST - Установить дату блокировки
+POST - Сравнительная оборотно-сальдовая ведомость: базовый период против периодов сравнения
+Тело запроса: {"base": {"start_date", "end_date"}, "comparisons": [{"start_date", "end_date"}, ...],
+"storage_id" (опционально), "unit_id" (опционально)}
 """
-@app.route("/api/settings/blocking-date", methods=['POST'])
-def set_blocking_date():
+@app.route("/api/reports/turnover/compare", methods=['POST'])
+def get_comparison_turnover_report():
     try:
         request_data = request.get_json()
         
-        if not request_data or 'blocking_date' not in request_data:
+        if not request_data:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
-                    "error": "Не указана дата блокировки в теле запроса"
+                    "error": "Не указаны параметры в теле запроса"
                 }),
                 content_type="application/json"
             )
         
-        blocking_date_str = request_data['blocking_date']
+        base_data = request_data.get('base')
+        comparisons_data = request_data.get('comparisons')
+        storage_id = request_data.get('storage_id')
+        unit_id = request_data.get('unit_id')
         
-        try:
-            if blocking_date_str:
-                blocking_date = datetime.fromisoformat(blocking_date_str)
-            else:
-                blocking_date = None
-        except ValueError:
+        # Валидация обязательных параметров
+        if not isinstance(base_data, dict) or not isinstance(comparisons_data, list) or not comparisons_data:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
-                    "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
+                    "error": "Обязательные параметры: base, comparisons"
                 }),
                 content_type="application/json"
             )
         
-        # Устанавливаем дату блокировки
-        settings_manager.settings.blocking_date = blocking_date
+        # Парсинг периодов
+        try:
+            base_period = (datetime.fromisoformat(base_data['start_date']),
+                           datetime.fromisoformat(base_data['end_date']))
+            comparison_periods = [
+                (datetime.fromisoformat(period['start_date']), datetime.fromisoformat(period['end_date']))
+                for period in comparisons_data
+            ]
+        except (KeyError, TypeError, ValueError):
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Период задается полями start_date, end_date в ISO формате: YYYY-MM-DDTHH:MM:SS"
+                }),
+                content_type="application/json"
+            )
+        
+        # Поиск склада если указан
+        storage = None
+        if storage_id:
+            storage_list = list(start_service.storages.values())
+            storage = next((s for s in storage_list if s.id == storage_id), None)
+            
+            if not storage:
+                return Response(
+                    status=404,
+                    response=json_encoder.encode({
+                        "success": False,
+                        "error": f"Склад с ID '{storage_id}' не найден"
+                    }),
+                    content_type="application/json"
+                )
+        
+        # Поиск единицы вывода если указана
+        unit = None
+        if unit_id:
+            unit_list = list(start_service.units_measure.values())
+            unit = next((u for u in unit_list if u.id == unit_id), None)
+            
+            if not unit:
+                return Response(
+                    status=404,
+                    response=json_encoder.encode({
+                        "success": False,
+                        "error": f"Единица измерения с ID '{unit_id}' не найдена"
+                    }),
+                    content_type="application/json"
+                )
+        
+        # Все периоды считаются за один проход
+        report_data = turnover_service.generate_comparison_report(base_period, comparison_periods, storage, unit)
+        
+        return Response(
+            status=200,
+            response=json_encoder.encode({
+                "success": True,
+                "report": {
+                    "base": {
+                        "start_date": base_period[0].isoformat(),
+                        "end_date": base_period[1].isoformat()
+                    },
+                    "storage": storage.name if storage else "Все склады",
+                    "data": report_data
+                }
+            }),
+            content_type="application/json"
+        )
+        
+    except ArgumentException as e:
+        return Response(
+            status=400,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+
+"""
+GET - Получить текущую дату блокировки
+"""
+@app.route("/api/settings/blocking-date", methods=['GET'])
+def get_blocking_date():
+    try:
+        blocking_date = settings_manager.settings.blocking_date
+        
+        return Response(
+            status=200,
+            response=json_encoder.encode({
+                "success": True,
+                "blocking_date": blocking_date.isoformat() if blocking_date else None
+            }),
+            content_type="application/json"
+        )
+        
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+"""
+POST - Установить дату блокировки
+"""
+@app.route("/api/settings/blocking-date", methods=['POST'])
+def set_blocking_date():
+    try:
+        request_data = request.get_json()
+        
+        if not request_data or 'blocking_date' not in request_data:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Не указана дата блокировки в теле запроса"
+                }),
+                content_type="application/json"
+            )
+        
+        blocking_date_str = request_data['blocking_date']
+        
+        try:
+            if blocking_date_str:
+                blocking_date = datetime.fromisoformat(blocking_date_str)
+            else:
+                blocking_date = None
+        except ValueError:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
+                }),
+                content_type="application/json"
+            )
+        
+        # Устанавливаем дату блокировки
+        settings_manager.settings.blocking_date = blocking_date
         
         # Сохраняем настройки
         settings_manager.save()
@@ -612,7 +1108,7 @@ def set_blocking_date():
         
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "message": f"Дата блокировки установлена: {blocking_date_str}" if blocking_date_str else "Дата блокировки сброшена",
                 "blocking_date": blocking_date_str
@@ -623,7 +1119,7 @@ def set_blocking_date():
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -632,18 +1128,21 @@ def set_blocking_date():
 
 """
 GET - Получить остатки на указанную дату
-Параметры: date (обязательный), storage_id (опционально)
+Параметры: date (обязательный), storage_id (опционально), unit_id (опционально),
+groups (опционально: true - итоги по иерархии групп номенклатуры)
 """
 @app.route("/api/reports/balances", methods=['GET'])
 def get_balances_report():
     try:
         date_str = request.args.get('date')
         storage_id = request.args.get('storage_id')
+        unit_id = request.args.get('unit_id')
+        with_groups = request.args.get('groups', 'false').lower() == 'true'
         
         if not date_str:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Обязательный параметр: date"
                 }),
@@ -656,7 +1155,7 @@ def get_balances_report():
         except ValueError:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
                 }),
@@ -674,39 +1173,531 @@ def get_balances_report():
             if not storage:
                 return Response(
                     status=404,
-                    response=json.dumps({
+                    response=json_encoder.encode({
                         "success": False,
                         "error": f"Склад с ID '{storage_id}' не найден"
                     }),
                     content_type="application/json"
                 )
         
+        # Поиск единицы вывода если указана
+        unit = None
+        if unit_id:
+            unit_list = list(start_service.units_measure.values())
+            unit = next((u for u in unit_list if u.id == unit_id), None)
+            
+            if not unit:
+                return Response(
+                    status=404,
+                    response=json_encoder.encode({
+                        "success": False,
+                        "error": f"Единица измерения с ID '{unit_id}' не найдена"
+                    }),
+                    content_type="application/json"
+                )
+        
         # Получаем отчет по остаткам
-        report_data = balance_service.get_balance_report(target_date, storage)
+        report_data = balance_service.get_balance_report(target_date, storage, unit)
+        
+        report = {
+            "calculation_date": target_date.isoformat(),
+            "storage": storage.name if storage else "Все склады",
+            "data": report_data
+        }
+        
+        # Итоги по группам номенклатуры считаются по уже агрегированным строкам
+        if with_groups:
+            report["groups"] = GroupRollup.build(
+                report_data, list(start_service.nomenclatures.values()), ["balance"], unit
+            )
+        
+        return Response(
+            status=200,
+            response=json_encoder.encode({
+                "success": True,
+                "report": report
+            }),
+            content_type="application/json"
+        )
         
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+"""
+GET - Получить ряд остатков с шагом day/week/month
+Параметры: start_date, end_date, step (обязательные), storage_ids, nomenclature_ids (опционально, через запятую)
+"""
+@app.route("/api/reports/balances/series", methods=['GET'])
+def get_balances_series_report():
+    try:
+        start_date_str = request.args.get('start_date')
+        end_date_str = request.args.get('end_date')
+        step = request.args.get('step')
+        storage_ids = request.args.get('storage_ids')
+        nomenclature_ids = request.args.get('nomenclature_ids')
+
+        if not start_date_str or not end_date_str or not step:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Обязательные параметры: start_date, end_date, step"
+                }),
+                content_type="application/json"
+            )
+
+        # Парсинг дат
+        try:
+            start_date = datetime.fromisoformat(start_date_str)
+            end_date = datetime.fromisoformat(end_date_str)
+        except ValueError:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
+                }),
+                content_type="application/json"
+            )
+
+        # Парсинг шага
+        try:
+            period = PeriodType[step.upper()]
+        except KeyError:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Неверный шаг. Допустимые значения: day, week, month"
+                }),
+                content_type="application/json"
+            )
+
+        # Поиск складов если указаны
+        storages = None
+        if storage_ids:
+            storage_map = {s.id: s for s in start_service.storages.values()}
+            storages = []
+            for storage_id in storage_ids.split(","):
+                storage = storage_map.get(storage_id.strip())
+                if not storage:
+                    return Response(
+                        status=404,
+                        response=json_encoder.encode({
+                            "success": False,
+                            "error": f"Склад с ID '{storage_id}' не найден"
+                        }),
+                        content_type="application/json"
+                    )
+                storages.append(storage)
+
+        # Поиск номенклатур если указаны
+        nomenclatures = None
+        if nomenclature_ids:
+            nomenclature_map = {n.id: n for n in start_service.nomenclatures.values()}
+            nomenclatures = []
+            for nomenclature_id in nomenclature_ids.split(","):
+                nomenclature = nomenclature_map.get(nomenclature_id.strip())
+                if not nomenclature:
+                    return Response(
+                        status=404,
+                        response=json_encoder.encode({
+                            "success": False,
+                            "error": f"Номенклатура с ID '{nomenclature_id}' не найдена"
+                        }),
+                        content_type="application/json"
+                    )
+                nomenclatures.append(nomenclature)
+
+        # Получаем ряд остатков за один проход
+        series = balance_service.get_balance_series(start_date, end_date, period, storages, nomenclatures)
+
+        return Response(
+            status=200,
+            response=json_encoder.encode({
+                "success": True,
+                "report": {
+                    "start_date": start_date.isoformat(),
+                    "end_date": end_date.isoformat(),
+                    "step": period.value,
+                    "storages": [s.name for s in storages] if storages else "Все склады",
+                    "series": series
+                }
+            }),
+            content_type="application/json"
+        )
+
+    except ArgumentException as e:
+        return Response(
+            status=400,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+
+"""
+GET - Сводный отчет по остаткам: номенклатуры в строках, склады в столбцах
+Параметры: date (обязательный), storage_ids (опционально, через запятую),
+format (опционально: json, csv, markdown, xml; по умолчанию json),
+envelope (опционально: true - результат форматтера строкой в JSON обертке).
+Без обертки CSV, XML и Markdown выдаются по частям со своим Content-Type
+"""
+@app.route("/api/reports/balances/pivot", methods=['GET'])
+def get_balances_pivot_report():
+    try:
+        date_str = request.args.get('date')
+        storage_ids = request.args.get('storage_ids')
+        format_type = request.args.get('format', 'json')
+        envelope = request.args.get('envelope', '').lower() in ("1", "true", "yes")
+
+        if not date_str:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Обязательный параметр: date"
+                }),
+                content_type="application/json"
+            )
+
+        # Парсинг даты
+        try:
+            target_date = datetime.fromisoformat(date_str)
+        except ValueError:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
+                }),
+                content_type="application/json"
+            )
+
+        format_map = {
+            "csv": ("CSV", "text/csv; charset=utf-8"),
+            "markdown": ("Markdown", "text/markdown; charset=utf-8"),
+            "json": ("Json", "application/json"),
+            "xml": ("XML", "application/xml; charset=utf-8")
+        }
+
+        if format_type not in format_map:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": f"Неизвестный формат: {format_type}"
+                }),
+                content_type="application/json"
+            )
+
+        # Поиск складов если указаны
+        storages = None
+        if storage_ids:
+            storage_map = {s.id: s for s in start_service.storages.values()}
+            storages = []
+            for storage_id in storage_ids.split(","):
+                storage = storage_map.get(storage_id.strip())
+                if not storage:
+                    return Response(
+                        status=404,
+                        response=json_encoder.encode({
+                            "success": False,
+                            "error": f"Склад с ID '{storage_id}' не найден"
+                        }),
+                        content_type="application/json"
+                    )
+                storages.append(storage)
+
+        # Сводный отчет за один проход
+        report_data = balance_service.get_balance_pivot_report(target_date, storages)
+
+        formatter_name, content_type = format_map[format_type]
+        formatter = factory.create(formatter_name)
+
+        # JSON и обертка по запросу - результат форматтера кладется в JSON отчета
+        if format_type == "json" or envelope:
+            return Response(
+                status=200,
+                response=json_encoder.encode({
+                    "success": True,
+                    "report": {
+                        "calculation_date": target_date.isoformat(),
+                        "format": format_type,
+                        "data": formatter.build(format_type, report_data)
+                    }
+                }),
+                content_type="application/json"
+            )
+
+        # Текстовые форматы отдаются как есть, без повторного кодирования в JSON
+        return Response(
+            formatter.stream_chunks(format_type, report_data),
+            status=200,
+            content_type=content_type
+        )
+
+    except ArgumentException as e:
+        return Response(
+            status=400,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+"""
+GET - Получить текущие остатки из материализованной таблицы
+Параметры: storage_id (опционально)
+"""
+@app.route("/api/reports/balances/current", methods=['GET'])
+def get_current_balances_report():
+    try:
+        storage_id = request.args.get('storage_id')
+
+        # Поиск склада если указан
+        storage = None
+        if storage_id:
+            storage = next((s for s in start_service.storages.values() if s.id == storage_id), None)
+
+            if not storage:
+                return Response(
+                    status=404,
+                    response=json_encoder.encode({
+                        "success": False,
+                        "error": f"Склад с ID '{storage_id}' не найден"
+                    }),
+                    content_type="application/json"
+                )
+
+        report_data = current_balance_service.get_current_balances_report(storage)
+
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "report": {
-                    "calculation_date": target_date.isoformat(),
                     "storage": storage.name if storage else "Все склады",
                     "data": report_data
                 }
             }),
             content_type="application/json"
         )
-        
+
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
             content_type="application/json"
         )
 
+"""
+GET - Сверить материализованные текущие остатки с полным пересчетом
+"""
+@app.route("/api/reports/balances/current/check", methods=['GET'])
+def check_current_balances():
+    try:
+        differences = current_balance_service.check_consistency()
+
+        return Response(
+            status=200,
+            response=json_encoder.encode({
+                "success": True,
+                "consistent": len(differences) == 0,
+                "differences": differences
+            }),
+            content_type="application/json"
+        )
+
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+"""
+POST - Перестроить дневные итоги движений полным пересчетом по транзакциям
+"""
+@app.route("/api/reports/rollups/rebuild", methods=['POST'])
+def rebuild_daily_rollups():
+    try:
+        daily_rollup_service.rebuild()
+
+        return Response(
+            status=200,
+            response=json_encoder.encode({
+                "success": True,
+                "days": daily_rollup_service.days_count,
+                "rows": daily_rollup_service.rows_count,
+                "transactions": len(start_service.transactions)
+            }),
+            content_type="application/json"
+        )
+
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+"""
+GET - Сверить дневные итоги движений с полным пересчетом
+"""
+@app.route("/api/reports/rollups/check", methods=['GET'])
+def check_daily_rollups():
+    try:
+        differences = daily_rollup_service.check_consistency()
+
+        return Response(
+            status=200,
+            response=json_encoder.encode({
+                "success": True,
+                "consistent": len(differences) == 0,
+                "differences": differences
+            }),
+            content_type="application/json"
+        )
+
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+
+"""
+POST - Списание номенклатур со склада
+Тело запроса: date (опционально, по умолчанию текущая дата), storage_id, items: [{nomenclature_id, quantity, unit_id}],
+allow_negative (опционально) - списание "под сальдо" без блокировки при недостатке остатков
+"""
+@app.route("/api/transactions/write-off", methods=['POST'])
+def write_off():
+    try:
+        request_data = request.get_json()
+
+        if not request_data or not request_data.get('storage_id') or not request_data.get('items'):
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Обязательные параметры: storage_id, items"
+                }),
+                content_type="application/json"
+            )
+
+        # Парсинг даты
+        try:
+            date_str = request_data.get('date')
+            write_off_date = datetime.fromisoformat(date_str) if date_str else datetime.now()
+        except ValueError:
+            return Response(
+                status=400,
+                response=json_encoder.encode({
+                    "success": False,
+                    "error": "Неверный формат даты. Используйте ISO формат: YYYY-MM-DDTHH:MM:SS"
+                }),
+                content_type="application/json"
+            )
+
+        storage = reference_service.get_reference_item("storages", request_data['storage_id'])
+
+        # Собираем позиции списания
+        items = []
+        for item_data in request_data['items']:
+            item = {
+                "nomenclature": reference_service.get_reference_item("nomenclatures", item_data.get('nomenclature_id')),
+                "quantity": item_data.get('quantity')
+            }
+            if item_data.get('unit_id'):
+                item["unit_measurement"] = reference_service.get_reference_item("units", item_data['unit_id'])
+            items.append(item)
+
+        transactions = transaction_service.write_off(
+            write_off_date, storage, items, bool(request_data.get('allow_negative', False))
+        )
+
+        formatter = factory.create("Json")
+        result = formatter.build("json", transactions)
+
+        return Response(
+            status=201,
+            response=json_encoder.encode({
+                "success": True,
+                "message": "Списание выполнено",
+                "transactions": result
+            }),
+            content_type="application/json"
+        )
+
+    except OperationException as e:
+        return Response(
+            status=409,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+    except ArgumentException as e:
+        return Response(
+            status=400,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
+    except Exception as e:
+        return Response(
+            status=500,
+            response=json_encoder.encode({
+                "success": False,
+                "error": str(e)
+            }),
+            content_type="application/json"
+        )
 
 """
 GET - Получить элемент справочника по ID
@@ -725,7 +1716,7 @@ def get_reference_item(reference_type: str, item_id: str):
         
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "item": result
             }),
@@ -735,7 +1726,7 @@ def get_reference_item(reference_type: str, item_id: str):
     except ArgumentException as e:
         return Response(
             status=400,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -744,7 +1735,7 @@ def get_reference_item(reference_type: str, item_id: str):
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -763,7 +1754,7 @@ def add_reference_item(reference_type: str):
         if not request_data:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Не указаны данные элемента в теле запроса"
                 }),
@@ -778,7 +1769,7 @@ def add_reference_item(reference_type: str):
         
         return Response(
             status=201,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "message": "Элемент успешно добавлен",
                 "item": result
@@ -789,7 +1780,7 @@ def add_reference_item(reference_type: str):
     except ArgumentException as e:
         return Response(
             status=400,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -798,7 +1789,7 @@ def add_reference_item(reference_type: str):
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -818,7 +1809,7 @@ def update_reference_item(reference_type: str, item_id: str):
         if not request_data:
             return Response(
                 status=400,
-                response=json.dumps({
+                response=json_encoder.encode({
                     "success": False,
                     "error": "Не указаны данные для обновления в теле запроса"
                 }),
@@ -833,7 +1824,7 @@ def update_reference_item(reference_type: str, item_id: str):
         
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "message": "Элемент успешно обновлен",
                 "item": result
@@ -844,7 +1835,7 @@ def update_reference_item(reference_type: str, item_id: str):
     except ArgumentException as e:
         return Response(
             status=400,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -853,7 +1844,7 @@ def update_reference_item(reference_type: str, item_id: str):
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -873,7 +1864,7 @@ def delete_reference_item(reference_type: str, item_id: str):
         
         return Response(
             status=200,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": True,
                 "message": "Элемент успешно удален"
             }),
@@ -883,7 +1874,7 @@ def delete_reference_item(reference_type: str, item_id: str):
     except ArgumentException as e:
         return Response(
             status=400,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -892,7 +1883,7 @@ def delete_reference_item(reference_type: str, item_id: str):
     except Exception as e:
         return Response(
             status=500,
-            response=json.dumps({
+            response=json_encoder.encode({
                 "success": False,
                 "error": str(e)
             }),
@@ -1,4 +1,5 @@
 from src.core.validator import Validator, OperationException
+from src.core.common import common
 from abc import ABC, abstractmethod
 
 # Абстрактный класс для формирования ответов
@@ -16,4 +17,71 @@ class AbstractResponse(ABC):
         if len(data) == 0:
             raise OperationException("Нет данных!")
 
-        return f""
\ No newline at end of file
+        return f""
+
+    # Сформировать ответ по частям из итерируемого источника строк.
+    # По умолчанию ответ строится целиком и выдается одной частью;
+    # форматы с построчной записью переопределяют метод.
+    # Пустой источник - пустой ответ.
+    def stream(self, format: str, data):
+        Validator.validate(format, str)
+
+        rows = list(data)
+        if len(rows) > 0:
+            yield self.build(format, rows)
+
+    # Сформировать ответ по частям в байтах UTF-8 для выдачи в HTTP ответ.
+    # Первая часть (шапка) выдается сразу, чтобы клиент получил ответ без задержки,
+    # остальные части stream() объединяются в блоки примерно по chunk_size байт.
+    def stream_chunks(self, format: str, data, chunk_size: int = 64 * 1024):
+        Validator.validate(chunk_size, int)
+
+        buffer = []
+        size = 0
+        first = True
+        for encoded in self._stream_encoded(format, data):
+            buffer.append(encoded)
+            size += len(encoded)
+
+            if size >= chunk_size or first:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+                first = False
+
+        if len(buffer) > 0:
+            yield b"".join(buffer)
+
+    # Части stream() в байтах UTF-8. Форматы, которые кодируют части сразу
+    # в байты, переопределяют метод, чтобы не декодировать их обратно.
+    def _stream_encoded(self, format: str, data):
+        for part in self.stream(format, data):
+            yield part.encode("utf-8")
+
+    # План колонок по первой строке: [(поле, вид поля)] без словарей и списков.
+    # Для моделей виды берутся из схемы класса (common.get_schema, строится один раз),
+    # для строк отчетов (словарей) вид неизвестен - None. Вложенная ссылка строки
+    # отчета (reference=full - словарь с id) не пропускается, а выводится
+    # колонкой вида reference - по наименованию.
+    @staticmethod
+    def _columns(item) -> list:
+        if isinstance(item, dict):
+            return [(field, "reference" if AbstractResponse._is_reference(value) else None)
+                    for field, value in item.items()
+                    if AbstractResponse._is_reference(value) or not isinstance(value, (dict, list))]
+
+        return [(field["name"], field["kind"]) for field in common.get_schema(type(item))
+                if not field["collection"]]
+
+    # Вложенная ссылка строки отчета: словарь модели с полем id
+    @staticmethod
+    def _is_reference(value) -> bool:
+        return isinstance(value, dict) and "id" in value
+
+    # Текст ссылки: наименование модели (объекта или вложенного словаря), иначе id
+    @staticmethod
+    def _reference_text(value) -> str:
+        if isinstance(value, dict):
+            return str(value.get("name", value.get("id")))
+
+        return str(getattr(value, "name", value.id))
@@ -1,9 +1,18 @@
+import sys
+from datetime import datetime
+from enum import Enum
+from operator import attrgetter
+from typing import get_origin
 from src.core.entity_model import EntityModel
 from src.core.abstract_model import AbstractModel
 from src.core.validator import ArgumentException
 
 # Набор статических общих методов
 class common:
+    # (класс модели, поля) -> функция чтения значений полей
+    __getters = {}
+    # Класс модели -> схема полей
+    __schemas = {}
 
     """
     Получить список наименований всех моделей
@@ -20,24 +29,131 @@ class common:
     """
     Получить полный список полей любой модели
         - is_common = True - исключить из списка словари и списки
+    Для моделей поля берутся из схемы класса, значения свойств не читаются
     """
     @staticmethod
     def get_fields(source, is_common: bool = False) -> list:
         if source is None:
             raise ArgumentException("Некорректно переданы аргументы!")
 
-        items = list(filter(lambda x: not x.startswith("_") , dir(source))) 
-        result = []
+        # Строки отчетов передаются словарями - поля это ключи
+        if isinstance(source, dict):
+            return [key for key, value in source.items()
+                    if not (is_common == True and isinstance(value, (dict, list)))]
+
+        return [field["name"] for field in common.get_schema(type(source))
+                if not (is_common == True and field["collection"])]
 
-        for item in items:
-            attribute = getattr(source.__class__, item)
-            if isinstance(attribute, property):
-                value = getattr(source, item)
 
-                # Флаг. Только простые типы и модели включать
-                if is_common == True and (isinstance(value, dict) or isinstance(value, list) ):
+    """
+    Получить схему полей класса: список {"name", "kind", "collection"} в порядке dir().
+    Строится один раз на класс по объявлениям, без чтения значений:
+        - тип результата свойства (-> str)
+        - аннотация поля класса (__date: datetime = None)
+        - тип значения по умолчанию поля класса (__ingredients = {})
+    kind: value, date, reference, list, dict, other или None, если тип не объявлен
+    """
+    @staticmethod
+    def get_schema(model_type: type) -> list:
+        schema = common.__schemas.get(model_type)
+        if schema is None:
+            schema = []
+            for name in dir(model_type):
+                if name.startswith("_") or not isinstance(getattr(model_type, name, None), property):
                     continue
 
-                result.append(item)
+                kind = common.__kind(common.__declared_type(model_type, name))
+                schema.append({"name": name, "kind": kind, "collection": kind in ("list", "dict")})
+
+            common.__schemas[model_type] = schema
+
+        return schema
+
+
+    """
+    Объявленный тип свойства класса или None
+    """
+    @staticmethod
+    def __declared_type(model_type: type, name: str):
+        declared = getattr(model_type, name).fget.__annotations__.get("return")
+
+        # Поле класса с тем же именем: __name -> _Класс__name
+        for owner in model_type.__mro__:
+            if declared is not None:
+                break
+
+            key = f"_{owner.__name__.lstrip('_')}__{name}"
+            annotations = owner.__dict__.get("__annotations__", {})
+            if key in annotations:
+                declared = annotations[key]
+            elif key in owner.__dict__ and owner.__dict__[key] is not None:
+                declared = type(owner.__dict__[key])
+            else:
+                continue
+
+            # Ссылка на еще не объявленный класс указывается строкой
+            if isinstance(declared, str):
+                declared = getattr(sys.modules.get(owner.__module__), declared, None)
+
+        return declared
+
+
+    """
+    Вид поля по объявленному типу
+    """
+    @staticmethod
+    def __kind(declared) -> str:
+        if declared is None:
+            return None
+
+        declared = get_origin(declared) or declared
+        if not isinstance(declared, type):
+            return "other"
+        if issubclass(declared, AbstractModel):
+            return "reference"
+        if issubclass(declared, (list, tuple, set)):
+            return "list"
+        if issubclass(declared, dict):
+            return "dict"
+        if issubclass(declared, datetime):
+            return "date"
+        if issubclass(declared, (str, int, float, bool)) and not issubclass(declared, Enum):
+            return "value"
+
+        return "other"
+
+
+    """
+    Получить значение поля модели или ключа строки отчета
+    """
+    @staticmethod
+    def get_value(source, field: str):
+        if isinstance(source, dict):
+            return source.get(field)
+
+        return getattr(source, field)
+
+
+    """
+    Получить значения нескольких полей модели или ключей строки отчета одним вызовом.
+    Для класса модели и набора полей один раз строится operator.attrgetter
+    """
+    @staticmethod
+    def get_values(source, fields: list) -> tuple:
+        if isinstance(source, dict):
+            return tuple(source.get(field) for field in fields)
+
+        key = (type(source), tuple(fields))
+        getter = common.__getters.get(key)
+        if getter is None:
+            if len(fields) == 0:
+                getter = lambda item: ()
+            elif len(fields) == 1:
+                single = attrgetter(fields[0])
+                getter = lambda item: (single(item),)
+            else:
+                getter = attrgetter(*fields)
+
+            common.__getters[key] = getter
 
-        return result
\ No newline at end of file
+        return getter(source)
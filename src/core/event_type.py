@@ -5,6 +5,7 @@
 class EventType:
     """
     Событие - обновились справочники
+    Параметры: {"reference_type": тип справочника, "item": добавленный, измененный или удаленный элемент}
     """
     @staticmethod
     def change_reference_type_key() -> str:
@@ -47,6 +48,29 @@ class EventType:
     def delete_unit_key() -> str:
         return "delete_unit"
 
+    """
+    Событие - изменились коэффициент или базовая единица у единицы измерения
+    """
+    @staticmethod
+    def change_unit_key() -> str:
+        return "change_unit"
+
+    """
+    Событие - добавлена, изменена или удалена транзакция
+    Параметры: {"old": состояние до изменения или None, "new": состояние после изменения или None}
+    """
+    @staticmethod
+    def change_transaction_key() -> str:
+        return "change_transaction"
+
+    """
+    Событие - транзакции загружены заново (стартовые данные, импорт из файла).
+    Индексы, итоги и кэши транзакций перестраиваются при следующем обращении
+    """
+    @staticmethod
+    def reload_transactions_key() -> str:
+        return "reload_transactions"
+
     # Получить список всех событий
     def events(self):
         return [attr[:-4] for attr in dir(self) 
@@ -22,7 +22,7 @@ class ObserveService:
             return
 
 
-        if instance not in ObserveService.handlers:
+        if instance in ObserveService.handlers:
             ObserveService.handlers.remove(instance)
 
     """
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from src.core.validator import Validator
 from src.dtos.filter_dto import FilterDto
 from src.models.filter_type import FilterType
@@ -89,6 +90,14 @@ class Prototype:
     @staticmethod
     def _compare_values(field_value, filter_value: str, filter_type: FilterType) -> bool:
         """Сравнение значений в зависимости от типа фильтра"""
+        # Даты сравниваем как даты: str(datetime) и isoformat отличаются разделителем
+        if isinstance(field_value, datetime):
+            try:
+                field_value = field_value.isoformat()
+                filter_value = datetime.fromisoformat(str(filter_value)).isoformat()
+            except ValueError:
+                pass
+
         str_field_value = str(field_value)
         str_filter_value = str(filter_value)
         
@@ -0,0 +1,47 @@
+class SourceTracker:
+    """
+    Актуальность производной структуры (индекса, итогов, кэша) относительно хранилища транзакций.
+
+    Структура строится по конкретному объекту хранилища и дальше поддерживается
+    событиями change_transaction. Устаревшей она считается, если:
+    - еще не построена или сброшена явно (invalidate) - например, по событию
+      reload_transactions после загрузки данных;
+    - хранилище заменено другим объектом;
+    - количество учтенных транзакций разошлось с хранилищем (запись в обход событий).
+
+    Правку транзакции на месте без события две последние проверки не обнаруживают,
+    поэтому загрузка данных сообщает о себе событием reload_transactions.
+    """
+
+    def __init__(self, start_service):
+        self.start_service = start_service
+        self.__source = None
+
+    @property
+    def is_built(self) -> bool:
+        """
+        Структура построена по текущему хранилищу - события можно применять инкрементально
+        """
+        return self.__source is not None and self.__source is self.start_service.transactions
+
+    def is_stale(self, count: int) -> bool:
+        """
+        Структура устарела и должна быть перестроена
+
+        Args:
+            count (int): Количество транзакций, учтенных структурой
+        """
+        transactions = self.start_service.transactions
+        return self.__source is not transactions or count != len(transactions)
+
+    def mark(self):
+        """
+        Структура построена по текущему хранилищу
+        """
+        self.__source = self.start_service.transactions
+
+    def invalidate(self):
+        """
+        Сбросить структуру - перестроится при следующем обращении
+        """
+        self.__source = None
@@ -13,6 +13,7 @@ class BalanceCacheDto:
         self.__balance: float = 0.0
         self.__calculation_date: datetime = None
         self.__nomenclature_data: dict = {}
+        self.__storage_balances: dict = {}
 
     @property
     def nomenclature_id(self) -> str:
@@ -50,6 +51,16 @@ class BalanceCacheDto:
         Validator.validate(value, dict)
         self.__nomenclature_data = value
 
+    @property
+    def storage_balances(self) -> dict:
+        """Остатки по складам: id склада -> остаток"""
+        return self.__storage_balances
+
+    @storage_balances.setter
+    def storage_balances(self, value: dict):
+        Validator.validate(value, dict)
+        self.__storage_balances = value
+
     @staticmethod
     def from_dict(data: dict) -> 'BalanceCacheDto':
         """Создать DTO из словаря с использованием setattr"""
@@ -0,0 +1,243 @@
+import random
+from datetime import datetime
+from src.core.validator import Validator
+from src.models.transaction_model import TransactionModel
+
+
+class _Node:
+    """
+    Узел декартова дерева движений пары (номенклатура, склад).
+
+    Ключ - (дата, порядковый номер добавления): движения с одинаковой датой
+    идут в порядке добавления. Узел хранит сумму движений своего поддерева и
+    минимальный нарастающий остаток внутри поддерева (по непустым префиксам).
+    """
+
+    __slots__ = ("key", "delta", "priority", "left", "right", "sum", "min_prefix")
+
+    def __init__(self, key: tuple, delta: float):
+        self.key = key
+        self.delta = delta
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.sum = delta
+        self.min_prefix = delta
+
+    def update(self):
+        """Пересчитать сумму и минимум поддерева по дочерним узлам"""
+        before = self.left.sum if self.left is not None else 0
+        here = before + self.delta
+        result = here
+
+        if self.left is not None and self.left.min_prefix < result:
+            result = self.left.min_prefix
+        if self.right is not None and here + self.right.min_prefix < result:
+            result = here + self.right.min_prefix
+
+        self.sum = here + (self.right.sum if self.right is not None else 0)
+        self.min_prefix = result
+
+
+class BalanceIndex:
+    """
+    Индекс нарастающих остатков в разрезе (номенклатура, склад).
+
+    Движения каждой пары хранятся в декартовом дереве по дате, узлы которого
+    знают сумму и минимальный нарастающий остаток своего поддерева. Поэтому
+    остаток на дату, минимальный остаток начиная с даты, добавление (в том числе
+    задним числом) и удаление движения выполняются за O(log n) в среднем -
+    более поздние остатки не пересчитываются. Построение по списку - O(n log n)
+    на сортировку.
+
+    Attributes:
+        __entries (dict): (id номенклатуры, id склада) -> {"root": корень дерева, "keys": {id транзакции: ключ}}
+        __count (int): Количество проиндексированных транзакций
+        __order (int): Порядковый номер следующего движения (различает движения с одной датой)
+    """
+
+    def __init__(self, transactions: list = None):
+        self.__entries = {}
+        self.__count = 0
+        self.__order = 0
+
+        if transactions:
+            self.build(transactions)
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    def build(self, transactions: list):
+        """
+        Перестроить индекс по списку транзакций
+        """
+        Validator.validate(transactions, list)
+        self.__entries = {}
+        self.__count = 0
+        self.__order = 0
+
+        # Сортируем один раз, дерево каждой пары строится за линейное время по стеку
+        stacks = {}
+        for transaction in sorted(transactions, key=lambda t: t.date):
+            entry = self.__entry(transaction.nomenclature.id, transaction.storage.id, True)
+            node = _Node(self.__next_key(transaction), self.__delta(transaction))
+            entry["keys"][transaction.id] = node.key
+            self.__push(stacks.setdefault(id(entry), (entry, []))[1], node)
+
+        for entry, stack in stacks.values():
+            entry["root"] = self.__close(stack)
+
+        self.__count = len(transactions)
+
+    def add(self, transaction: TransactionModel):
+        """
+        Добавить транзакцию в индекс
+        """
+        Validator.validate(transaction, TransactionModel)
+        entry = self.__entry(transaction.nomenclature.id, transaction.storage.id, True)
+        node = _Node(self.__next_key(transaction), self.__delta(transaction))
+
+        left, right = self.__split(entry["root"], node.key)
+        entry["root"] = self.__merge(self.__merge(left, node), right)
+        entry["keys"][transaction.id] = node.key
+        self.__count += 1
+
+    def remove(self, transaction: TransactionModel) -> bool:
+        """
+        Убрать транзакцию из индекса
+        """
+        Validator.validate(transaction, TransactionModel)
+        entry = self.__entry(transaction.nomenclature.id, transaction.storage.id)
+        if entry is None or transaction.id not in entry["keys"]:
+            return False
+
+        key = entry["keys"].pop(transaction.id)
+        left, right = self.__split(entry["root"], key)
+        _, right = self.__split(right, (key[0], key[1] + 1))
+        entry["root"] = self.__merge(left, right)
+
+        self.__count -= 1
+        return True
+
+    def balance_at(self, nomenclature_id: str, storage_id: str, date: datetime) -> float:
+        """
+        Остаток пары на дату (включительно) - O(log n)
+        """
+        entry = self.__entry(nomenclature_id, storage_id)
+        if entry is None:
+            return 0
+
+        result = 0
+        node = entry["root"]
+        while node is not None:
+            if node.key[0] <= date:
+                result += (node.left.sum if node.left is not None else 0) + node.delta
+                node = node.right
+            else:
+                node = node.left
+
+        return result
+
+    def min_balance_from(self, nomenclature_id: str, storage_id: str, date: datetime) -> float:
+        """
+        Минимальный остаток пары начиная с даты (включительно) и далее - O(log n).
+
+        Списание на дату уменьшает все последующие остатки, поэтому допустимо
+        только если этот минимум не меньше списываемого количества.
+        """
+        entry = self.__entry(nomenclature_id, storage_id)
+        if entry is None:
+            return 0
+
+        result = self.balance_at(nomenclature_id, storage_id, date)
+
+        # Спуск по дереву: offset - сумма движений левее текущего поддерева.
+        # Поддерево справа от узла с датой позже date целиком входит в диапазон
+        offset = 0
+        node = entry["root"]
+        while node is not None:
+            here = offset + (node.left.sum if node.left is not None else 0) + node.delta
+            if node.key[0] <= date:
+                offset = here
+                node = node.right
+                continue
+
+            result = min(result, here)
+            if node.right is not None:
+                result = min(result, here + node.right.min_prefix)
+            node = node.left
+
+        return result
+
+    def __next_key(self, transaction: TransactionModel) -> tuple:
+        self.__order += 1
+        return transaction.date, self.__order
+
+    @staticmethod
+    def __push(stack: list, node: _Node):
+        """Добавить узел с наибольшим ключом в дерево, строящееся по стеку правой ветви"""
+        last = None
+        while stack and stack[-1].priority < node.priority:
+            last = stack.pop()
+            last.update()
+
+        node.left = last
+        if stack:
+            stack[-1].right = node
+        stack.append(node)
+
+    @staticmethod
+    def __close(stack: list) -> _Node:
+        """Завершить построение: пересчитать правую ветвь снизу вверх, вернуть корень"""
+        for node in reversed(stack):
+            node.update()
+
+        return stack[0] if stack else None
+
+    @staticmethod
+    def __split(node: _Node, key: tuple) -> tuple:
+        """Разделить дерево на узлы с ключом меньше key и остальные"""
+        if node is None:
+            return None, None
+
+        if node.key < key:
+            node.right, right = BalanceIndex.__split(node.right, key)
+            node.update()
+            return node, right
+
+        left, node.left = BalanceIndex.__split(node.left, key)
+        node.update()
+        return left, node
+
+    @staticmethod
+    def __merge(left: _Node, right: _Node) -> _Node:
+        """Объединить деревья (все ключи left меньше ключей right)"""
+        if left is None:
+            return right
+        if right is None:
+            return left
+
+        if left.priority > right.priority:
+            left.right = BalanceIndex.__merge(left.right, right)
+            left.update()
+            return left
+
+        right.left = BalanceIndex.__merge(left, right.left)
+        right.update()
+        return right
+
+    def __entry(self, nomenclature_id: str, storage_id: str, create: bool = False):
+        key = (nomenclature_id, storage_id)
+        entry = self.__entries.get(key)
+
+        if entry is None and create:
+            entry = {"root": None, "keys": {}}
+            self.__entries[key] = entry
+
+        return entry
+
+    @staticmethod
+    def __delta(transaction: TransactionModel) -> float:
+        quantity = transaction.get_quantity_in_base_units()
+        return quantity if transaction.transaction_type == "in" else -quantity
@@ -1,13 +1,17 @@
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.core.observe_service import ObserveService
 from src.core.event_type import EventType
-from src.core.validator import Validator
+from src.core.validator import Validator, ArgumentException
 from src.dtos.balance_cache_dto import BalanceCacheDto
 from src.start_service import StartService
 from src.models.transaction_model import TransactionModel
 from src.models.storage_model import StorageModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.models.period_type import PeriodType
 from src.logics.convert_factory import ConvertFactory
+from src.logics.unit_conversion_service import UnitConversionService
+from src.logics.daily_rollup_service import DailyRollupService
 from src.core.prototype import Prototype
 from src.dtos.filter_dto import FilterDto
 from src.logics.response_json import ResponseJson
@@ -19,10 +23,12 @@ class BalanceService:
     Сервис для расчета и сохранения остатков с оптимизацией через дату блокировки
     """
 
-    def __init__(self, start_service, settings_manager):
+    def __init__(self, start_service, settings_manager, daily_rollup_service: DailyRollupService = None):
         self.start_service = start_service
         self.settings_manager = settings_manager
         self.convert_factory = ConvertFactory()
+        self.unit_conversion_service = UnitConversionService(start_service)
+        self.daily_rollup_service = daily_rollup_service or DailyRollupService(start_service)
         self.json_formatter = ResponseJson()
         self.balances_file = "balances_cache.json"
         ObserveService.add(self)
@@ -32,31 +38,79 @@ class BalanceService:
         Рассчитать остатки на указанную дату с использованием оптимизации через дату блокировки
         """
         Validator.validate(target_date, datetime)
+        if storage:
+            Validator.validate(storage, StorageModel)
+
+        cells, nomenclatures = self._calculate_storage_balances(target_date, {storage.id} if storage else None)
 
-        blocking_date = self.settings_manager.settings.blocking_date
         balances = {}
+        for (nom_id, _), balance in cells.items():
+            if nom_id not in balances:
+                balances[nom_id] = {
+                    'nomenclature': nomenclatures[nom_id],
+                    'balance': 0
+                }
+
+            balances[nom_id]['balance'] += balance
+
+        return balances
+
+    def _calculate_storage_balances(self, target_date: datetime, storage_ids: set = None) -> tuple:
+        """
+        Остатки на дату (включительно) в разрезе (номенклатура, склад).
+
+        Если дата блокировки раньше даты расчета и кэш на нее сохранен, остатки на
+        дату блокировки берутся из кэша (по складам), а по дневным итогам
+        досчитываются только движения после нее. Иначе - полный расчет по дневным итогам.
+
+        Args:
+            storage_ids (set): id складов (опционально, по умолчанию все)
+
+        Returns:
+            tuple: ((id номенклатуры, id склада) -> остаток, id номенклатуры -> номенклатура)
+        """
+        blocking_date = self.settings_manager.settings.blocking_date
 
         # Если есть дата блокировки и она раньше целевой даты
         if blocking_date and blocking_date < target_date:
             # Загружаем сохраненные остатки на дату блокировки
-            cached_balances = self._load_cached_balances(blocking_date)
+            cached = self._load_cached_balances(blocking_date)
 
-            if cached_balances:
-                # Используем кэшированные остатки как начальные
-                balances = cached_balances
+            if cached is not None:
+                cells, nomenclatures = cached
+                if storage_ids is not None:
+                    cells = {key: balance for key, balance in cells.items() if key[1] in storage_ids}
 
-                # Рассчитываем обороты только за период от блокировки до целевой даты
-                period_transactions = self._get_transactions_in_period_with_prototype(blocking_date, target_date,
-                                                                                      storage)
-                balances = self._apply_transactions_to_balances(balances, period_transactions)
-            else:
-                # Если кэш не найден, рассчитываем полностью
-                balances = self._calculate_full_balances_with_prototype(target_date, storage)
-        else:
-            # Если блокировки нет или она позже целевой даты, рассчитываем полностью
-            balances = self._calculate_full_balances_with_prototype(target_date, storage)
+                # Транзакции ровно на дату блокировки уже учтены в кэше
+                return self._calculate_balances_from_rollups(target_date, storage_ids, cells, nomenclatures,
+                                                             blocking_date)
 
-        return balances
+        # Если блокировки нет, она позже целевой даты или кэш не найден, рассчитываем полностью
+        return self._calculate_balances_from_rollups(target_date, storage_ids)
+
+    def _calculate_balances_from_rollups(self, target_date: datetime, storage_ids: set = None, cells: dict = None,
+                                         nomenclatures: dict = None, after_date: datetime = None) -> tuple:
+        """
+        Рассчитать остатки на дату (включительно) по дневным итогам в разрезе (номенклатура, склад).
+        Транзакции перебираются только за неполные дни на границах.
+
+        Args:
+            cells (dict): Начальные остатки (id номенклатуры, id склада) -> остаток (опционально)
+            nomenclatures (dict): Номенклатуры начальных остатков (опционально)
+            after_date (datetime): Учитывать только движения позже этой даты (опционально)
+        """
+        cells = cells if cells is not None else {}
+        nomenclatures = nomenclatures if nomenclatures is not None else {}
+        bound = (after_date or target_date) + timedelta(microseconds=1)
+        totals = self.daily_rollup_service.aggregate([bound], target_date, storage_ids)
+        known = self.daily_rollup_service.nomenclatures
+
+        # До границы - все движения по дату расчета, после - движения позже after_date
+        for key, (income, outcome, _) in totals[1 if after_date else 0].items():
+            cells[key] = cells.get(key, 0) + income - outcome
+            nomenclatures[key[0]] = known[key[0]]
+
+        return cells, nomenclatures
 
     def _calculate_full_balances_with_prototype(self, target_date: datetime, storage: StorageModel = None):
         """
@@ -164,10 +218,10 @@ class BalanceService:
         if not blocking_date:
             return False
 
-        balances = self._calculate_full_balances_with_prototype(blocking_date)
-        return self._save_balances_to_cache(balances, blocking_date)
+        cells, nomenclatures = self._calculate_balances_from_rollups(blocking_date)
+        return self._save_balances_to_cache(cells, nomenclatures, blocking_date)
 
-    def _save_balances_to_cache(self, balances: dict, calculation_date: datetime):
+    def _save_balances_to_cache(self, cells: dict, nomenclatures: dict, calculation_date: datetime):
         """
         Сохранить остатки в кэш с использованием единой сериализации
         """
@@ -175,7 +229,7 @@ class BalanceService:
             # Используем фабрику конверторов для сериализации
             cache_data = {
                 "calculation_date": calculation_date.isoformat(),
-                "balances": self._serialize_balances(balances)
+                "balances": self._serialize_balances(cells, nomenclatures)
             }
 
             # Используем JSON форматтер для сохранения
@@ -189,18 +243,23 @@ class BalanceService:
         except Exception as e:
             return False
 
-    def _serialize_balances(self, balances: dict) -> dict:
+    def _serialize_balances(self, cells: dict, nomenclatures: dict) -> dict:
         """
-        Сериализовать балансы с использованием DTO
+        Сериализовать балансы с использованием DTO: по номенклатуре - итог и остатки по складам
         """
+        storage_balances = {}
+        for (nom_id, storage_id), balance in cells.items():
+            storage_balances.setdefault(nom_id, {})[storage_id] = balance
+
         serialized_balances = {}
-        for nom_id, data in balances.items():
+        for nom_id, by_storage in storage_balances.items():
             # Создаем DTO для каждого баланса
             balance_dto = BalanceCacheDto()
             balance_dto.nomenclature_id = nom_id
-            balance_dto.balance = data['balance']
+            balance_dto.balance = sum(by_storage.values())
+            balance_dto.storage_balances = by_storage
             balance_dto.calculation_date = datetime.now()
-            balance_dto.nomenclature_data = self.convert_factory.convert(data['nomenclature'])
+            balance_dto.nomenclature_data = self.convert_factory.convert(nomenclatures[nom_id])
 
             serialized_balances[nom_id] = balance_dto.to_dict()
 
@@ -232,23 +291,31 @@ class BalanceService:
     def _deserialize_balances(self, serialized_balances: dict):
         """
         Десериализовать балансы с использованием DTO
+
+        Returns:
+            tuple: ((id номенклатуры, id склада) -> остаток, id номенклатуры -> номенклатура)
+                   или None, если кэш сохранен без остатков по складам
         """
-        balances = {}
+        cells = {}
+        nomenclatures = {}
 
         for nom_id, data in serialized_balances.items():
             # Создаем DTO из словаря
             balance_dto = BalanceCacheDto.from_dict(data)
 
+            # Кэш прежнего формата хранит только итог по всем складам - по складам не разложить
+            if not balance_dto.storage_balances and balance_dto.balance != 0:
+                return None
+
             # Находим номенклатуру по ID
             nomenclature = self._find_nomenclature_by_id(balance_dto.nomenclature_id)
 
             if nomenclature:
-                balances[nom_id] = {
-                    'nomenclature': nomenclature,
-                    'balance': balance_dto.balance
-                }
+                nomenclatures[nom_id] = nomenclature
+                for storage_id, balance in balance_dto.storage_balances.items():
+                    cells[(nom_id, storage_id)] = balance
 
-        return balances
+        return cells, nomenclatures
 
 
 
@@ -269,10 +336,18 @@ class BalanceService:
 
         return filtered_nomenclatures[0] if filtered_nomenclatures else None
 
-    def get_balance_report(self, target_date: datetime, storage: StorageModel = None):
+    def get_balance_report(self, target_date: datetime, storage: StorageModel = None,
+                           unit: UnitMeasurement = None):
         """
         Получить отчет по остаткам на указанную дату
+
+        Args:
+            unit (UnitMeasurement): Единица вывода (опционально). Остатки совместимых
+                                    с ней номенклатур пересчитываются в эту единицу
         """
+        if unit:
+            Validator.validate(unit, UnitMeasurement)
+
         balances = self.calculate_balances_until_date(target_date, storage)
 
         report_data = []
@@ -280,18 +355,174 @@ class BalanceService:
             if data['balance'] != 0:  # Показываем только ненулевые остатки
                 # Используем фабрику конверторов для сериализации
                 nom_dict = self.convert_factory.convert(data['nomenclature'])
-                unit_dict = self.convert_factory.convert(data['nomenclature'].unit_measurement)
+                balance = data['balance']
+                output_unit = data['nomenclature'].unit_measurement
+
+                if unit and self.unit_conversion_service.is_compatible(output_unit, unit):
+                    balance = self.unit_conversion_service.from_base(balance, unit)
+                    output_unit = unit
+
+                unit_dict = self.convert_factory.convert(output_unit)
 
                 report_data.append({
                     "nomenclature_id": nom_id,
                     "nomenclature_name": nom_dict.get('name', ''),
                     "unit_measurement": unit_dict.get('name', ''),
-                    "balance": round(data['balance'], 2),
+                    "balance": round(balance, 2),
                     "calculation_date": target_date.isoformat()
                 })
 
         return report_data
 
+    def get_balance_series(self, start_date: datetime, end_date: datetime, period: PeriodType,
+                           storages: list[StorageModel] = None, nomenclatures: list = None):
+        """
+        Получить ряд остатков с шагом period по дневным итогам
+
+        Args:
+            start_date (datetime): Дата первой точки ряда
+            end_date (datetime): Дата, после которой точки не строятся
+            period (PeriodType): Шаг ряда (день, неделя, месяц)
+            storages (list[StorageModel]): Склады (опционально, по умолчанию все)
+            nomenclatures (list[NomenclatureModel]): Номенклатуры (опционально, по умолчанию все)
+
+        Returns:
+            list: Список точек вида {"date": ..., "data": [...]}, остаток на дату точки включительно
+        """
+        Validator.validate(start_date, datetime)
+        Validator.validate(end_date, datetime)
+        Validator.validate(period, PeriodType)
+
+        if start_date > end_date:
+            raise ArgumentException("Дата начала не может быть позже даты окончания")
+
+        storage_ids = {storage.id for storage in storages} if storages else None
+        nomenclature_ids = {nomenclature.id for nomenclature in nomenclatures} if nomenclatures else None
+        points = period.points(start_date, end_date)
+
+        # Интервалы (p[i], p[i+1]]: остаток точки включает движения в саму дату точки
+        bounds = [point + timedelta(microseconds=1) for point in points]
+        totals = self.daily_rollup_service.aggregate(bounds, points[-1], storage_ids)
+        known = self.daily_rollup_service.nomenclatures
+
+        balances = {}
+        headers = {}
+        series = []
+
+        for point, point_totals in zip(points, totals):
+            # Досчитываем остатки только по движениям между предыдущей и текущей точкой
+            for (nom_id, _), (income, outcome, _) in point_totals.items():
+                if nomenclature_ids is not None and nom_id not in nomenclature_ids:
+                    continue
+
+                if nom_id not in balances:
+                    balances[nom_id] = 0
+                    headers[nom_id] = self._balance_row_header(known[nom_id])
+
+                balances[nom_id] += income - outcome
+
+            series.append({
+                "date": point.isoformat(),
+                "data": [
+                    {**headers[nom_id], "balance": round(balance, 2)}
+                    for nom_id, balance in balances.items()
+                ]
+            })
+
+        return series
+
+    def get_balance_pivot_report(self, target_date: datetime, storages: list[StorageModel] = None):
+        """
+        Получить сводный отчет по остаткам: номенклатуры в строках, склады в столбцах
+
+        Ячейки берутся из остатков в разрезе (номенклатура, склад) - по дневным итогам
+        с учетом кэша на дату блокировки, как и остальные отчеты по остаткам.
+        Строки - плоские словари, поэтому отчет выводится любым форматтером.
+
+        Args:
+            target_date (datetime): Дата расчета остатков (включительно)
+            storages (list[StorageModel]): Склады-столбцы (опционально, по умолчанию все)
+
+        Returns:
+            list: Строки отчета. Последняя строка - итоги по складам
+        """
+        Validator.validate(target_date, datetime)
+
+        if not storages:
+            storages = list(self.start_service.storages.values())
+
+        columns = self._pivot_columns(storages)
+
+        # Остаток по паре (номенклатура, склад)
+        storage_balances, nomenclatures = self._calculate_storage_balances(target_date, set(columns))
+        cells = {}
+        for (nom_id, storage_id), balance in storage_balances.items():
+            cells.setdefault(nom_id, {})[storage_id] = balance
+
+        report_data = []
+        totals = {storage_id: 0 for storage_id in columns}
+
+        for nom_id, row_cells in cells.items():
+            # Показываем только номенклатуры с ненулевым остатком хотя бы на одном складе
+            if all(round(value, 2) == 0 for value in row_cells.values()):
+                continue
+
+            row = self._balance_row_header(nomenclatures[nom_id])
+            for storage_id, column in columns.items():
+                value = row_cells.get(storage_id, 0)
+                row[column] = round(value, 2)
+                totals[storage_id] += value
+
+            row["total"] = round(sum(row_cells.values()), 2)
+            report_data.append(row)
+
+        # Итоговая строка
+        total_row = {
+            "nomenclature_id": "",
+            "nomenclature_name": "Итого",
+            "unit_measurement": ""
+        }
+        for storage_id, column in columns.items():
+            total_row[column] = round(totals[storage_id], 2)
+        total_row["total"] = round(sum(totals.values()), 2)
+        report_data.append(total_row)
+
+        return report_data
+
+    def _pivot_columns(self, storages: list[StorageModel]) -> dict:
+        """
+        Сопоставить складам имена столбцов сводного отчета (id склада -> имя столбца)
+        """
+        columns = {}
+        # Имена служебных столбцов строки отчета
+        names = {"nomenclature_id", "nomenclature_name", "unit_measurement", "total"}
+
+        for storage in storages:
+            Validator.validate(storage, StorageModel)
+            name = storage.name
+
+            # Одноименные склады (и совпадения со служебными столбцами) различаем по коду
+            if name in names:
+                name = f"{name} ({storage.id})"
+
+            names.add(name)
+            columns[storage.id] = name
+
+        return columns
+
+    def _balance_row_header(self, nomenclature) -> dict:
+        """
+        Сформировать описательную часть строки отчета по остаткам
+        """
+        nom_dict = self.convert_factory.convert(nomenclature)
+        unit_dict = self.convert_factory.convert(nomenclature.unit_measurement)
+
+        return {
+            "nomenclature_id": nomenclature.id,
+            "nomenclature_name": nom_dict.get('name', ''),
+            "unit_measurement": unit_dict.get('name', '')
+        }
+
     def get_transactions_with_complex_filters(self, filters: list[FilterDto]):
         """
         Получить транзакции с комплексной фильтрацией через Prototype
@@ -305,4 +536,17 @@ class BalanceService:
         Обработчик событий
         """
         if event == EventType.change_nomenclature_unit_key():
-            self.calculate_turnovers_until_blocking_date()
\ No newline at end of file
+            self.calculate_turnovers_until_blocking_date()
+
+        elif event == EventType.change_transaction_key():
+            # Изменение по дату блокировки меняет сохраненные на нее остатки - кэш пересчитывается
+            blocking_date = self.settings_manager.settings.blocking_date if self.settings_manager else None
+            changed = [t for t in (params["old"], params["new"]) if t is not None]
+            if blocking_date and os.path.exists(self.balances_file) and \
+                    any(transaction.date <= blocking_date for transaction in changed):
+                self.calculate_turnovers_until_blocking_date()
+
+        elif event == EventType.reload_transactions_key():
+            # Данные загружены заново - сохраненный кэш относится к прежним транзакциям
+            if self.settings_manager and os.path.exists(self.balances_file):
+                self.calculate_turnovers_until_blocking_date()
\ No newline at end of file
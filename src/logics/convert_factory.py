@@ -1,13 +1,36 @@
+from datetime import datetime
+from operator import attrgetter
 from src.logics.list_convertor import ListConvertor
 from src.core.abstract_model import AbstractModel
-from src.core.abstract_convertor import AbstractConvertor
 from src.core.common import common
+from src.core.validator import Validator, ArgumentException
+from src.core.abstract_convertor import AbstractConvertor
 from src.logics.basic_convertor import BasicConvertor
 from src.logics.date_convertor import DateTimeConvertor
 from src.logics.reference_convertor import ReferenceConvertor
+from src.models.reference_mode import ReferenceMode
 
 
 class ConvertFactory:
+    """
+    Фабрика конверторов моделей в словари.
+
+    План сериализации класса (имена свойств) строится один раз по описанию класса,
+    без чтения значений, и общий для всех экземпляров фабрики. Вид поля (значение,
+    дата, ссылка, список) запоминается по первому непустому значению. Конвертор
+    для значения выбирается по его типу через кэш тип -> конвертор вместо перебора
+    can_convert у всех конверторов.
+
+    Для вывода всех полей со ссылками-id по плану строится быстрая функция
+    сериализации класса: значения читаются одним operator.attrgetter, значения,
+    даты и ссылки обрабатываются на месте, остальные поля - общим путем.
+
+    Связанные модели можно вывести отдельной таблицей (expand) - каждая один раз за ответ.
+    """
+
+    # Класс модели -> список [имя поля, вид поля или None, пока вид неизвестен]
+    _plans = {}
+
     def __init__(self):
         self._convertors = [
             BasicConvertor(),
@@ -16,30 +39,232 @@ class ConvertFactory:
         ]
         # ListConvertor добавляется после инициализации, чтобы избежать циклической зависимости
         self._convertors.append(ListConvertor(self))
+        # Тип значения -> конвертор (None - значение выводится как есть)
+        self._dispatch = {}
+        # Класс модели -> быстрая функция сериализации
+        self._serializers = {}
     
-    def convert(self, obj) -> dict:
+    def convert(self, obj, fields: list = None, reference_mode: ReferenceMode = ReferenceMode.ID) -> dict:
+        """
+        Преобразовать объект в словарь
+
+        Args:
+            obj: Модель или строка отчета (словарь)
+            fields (list): Выводимые поля (опционально). Остальные поля не читаются
+                           и не конвертируются. Ссылку можно указать как "group_nomenclature"
+                           или как "group_nomenclature_id"
+            reference_mode (ReferenceMode): Вывод ссылок на другие модели - id (по умолчанию),
+                                            наименование или вложенный объект целиком
+        """
         if obj is None:
             return {}
-            
+
+        # Строки отчетов уже являются словарями - конвертируем только значения
+        if isinstance(obj, dict):
+            return {key: self._convert_item(value) for key, value in obj.items()
+                    if fields is None or key in fields}
+
+        if fields is None and reference_mode == ReferenceMode.ID:
+            serializer = self._serializers.get(type(obj))
+            if serializer is None:
+                serializer = self._build_serializer(type(obj))
+                self._serializers[type(obj)] = serializer
+
+            try:
+                return serializer(obj)
+            except Exception:
+                # Поле не читается - общий путь пропустит только его
+                pass
+
+        return self._convert_generic(obj, fields, reference_mode)
+
+    def _convert_generic(self, obj, fields: list = None, reference_mode: ReferenceMode = ReferenceMode.ID) -> dict:
+        """
+        Общий путь: поля читаются по одному, непрочитанные поля пропускаются
+        """
         result = {}
-        fields = common.get_fields(obj)
-        
-        for field in fields:
+        for entry in self.get_plan(type(obj)):
+            field = entry[0]
+            if fields is not None and field not in fields and f"{field}_id" not in fields:
+                continue
+
             try:
-                value = getattr(obj, field)
-                converted_value = self._convert_item(value)
-                
-                # Для ReferenceConvertor добавляем суффикс _id к имени поля
-                if isinstance(value, AbstractModel):
-                    result[f"{field}_id"] = converted_value
-                else:
-                    result[field] = converted_value
-                    
+                self._convert_field(result, entry, getattr(obj, field), reference_mode)
             except Exception as e:
                 # Пропускаем поля, которые не удалось сконвертировать
                 continue
         
         return result
+
+    def _convert_field(self, result: dict, entry: list, value, reference_mode: ReferenceMode):
+        """Записать в результат значение поля по его виду"""
+        field, kind = entry
+
+        if value is None:
+            result[field] = None
+            return
+
+        if kind is None:
+            kind = self._kind(value)
+            entry[1] = kind
+
+        if kind == "reference":
+            # По умолчанию ссылка выводится как id с суффиксом _id к имени поля
+            key = f"{field}_id" if reference_mode == ReferenceMode.ID else field
+            result[key] = self.convert_reference(value, reference_mode)
+        elif kind == "value" and type(value) in (str, int, float, bool):
+            result[field] = value
+        else:
+            result[field] = self._convert_item(value)
+
+    def _build_serializer(self, model_type: type):
+        """
+        Построить функцию сериализации класса по плану.
+
+        Поля с еще неизвестным видом (пока встречался только None) обрабатываются
+        общим путем; как только вид становится известен, функция перестраивается.
+        """
+        plan = self.get_plan(model_type)
+        if len(plan) == 0:
+            return lambda obj: {}
+
+        getter = attrgetter(*[field for field, _ in plan])
+        single = len(plan) == 1
+        steps = [(entry[0], f"{entry[0]}_id", entry[1], entry) for entry in plan]
+        convert_field = self._convert_field
+        serializers = self._serializers
+        # Вид поля определен по первому значению - значения другого типа
+        # (например, модель в FilterDto.value) идут общим путем
+        value_types = (str, int, float, bool)
+
+        def serialize(obj) -> dict:
+            values = getter(obj)
+            if single:
+                values = (values,)
+
+            result = {}
+            for (field, key, kind, entry), value in zip(steps, values):
+                if value is None:
+                    result[field] = None
+                elif kind == "value" and type(value) in value_types:
+                    result[field] = value
+                elif kind == "reference":
+                    result[key] = value.id
+                elif kind == "date":
+                    result[field] = value.isoformat()
+                else:
+                    convert_field(result, entry, value, ReferenceMode.ID)
+                    if kind is None:
+                        serializers.pop(model_type, None)
+
+            return result
+
+        return serialize
+
+    @classmethod
+    def get_plan(cls, model_type: type) -> list:
+        """
+        План сериализации класса: поля схемы класса (common.get_schema), без чтения значений.
+        Вид поля определяется по фактическому значению - объявленный тип значения
+        не гарантирует (например, FilterDto.value)
+        """
+        plan = cls._plans.get(model_type)
+        if plan is None:
+            plan = [[field["name"], None] for field in common.get_schema(model_type)]
+            cls._plans[model_type] = plan
+
+        return plan
+
+    @staticmethod
+    def _kind(value) -> str:
+        """Вид поля по значению"""
+        if isinstance(value, AbstractModel):
+            return "reference"
+        if isinstance(value, list):
+            return "list"
+        if isinstance(value, datetime):
+            return "date"
+        if isinstance(value, (str, int, float, bool)):
+            return "value"
+
+        return "other"
+
+    def expand(self, items: list, depth: int = 1) -> dict:
+        """
+        Собрать таблицу связанных моделей для одного ответа.
+
+        Строки ответа выводят ссылки как <поле>_id, а сами связанные модели
+        выводятся один раз в отдельной таблице. Общие объекты (например, единица
+        "грамм" у всех номенклатур) сериализуются один раз за ответ - обработанные
+        объекты запоминаются по идентичности.
+
+        Args:
+            items (list): Модели ответа (строки-словари пропускаются)
+            depth (int): Глубина раскрытия: 1 - ссылки строк, 2 - и ссылки связанных моделей и т.д.
+
+        Returns:
+            dict: id модели -> словарь модели (ссылки внутри - id)
+        """
+        Validator.validate(items, list)
+        Validator.validate(depth, int)
+        if depth < 0:
+            raise ArgumentException("Глубина раскрытия ссылок не может быть отрицательной")
+
+        result = {}
+        # id() объектов, уже сериализованных в этом ответе
+        visited = set()
+        level = [item for item in items if isinstance(item, AbstractModel)]
+
+        for _ in range(depth):
+            next_level = []
+            for item in level:
+                for value in self._references(item):
+                    if id(value) in visited:
+                        continue
+
+                    visited.add(id(value))
+                    result[value.id] = self.convert(value)
+                    next_level.append(value)
+
+            if len(next_level) == 0:
+                break
+            level = next_level
+
+        return result
+
+    @staticmethod
+    def _references(item: AbstractModel) -> list:
+        """Заполненные ссылки модели на другие модели (поля вида reference по схеме класса)"""
+        result = []
+        for field in common.get_schema(type(item)):
+            if field["kind"] not in ("reference", None):
+                continue
+
+            try:
+                value = getattr(item, field["name"])
+            except Exception:
+                continue
+
+            if isinstance(value, AbstractModel):
+                result.append(value)
+
+        return result
+
+    def convert_reference(self, value: AbstractModel, reference_mode: ReferenceMode = ReferenceMode.ID) -> any:
+        """
+        Преобразовать ссылку на модель: id, наименование или вложенный словарь
+        """
+        if value is None:
+            return None
+
+        if reference_mode == ReferenceMode.NAME:
+            return getattr(value, "name", value.id)
+
+        # Вложенный объект выводится на один уровень - его собственные ссылки остаются id
+        if reference_mode == ReferenceMode.FULL:
+            return self.convert(value)
+
+        return self._convert_item(value)
     
     def _convert_item(self, value) -> any:
         """Рекурсивно конвертирует отдельный элемент"""
@@ -57,7 +282,16 @@ class ConvertFactory:
                 return value
     
     def _find_convertor(self, value) -> AbstractConvertor:
+        value_type = type(value)
+        if value_type in self._dispatch:
+            return self._dispatch[value_type]
+
+        # Первый раз для типа - перебираем конверторы и запоминаем результат
+        result = None
         for convertor in self._convertors:
             if convertor.can_convert(value):
-                return convertor
-        return None
\ No newline at end of file
+                result = convertor
+                break
+
+        self._dispatch[value_type] = result
+        return result
\ No newline at end of file
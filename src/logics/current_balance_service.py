@@ -0,0 +1,159 @@
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.source_tracker import SourceTracker
+from src.core.validator import Validator
+from src.logics.convert_factory import ConvertFactory
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+
+
+class CurrentBalanceService:
+    """
+    Материализованные текущие остатки в разрезе (номенклатура, склад).
+
+    Таблица остатков обновляется за O(1) по событию change_transaction при каждом
+    добавлении, изменении и удалении транзакции, поэтому запрос текущего остатка -
+    это чтение из словаря. Если транзакции изменены в обход событий (например,
+    загрузкой стартовых данных), таблица перестраивается при следующем обращении.
+
+    Attributes:
+        __balances (dict): (id номенклатуры, id склада) -> остаток в базовых единицах
+        __nomenclatures (dict): id номенклатуры -> номенклатура
+        __count (int): Количество учтенных транзакций
+    """
+
+    def __init__(self, start_service):
+        self.start_service = start_service
+        self.convert_factory = ConvertFactory()
+        self.__balances = {}
+        self.__nomenclatures = {}
+        self.__count = 0
+        self.__tracker = SourceTracker(start_service)
+        ObserveService.add(self)
+
+    def rebuild(self):
+        """
+        Перестроить таблицу остатков полным пересчетом
+        """
+        transactions = self.start_service.transactions
+        self.__balances = self._calculate(transactions.values())
+        self.__nomenclatures = {t.nomenclature.id: t.nomenclature for t in transactions.values()}
+        self.__count = len(transactions)
+        self.__tracker.mark()
+
+    def get_balance(self, nomenclature: NomenclatureModel, storage: StorageModel) -> float:
+        """
+        Текущий остаток номенклатуры на складе в базовых единицах
+        """
+        Validator.validate(nomenclature, NomenclatureModel)
+        Validator.validate(storage, StorageModel)
+
+        return self._table().get((nomenclature.id, storage.id), 0)
+
+    def get_current_balances_report(self, storage: StorageModel = None) -> list:
+        """
+        Отчет по текущим ненулевым остаткам (по всем складам или по одному)
+        """
+        if storage:
+            Validator.validate(storage, StorageModel)
+
+        totals = {}
+        for (nom_id, storage_id), balance in self._table().items():
+            if storage is None or storage_id == storage.id:
+                totals[nom_id] = totals.get(nom_id, 0) + balance
+
+        report_data = []
+        for nom_id, balance in totals.items():
+            if round(balance, 2) == 0:
+                continue
+
+            nomenclature = self.__nomenclatures[nom_id]
+            nom_dict = self.convert_factory.convert(nomenclature)
+            unit_dict = self.convert_factory.convert(nomenclature.unit_measurement)
+
+            report_data.append({
+                "nomenclature_id": nom_id,
+                "nomenclature_name": nom_dict.get('name', ''),
+                "unit_measurement": unit_dict.get('name', ''),
+                "balance": round(balance, 2)
+            })
+
+        return report_data
+
+    def check_consistency(self) -> list:
+        """
+        Сверить таблицу остатков с полным пересчетом по транзакциям
+
+        Returns:
+            list: Расхождения вида {"nomenclature_id", "storage_id", "stored", "expected"}.
+                  Пустой список - таблица согласована.
+        """
+        table = self._table()
+        expected = self._calculate(self.start_service.transactions.values())
+
+        result = []
+        for key in set(table.keys()) | set(expected.keys()):
+            stored = table.get(key, 0)
+            actual = expected.get(key, 0)
+
+            if round(stored - actual, 6) != 0:
+                result.append({
+                    "nomenclature_id": key[0],
+                    "storage_id": key[1],
+                    "stored": stored,
+                    "expected": actual
+                })
+
+        return result
+
+    def _table(self) -> dict:
+        """
+        Получить таблицу остатков, перестроив ее, если хранилище изменилось в обход событий
+        """
+        if self.__tracker.is_stale(self.__count):
+            self.rebuild()
+
+        return self.__balances
+
+    @staticmethod
+    def _calculate(transactions) -> dict:
+        """
+        Полный расчет остатков по транзакциям
+        """
+        result = {}
+        for transaction in transactions:
+            key = (transaction.nomenclature.id, transaction.storage.id)
+            result[key] = result.get(key, 0) + CurrentBalanceService._delta(transaction)
+
+        return result
+
+    @staticmethod
+    def _delta(transaction) -> float:
+        quantity = transaction.get_quantity_in_base_units()
+        return quantity if transaction.transaction_type == "in" else -quantity
+
+    def _apply(self, transaction, sign: int):
+        key = (transaction.nomenclature.id, transaction.storage.id)
+        self.__balances[key] = self.__balances.get(key, 0) + sign * self._delta(transaction)
+        self.__nomenclatures[transaction.nomenclature.id] = transaction.nomenclature
+        self.__count += sign
+
+    def handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        if event in (EventType.change_unit_key(), EventType.reload_transactions_key()):
+            # Количества в базовых единицах изменились или данные загружены заново -
+            # таблица перестроится при обращении
+            self.__tracker.invalidate()
+
+        elif event == EventType.change_transaction_key():
+            # Таблица еще не построена или построена по другому хранилищу - пересчитается при чтении
+            if not self.__tracker.is_built:
+                return
+
+            if params["old"] is not None:
+                self._apply(params["old"], -1)
+
+            if params["new"] is not None:
+                self._apply(params["new"], 1)
@@ -0,0 +1,237 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, time, timedelta
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.source_tracker import SourceTracker
+from src.core.validator import Validator, ArgumentException
+
+
+class DailyRollupService:
+    """
+    Дневные итоги движений в разрезе (день, номенклатура, склад).
+
+    Итоги обновляются инкрементально по событию change_transaction, поэтому отчет
+    за длинный период читает по одной записи на день и пару (номенклатура, склад)
+    вместо всех транзакций. Транзакции перебираются только за дни, которые
+    разрезаны границей периода (неполные дни на краях).
+    Если транзакции изменены в обход событий, итоги перестраиваются при
+    следующем обращении.
+
+    Реализует паттерн Singleton - итоги общие для всех отчетов.
+
+    Attributes:
+        __rollups (dict): день -> {"totals": {(id номенклатуры, id склада): [приход, расход, количество]},
+                                   "transactions": {id транзакции: транзакция}}
+        __days (list): Отсортированные дни с движениями
+        __nomenclatures (dict): id номенклатуры -> номенклатура
+        __count (int): Количество учтенных транзакций
+    """
+
+    def __new__(cls, start_service):
+        if not hasattr(cls, 'instance'):
+            cls.instance = super(DailyRollupService, cls).__new__(cls)
+
+        return cls.instance
+
+    def __init__(self, start_service):
+        self.start_service = start_service
+        self.__rollups = {}
+        self.__days = []
+        self.__nomenclatures = {}
+        self.__count = 0
+        self.__tracker = SourceTracker(start_service)
+        ObserveService.add(self)
+
+    @property
+    def nomenclatures(self) -> dict:
+        self.__check_source()
+        return self.__nomenclatures
+
+    @property
+    def days_count(self) -> int:
+        self.__check_source()
+        return len(self.__days)
+
+    @property
+    def rows_count(self) -> int:
+        """Количество строк дневных итогов"""
+        self.__check_source()
+        return sum(len(rollup["totals"]) for rollup in self.__rollups.values())
+
+    def rebuild(self):
+        """
+        Перестроить дневные итоги полным пересчетом
+        """
+        transactions = self.start_service.transactions
+        self.__rollups = {}
+        self.__days = []
+        self.__nomenclatures = {}
+        self.__count = 0
+
+        for transaction in transactions.values():
+            self.__apply(transaction, 1)
+
+        self.__tracker.mark()
+
+    def aggregate(self, bounds: list, end_date: datetime, storage_ids: set = None,
+                  nomenclature_ids: set = None) -> list:
+        """
+        Разложить движения до end_date (включительно) по интервалам между границами
+
+        Args:
+            bounds (list): Отсортированные границы интервалов [b0, b1, ..., bn]
+            end_date (datetime): Дата, после которой движения не учитываются
+            storage_ids (set): id складов (опционально, по умолчанию все)
+            nomenclature_ids (set): id номенклатур (опционально, по умолчанию все)
+
+        Returns:
+            list: n + 2 словаря (id номенклатуры, id склада) -> [приход, расход, количество]:
+                  движения до b0, затем [b0, b1), ..., [bn, end_date]
+        """
+        Validator.validate(bounds, list)
+        Validator.validate(end_date, datetime)
+        if len(bounds) == 0:
+            raise ArgumentException("Не указаны границы интервалов")
+
+        self.__check_source()
+        result = [{} for _ in range(len(bounds) + 1)]
+        last_day = end_date.date()
+
+        for day in self.__days[:bisect_right(self.__days, last_day)]:
+            rollup = self.__rollups[day]
+            day_start = datetime.combine(day, time.min)
+            day_end = day_start + timedelta(days=1)
+            index = bisect_right(bounds, day_start)
+
+            # День целиком внутри одного интервала - берем итог дня
+            if (index == len(bounds) or bounds[index] >= day_end) and day_end - timedelta(microseconds=1) <= end_date:
+                for key, values in rollup["totals"].items():
+                    if (storage_ids is None or key[1] in storage_ids) and \
+                            (nomenclature_ids is None or key[0] in nomenclature_ids):
+                        self.__add(result[index], key, values[0], values[1], values[2])
+                continue
+
+            # Неполный день - перебираем его транзакции
+            for transaction in rollup["transactions"].values():
+                if transaction.date > end_date:
+                    continue
+                if storage_ids is not None and transaction.storage.id not in storage_ids:
+                    continue
+                if nomenclature_ids is not None and transaction.nomenclature.id not in nomenclature_ids:
+                    continue
+
+                quantity = transaction.get_quantity_in_base_units()
+                key = (transaction.nomenclature.id, transaction.storage.id)
+                if transaction.transaction_type == "in":
+                    self.__add(result[bisect_right(bounds, transaction.date)], key, quantity, 0, 1)
+                else:
+                    self.__add(result[bisect_right(bounds, transaction.date)], key, 0, quantity, 1)
+
+        return result
+
+    def check_consistency(self) -> list:
+        """
+        Сверить дневные итоги с полным пересчетом по транзакциям
+
+        Returns:
+            list: Расхождения вида {"day", "nomenclature_id", "storage_id", "stored", "expected"}.
+                  Пустой список - итоги согласованы.
+        """
+        self.__check_source()
+        expected = {}
+        for transaction in self.start_service.transactions.values():
+            quantity = transaction.get_quantity_in_base_units()
+            values = expected.setdefault(
+                (transaction.date.date(), transaction.nomenclature.id, transaction.storage.id), [0, 0, 0]
+            )
+            values[0 if transaction.transaction_type == "in" else 1] += quantity
+            values[2] += 1
+
+        stored = {}
+        for day, rollup in self.__rollups.items():
+            for (nom_id, storage_id), values in rollup["totals"].items():
+                stored[(day, nom_id, storage_id)] = values
+
+        result = []
+        for key in set(stored.keys()) | set(expected.keys()):
+            stored_values = stored.get(key, [0, 0, 0])
+            expected_values = expected.get(key, [0, 0, 0])
+
+            if any(round(a - b, 6) != 0 for a, b in zip(stored_values, expected_values)):
+                result.append({
+                    "day": key[0].isoformat(),
+                    "nomenclature_id": key[1],
+                    "storage_id": key[2],
+                    "stored": list(stored_values),
+                    "expected": list(expected_values)
+                })
+
+        return result
+
+    @staticmethod
+    def __add(totals: dict, key: tuple, income: float, outcome: float, count: int):
+        values = totals.get(key)
+        if values is None:
+            values = [0, 0, 0]
+            totals[key] = values
+
+        values[0] += income
+        values[1] += outcome
+        values[2] += count
+
+    def __apply(self, transaction, sign: int):
+        day = transaction.date.date()
+        rollup = self.__rollups.get(day)
+        if rollup is None:
+            rollup = {"totals": {}, "transactions": {}}
+            self.__rollups[day] = rollup
+            insort(self.__days, day)
+
+        key = (transaction.nomenclature.id, transaction.storage.id)
+        quantity = sign * transaction.get_quantity_in_base_units()
+        if transaction.transaction_type == "in":
+            self.__add(rollup["totals"], key, quantity, 0, sign)
+        else:
+            self.__add(rollup["totals"], key, 0, quantity, sign)
+
+        if sign > 0:
+            rollup["transactions"][transaction.id] = transaction
+            self.__nomenclatures[transaction.nomenclature.id] = transaction.nomenclature
+        else:
+            rollup["transactions"].pop(transaction.id, None)
+            if rollup["totals"][key][2] == 0:
+                del rollup["totals"][key]
+
+            # Пустой день убираем из итогов
+            if not rollup["transactions"]:
+                del self.__rollups[day]
+                del self.__days[bisect_left(self.__days, day)]
+
+        self.__count += sign
+
+    def __check_source(self):
+        """
+        Транзакции изменены в обход событий (например, перезагрузкой данных) - итоги устарели
+        """
+        if self.__tracker.is_stale(self.__count):
+            self.rebuild()
+
+    def handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        if event in (EventType.change_unit_key(), EventType.reload_transactions_key()):
+            # Количества в базовых единицах изменились или данные загружены заново -
+            # итоги перестроятся при обращении
+            self.__tracker.invalidate()
+
+        elif event == EventType.change_transaction_key():
+            # Итоги еще не построены или построены по другому хранилищу - пересчитаются при чтении
+            if not self.__tracker.is_built:
+                return
+
+            if params["old"] is not None:
+                self.__apply(params["old"], -1)
+
+            if params["new"] is not None:
+                self.__apply(params["new"], 1)
@@ -1,10 +1,10 @@
-import json
 from datetime import datetime
 from src.core.observe_service import ObserveService
 from src.core.event_type import EventType
 from src.core.validator import Validator
 from src.start_service import StartService
 from src.logics.convert_factory import ConvertFactory
+from src.logics.json_encoder import JsonEncoder
 
 class ExportService:
     """
@@ -14,6 +14,7 @@ class ExportService:
     def __init__(self, start_service):
         self.start_service = start_service
         self.convert_factory = ConvertFactory()
+        self.json_encoder = JsonEncoder()
         ObserveService.add(self)
         
     
@@ -40,8 +41,8 @@ class ExportService:
         }
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2, default=str)
+            with open(file_path, 'wb') as f:
+                f.write(self.json_encoder.encode(export_data, indent=True))
             return True
         except Exception as e:
             raise Exception(f"Ошибка при экспорте данных: {str(e)}")
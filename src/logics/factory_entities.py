@@ -2,6 +2,7 @@ from src.logics.response_csv import ResponseCsv
 from src.logics.response_markdown import ResponseMarkdown
 from src.logics.response_json import ResponseJson
 from src.logics.response_xml import ResponseXml
+from src.logics.response_json_lines import ResponseJsonLines
 from src.core.abstract_response import AbstractResponse
 from src.core.abstract_model import AbstractModel
 from src.core.validator import Validator, OperationException
@@ -25,7 +26,8 @@ class FactoryEntities:
         "CSV": ResponseCsv,        # Формат CSV
         "Markdown": ResponseMarkdown,  # Формат Markdown
         "Json": ResponseJson,      # Формат JSON
-        "XML": ResponseXml         # Формат XML
+        "XML": ResponseXml,        # Формат XML
+        "JsonLines": ResponseJsonLines  # Формат JSON Lines (построчная выдача)
     }
 
     def __init__(self, settings: Settings = None):
@@ -68,7 +70,7 @@ class FactoryEntities:
         Создать форматтер ответа для указанного формата.
         
         Args:
-            format (str): Название формата (CSV, Markdown, Json, XML)
+            format (str): Название формата (CSV, Markdown, Json, XML, JsonLines)
             
         Returns:
             AbstractResponse: Экземпляр класса форматтера для указанного формата
@@ -0,0 +1,86 @@
+from src.core.validator import Validator
+from src.models.unit_measurement_model import UnitMeasurement
+
+
+class GroupRollup:
+    """
+    Промежуточные итоги отчетов по иерархии групп номенклатуры.
+
+    Итоги считаются снизу вверх по уже агрегированным строкам отчета (по одной
+    строке на номенклатуру): значения строки добавляются в ее группу и во все
+    группы-предки. Повторного прохода по транзакциям не требуется.
+
+    Если отчет выведен в единице unit, строки номенклатур, единицу которых нельзя
+    к ней привести, остались в своих единицах - в итоги групп они не входят.
+    """
+
+    @staticmethod
+    def build(report_data: list, nomenclatures: list, fields: list, unit: UnitMeasurement = None) -> list:
+        """
+        Сформировать итоги по группам
+
+        Args:
+            report_data (list): Строки отчета с полем nomenclature_id
+            nomenclatures (list): Номенклатуры, на которые ссылаются строки
+            fields (list): Суммируемые числовые поля строк
+            unit (UnitMeasurement): Единица вывода отчета (опционально)
+
+        Returns:
+            list: Строки итогов {"group_id", "group_name", "parent_id", "level",
+                  "nomenclature_count", <поля>} - группа идет перед своими подгруппами
+        """
+        Validator.validate(report_data, list)
+        Validator.validate(nomenclatures, list)
+        Validator.validate(fields, list)
+        if unit:
+            Validator.validate(unit, UnitMeasurement)
+
+        root_id = unit.resolve_base()[0].id if unit else None
+        nomenclatures_by_id = {nomenclature.id: nomenclature for nomenclature in nomenclatures}
+        totals = {}
+
+        for row in report_data:
+            nomenclature = nomenclatures_by_id.get(row.get("nomenclature_id"))
+            if nomenclature is None or nomenclature.group_nomenclature is None:
+                continue
+
+            # Строка в единицах, не приводимых к единице вывода, - не складываем с остальными
+            if root_id is not None and nomenclature.unit_measurement.resolve_base()[0].id != root_id:
+                continue
+
+            for group in nomenclature.group_nomenclature.path():
+                total = totals.get(group.id)
+                if total is None:
+                    total = {"group": group, "values": dict.fromkeys(fields, 0), "count": 0}
+                    totals[group.id] = total
+
+                for field in fields:
+                    total["values"][field] += row.get(field, 0)
+                total["count"] += 1
+
+        # Раскладываем группы по родителям для вывода в порядке иерархии
+        children = {}
+        for total in totals.values():
+            parent = total["group"].parent
+            children.setdefault(parent.id if parent else None, []).append(total)
+
+        result = []
+        GroupRollup.__append_level(result, children, None, 0, fields)
+        return result
+
+    @staticmethod
+    def __append_level(result: list, children: dict, parent_id, level: int, fields: list):
+        for total in sorted(children.get(parent_id, []), key=lambda item: item["group"].name):
+            group = total["group"]
+            row = {
+                "group_id": group.id,
+                "group_name": group.name,
+                "parent_id": parent_id or "",
+                "level": level,
+                "nomenclature_count": total["count"]
+            }
+            for field in fields:
+                row[field] = round(total["values"][field], 2)
+
+            result.append(row)
+            GroupRollup.__append_level(result, children, group.id, level + 1, fields)
@@ -0,0 +1,365 @@
+import json
+from datetime import datetime
+from src.core.validator import Validator, ArgumentException, OperationException
+from src.core.observe_service import ObserveService
+from src.core.event_type import EventType
+from src.repository import Repository
+from src.models.unit_measurement_model import UnitMeasurement
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.recipe_model import RecipeModel
+from src.models.transaction_model import TransactionModel
+
+
+class JsonStreamReader:
+    """
+    Потоковое чтение файла экспорта вида {"раздел": [элемент, ...], ...}.
+
+    Файл читается блоками, элементы массивов разбираются по одному через
+    json.JSONDecoder.raw_decode - в памяти держится только текущий блок,
+    а не весь документ.
+    """
+
+    def __init__(self, stream, chunk_size: int = 1024 * 1024):
+        Validator.validate(chunk_size, int)
+        self.__stream = stream
+        self.__chunk_size = chunk_size
+        self.__decoder = json.JSONDecoder()
+        self.__buffer = ""
+        self.__position = 0
+        self.__eof = False
+
+    def sections(self):
+        """
+        Элементы разделов документа
+
+        Yields:
+            tuple: (раздел, элемент, False) для каждого элемента массива и
+                   (раздел, None, True) в конце массива. Разделы-значения пропускаются
+        """
+        self.__expect("{")
+        if self.__peek() == "}":
+            return
+
+        while True:
+            section = self.__value()
+            if not isinstance(section, str):
+                raise ArgumentException("Некорректный формат файла: ожидалось имя раздела")
+            self.__expect(":")
+
+            if self.__peek() == "[":
+                self.__position += 1
+                if self.__peek() == "]":
+                    self.__position += 1
+                else:
+                    while True:
+                        yield section, self.__value(), False
+                        if not self.__separator("]"):
+                            break
+
+                yield section, None, True
+            else:
+                self.__value()
+
+            if not self.__separator("}"):
+                return
+
+    def __fill(self) -> bool:
+        chunk = self.__stream.read(self.__chunk_size)
+        if not chunk:
+            self.__eof = True
+            return False
+
+        self.__buffer = self.__buffer[self.__position:] + chunk
+        self.__position = 0
+        return True
+
+    def __peek(self) -> str:
+        """Следующий значащий символ ("" - конец файла)"""
+        while True:
+            while self.__position < len(self.__buffer) and self.__buffer[self.__position] in " \t\r\n":
+                self.__position += 1
+
+            if self.__position < len(self.__buffer):
+                return self.__buffer[self.__position]
+
+            if not self.__fill():
+                return ""
+
+    def __expect(self, char: str):
+        if self.__peek() != char:
+            raise ArgumentException(f"Некорректный формат файла: ожидался символ '{char}'")
+        self.__position += 1
+
+    def __separator(self, closing: str) -> bool:
+        """Разделитель элементов: True - дальше следующий элемент, False - конец"""
+        char = self.__peek()
+        self.__position += 1
+        if char == ",":
+            return True
+        if char == closing:
+            return False
+
+        raise ArgumentException(f"Некорректный формат файла: ожидался символ ',' или '{closing}'")
+
+    def __value(self):
+        self.__peek()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+                # Значение должно заканчиваться разделителем: число на границе блока
+                # может оказаться неполным ("2." из "2.5") - тогда дочитываем
+                if (end < len(self.__buffer) and self.__buffer[end] in ",:]} \t\r\n") or self.__eof:
+                    self.__position = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.__eof:
+                    raise ArgumentException(f"Некорректный формат файла: {e}")
+
+            self.__fill()
+
+
+class ImportService:
+    """
+    Сервис загрузки данных из файла экспорта (data/data.json) в репозиторий.
+
+    Файл читается потоково, модели создаются в порядке зависимостей
+    (единицы -> группы -> номенклатуры -> склады -> рецепты -> транзакции), ссылки
+    <поле>_id разрешаются по словарю id -> модель. Если раздел в файле идет раньше
+    разделов, от которых он зависит, его элементы откладываются до их загрузки.
+    Ссылки внутри справочника (базовая единица, родительская группа) разрешаются
+    после загрузки всего раздела.
+
+    Для доверенного файла (выгрузки ExportService) модели создаются без
+    повторной проверки значений - поля заполняются напрямую. Данные репозитория
+    заменяются только после успешной загрузки всего файла.
+    """
+
+    def __init__(self, start_service):
+        self.start_service = start_service
+
+    @staticmethod
+    def sections() -> list:
+        """Разделы файла экспорта в порядке зависимостей"""
+        return ["units_measure", "groups_nomenclature", "nomenclatures", "storages", "recipes", "transactions"]
+
+    @staticmethod
+    def repository_keys() -> dict:
+        """Раздел файла экспорта -> ключ репозитория"""
+        return {
+            "units_measure": Repository.unit_measure_key,
+            "groups_nomenclature": Repository.group_nomenclature_key,
+            "nomenclatures": Repository.nomenclature_key,
+            "storages": Repository.storage_key,
+            "recipes": Repository.recipe_key,
+            "transactions": Repository.transaction_key
+        }
+
+    def import_all_data(self, file_path: str, trusted: bool = True, chunk_size: int = 1024 * 1024) -> dict:
+        """
+        Загрузить все данные из JSON файла экспорта
+
+        Args:
+            file_path (str): Путь к файлу
+            trusted (bool): Файл сформирован ExportService - значения не проверяются повторно
+            chunk_size (int): Размер блока чтения файла в символах
+
+        Returns:
+            dict: Раздел -> количество загруженных моделей
+        """
+        Validator.validate(file_path, str)
+        Validator.validate(trusted, bool)
+
+        self.__trusted = trusted
+        self.__loaded = {section: {} for section in self.sections()}
+        self.__links = {section: [] for section in self.sections()}
+        builders = {
+            "units_measure": self.__build_unit,
+            "groups_nomenclature": self.__build_group,
+            "nomenclatures": self.__build_nomenclature,
+            "storages": self.__build_storage,
+            "recipes": self.__build_recipe,
+            "transactions": self.__build_transaction
+        }
+
+        received = set()
+        done = set()
+        pending = {}
+
+        try:
+            with open(file_path, "r", encoding="utf-8") as stream:
+                for section, item, is_end in JsonStreamReader(stream, chunk_size).sections():
+                    if section not in builders:
+                        continue
+
+                    if is_end:
+                        received.add(section)
+                        self.__flush(builders, received, done, pending)
+                    elif self.__is_ready(section, done):
+                        self.__loaded[section][item["id"]] = builders[section](item)
+                    else:
+                        pending.setdefault(section, []).append(item)
+
+            # Отсутствующие в файле разделы считаются пустыми
+            received.update(self.sections())
+            self.__flush(builders, received, done, pending)
+        except OSError as e:
+            raise OperationException(f"Ошибка при импорте данных: {str(e)}")
+        except (KeyError, TypeError, ValueError) as e:
+            raise ArgumentException(f"Некорректные данные в файле импорта: {str(e)}")
+
+        for section, repository_key in self.repository_keys().items():
+            self.start_service.data[repository_key] = self.__loaded[section]
+
+        # Индексы, итоги и кэши по прежним транзакциям устарели
+        ObserveService.create_event(EventType.reload_transactions_key(), None)
+
+        return {section: len(items) for section, items in self.__loaded.items()}
+
+    def __is_ready(self, section: str, done: set) -> bool:
+        """Все разделы, от которых зависит раздел, уже загружены"""
+        sections = self.sections()
+        return all(previous in done for previous in sections[:sections.index(section)])
+
+    def __flush(self, builders: dict, received: set, done: set, pending: dict):
+        """Завершить по порядку разделы, которые полностью прочитаны и готовы к загрузке"""
+        for section in self.sections():
+            if section in done:
+                continue
+            if section not in received:
+                return
+
+            for item in pending.pop(section, []):
+                self.__loaded[section][item["id"]] = builders[section](item)
+
+            self.__resolve_links(section)
+            done.add(section)
+
+    def __resolve(self, section: str, item_id):
+        """Модель по id (None - ссылка не заполнена)"""
+        if item_id is None:
+            return None
+
+        item = self.__loaded[section].get(item_id)
+        if item is None:
+            raise ArgumentException(f"Не найдена ссылка '{item_id}' на раздел '{section}'")
+
+        return item
+
+    def __resolve_links(self, section: str):
+        """Разрешить ссылки внутри раздела: базовые единицы и родительские группы"""
+        for item, field, item_id in self.__links[section]:
+            value = self.__resolve(section, item_id)
+            if self.__trusted:
+                item.__dict__[field] = value
+            elif isinstance(item, UnitMeasurement):
+                item.base_unit = value
+                item.resolve_base()
+            else:
+                item.parent = value
+
+        self.__links[section] = []
+
+    @staticmethod
+    def __create(model_type: type, values: dict):
+        """Создать модель из доверенных значений без конструктора и проверок"""
+        item = model_type.__new__(model_type)
+        item.__dict__.update(values)
+        return item
+
+    def __build_unit(self, data: dict) -> UnitMeasurement:
+        if self.__trusted:
+            item = self.__create(UnitMeasurement, {
+                "_AbstractModel__id": data["id"],
+                "_EntityModel__name": data["name"],
+                "_UnitMeasurement__coefficient": data["coefficient"]
+            })
+        else:
+            item = UnitMeasurement(data["name"], data["coefficient"])
+            item.id = data["id"]
+
+        if data.get("base_unit_id") is not None:
+            self.__links["units_measure"].append((item, "_UnitMeasurement__base_unit", data["base_unit_id"]))
+
+        return item
+
+    def __build_group(self, data: dict) -> GroupNomenclatureModel:
+        if self.__trusted:
+            item = self.__create(GroupNomenclatureModel, {
+                "_AbstractModel__id": data["id"],
+                "_EntityModel__name": data["name"]
+            })
+        else:
+            item = GroupNomenclatureModel()
+            item.id = data["id"]
+            item.name = data["name"]
+
+        if data.get("parent_id") is not None:
+            self.__links["groups_nomenclature"].append((item, "_GroupNomenclatureModel__parent", data["parent_id"]))
+
+        return item
+
+    def __build_nomenclature(self, data: dict) -> NomenclatureModel:
+        group = self.__resolve("groups_nomenclature", data.get("group_nomenclature_id"))
+        unit = self.__resolve("units_measure", data.get("unit_measurement_id"))
+
+        if self.__trusted:
+            return self.__create(NomenclatureModel, {
+                "_AbstractModel__id": data["id"],
+                "_EntityModel__name": data["name"],
+                "_NomenclatureModel__full_name": data["full_name"],
+                "_NomenclatureModel__group_nomenclature": group,
+                "_NomenclatureModel__unit_measurement": unit
+            })
+
+        item = NomenclatureModel(data["name"], data["full_name"], group, unit)
+        item.id = data["id"]
+        return item
+
+    def __build_storage(self, data: dict) -> StorageModel:
+        if self.__trusted:
+            return self.__create(StorageModel, {
+                "_AbstractModel__id": data["id"],
+                "_EntityModel__name": data["name"]
+            })
+
+        item = StorageModel(data["name"])
+        item.id = data["id"]
+        return item
+
+    def __build_recipe(self, data: dict) -> RecipeModel:
+        if self.__trusted:
+            item = self.__create(RecipeModel, {
+                "_AbstractModel__id": data["id"],
+                "_EntityModel__name": data["name"],
+                "_RecipeModel__description": data["description"]
+            })
+        else:
+            item = RecipeModel(data["name"], data["description"])
+            item.id = data["id"]
+
+        # Состав рецепта у каждой модели свой, а не общий словарь класса
+        item.__dict__["_RecipeModel__ingredients"] = dict(data.get("ingredients") or {})
+        return item
+
+    def __build_transaction(self, data: dict) -> TransactionModel:
+        nomenclature = self.__resolve("nomenclatures", data["nomenclature_id"])
+        storage = self.__resolve("storages", data["storage_id"])
+        unit = self.__resolve("units_measure", data["unit_measurement_id"])
+        date = datetime.fromisoformat(data["date"])
+
+        if self.__trusted:
+            return self.__create(TransactionModel, {
+                "_AbstractModel__id": data["id"],
+                "_TransactionModel__date": date,
+                "_TransactionModel__nomenclature": nomenclature,
+                "_TransactionModel__storage": storage,
+                "_TransactionModel__quantity": float(data["quantity"]),
+                "_TransactionModel__unit_measurement": unit,
+                "_TransactionModel__transaction_type": data["transaction_type"]
+            })
+
+        item = TransactionModel(date, nomenclature, storage, data["quantity"], unit, data["transaction_type"])
+        item.id = data["id"]
+        return item
@@ -0,0 +1,114 @@
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from src.core.abstract_model import AbstractModel
+from src.core.validator import Validator, ArgumentException, OperationException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonEncoder:
+    """
+    Кодирование ответов в JSON сразу в байты UTF-8.
+
+    Бэкенд подключаемый: orjson, если пакет установлен, иначе стандартный модуль json
+    (компактные разделители, без экранирования кириллицы). Типы, которых нет в JSON,
+    обрабатываются явными обработчиками по типу значения (с учетом наследования) -
+    неизвестный тип приводит к ошибке, а не к выводу str(value).
+    """
+
+    # Тип значения -> функция преобразования в тип JSON
+    __handlers = {
+        datetime: lambda value: value.isoformat(),
+        date: lambda value: value.isoformat(),
+        time: lambda value: value.isoformat(),
+        Enum: lambda value: value.value,
+        uuid.UUID: str,
+        Decimal: float,
+        AbstractModel: lambda value: value.id,
+        set: list,
+        frozenset: list
+    }
+
+    def __init__(self, backend: str = None):
+        """
+        Args:
+            backend (str): "orjson" или "stdlib" (по умолчанию - orjson, если установлен)
+        """
+        if backend is None:
+            backend = "orjson" if orjson is not None else "stdlib"
+
+        Validator.validate(backend, str)
+        if backend not in ("orjson", "stdlib"):
+            raise ArgumentException(f"Неизвестный бэкенд JSON: {backend}")
+        if backend == "orjson" and orjson is None:
+            raise OperationException("Пакет orjson не установлен")
+
+        self.__backend = backend
+        self.__compact = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=self.to_primitive)
+        self.__indented = json.JSONEncoder(ensure_ascii=False, indent=2, default=self.to_primitive)
+
+    @property
+    def backend(self) -> str:
+        return self.__backend
+
+    @staticmethod
+    def available_backends() -> list:
+        """Бэкенды, доступные в текущем окружении"""
+        return ["orjson", "stdlib"] if orjson is not None else ["stdlib"]
+
+    @staticmethod
+    def register(value_type: type, handler):
+        """
+        Зарегистрировать обработчик типа значения
+
+        Args:
+            value_type (type): Тип значения (обработчик действует и для наследников)
+            handler: Функция value -> значение, которое можно записать в JSON
+        """
+        Validator.validate(value_type, type)
+        if not callable(handler):
+            raise ArgumentException("Обработчик типа должен быть функцией")
+
+        JsonEncoder.__handlers[value_type] = handler
+
+    @staticmethod
+    def to_primitive(value):
+        """
+        Преобразовать значение типа, которого нет в JSON, по зарегистрированному обработчику
+
+        Raises:
+            TypeError: Для типа нет обработчика
+        """
+        for value_type in type(value).__mro__:
+            handler = JsonEncoder.__handlers.get(value_type)
+            if handler is not None:
+                return handler(value)
+
+        raise TypeError(f"Тип {type(value).__name__} не поддерживается для вывода в JSON")
+
+    def encode(self, value, indent: bool = False) -> bytes:
+        """
+        Закодировать значение в JSON
+
+        Args:
+            value: Словари, списки и простые значения
+            indent (bool): Вывод с отступами (например, для файлов выгрузки)
+
+        Returns:
+            bytes: JSON в кодировке UTF-8
+        """
+        if self.__backend == "orjson":
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+
+            return orjson.dumps(value, default=self.to_primitive, option=option)
+
+        encoder = self.__indented if indent else self.__compact
+        return encoder.encode(value).encode("utf-8")
@@ -3,7 +3,7 @@ from src.core.observe_service import ObserveService
 from src.core.prototype import Prototype
 from src.dtos.filter_dto import FilterDto
 from src.models.filter_type import FilterType
-from src.core.validator import Validator, ArgumentException
+from src.core.validator import Validator, ArgumentException, OperationException
 from src.start_service import StartService
 
 class ReferenceService:
@@ -71,7 +71,8 @@ class ReferenceService:
         else:
             raise ArgumentException(f"Неизвестный тип справочника: {reference_type}")
         
-        ObserveService.create_event(EventType.change_reference_type_key(), None)
+        ObserveService.create_event(EventType.change_reference_type_key(),
+                                    {"reference_type": reference_type, "item": item})
         return item
 
     def update_reference_item(self, reference_type: str, item_id: str, item_data: dict):
@@ -94,7 +95,8 @@ class ReferenceService:
         else:
             raise ArgumentException(f"Неизвестный тип справочника: {reference_type}")
         
-        ObserveService.create_event(EventType.change_reference_type_key(), None)
+        ObserveService.create_event(EventType.change_reference_type_key(),
+                                    {"reference_type": reference_type, "item": item})
         return item
     
 
@@ -117,7 +119,8 @@ class ReferenceService:
         else:
             raise ArgumentException(f"Неизвестный тип справочника: {reference_type}")
         
-        ObserveService.create_event(EventType.change_reference_type_key(), None)
+        ObserveService.create_event(EventType.change_reference_type_key(),
+                                    {"reference_type": reference_type, "item": item})
 
     
     # Методы для работы с номенклатурами
@@ -249,7 +252,18 @@ class ReferenceService:
                 base_unit = next((u for u in units if u.id == base_unit_id), None)
                 if not base_unit:
                     raise ArgumentException(f"Базовая единица измерения с ID '{base_unit_id}' не найдена")
+
+                # Не допускаем циклов в цепочке базовых единиц
+                previous_base_unit = existing_item.base_unit
                 existing_item.base_unit = base_unit
+                try:
+                    existing_item.resolve_base()
+                except OperationException:
+                    existing_item.base_unit = previous_base_unit
+                    raise ArgumentException(f"Базовая единица измерения с ID '{base_unit_id}' образует цикл")
+
+        if 'coefficient' in item_data or 'base_unit_id' in item_data:
+            ObserveService.create_event(EventType.change_unit_key(), {"unit": existing_item})
         
         return existing_item
     
@@ -274,6 +288,7 @@ class ReferenceService:
         # Создание новой группы
         group = GroupNomenclatureModel()
         group.name = item_data['name']
+        group.parent = self._find_parent_group(item_data.get('parent_id'))
         
         # Добавление в хранилище
         key = f"group_{len(self.start_service.groups_nomenclature)}"
@@ -285,8 +300,22 @@ class ReferenceService:
         if 'name' in item_data:
             Validator.validate(item_data['name'], str, name="name")
             existing_item.name = item_data['name']
+
+        if 'parent_id' in item_data:
+            existing_item.parent = self._find_parent_group(item_data['parent_id'])
         
         return existing_item
+
+    def _find_parent_group(self, parent_id):
+        if parent_id is None:
+            return None
+
+        groups = list(self.start_service.groups_nomenclature.values())
+        parent = next((g for g in groups if g.id == parent_id), None)
+        if not parent:
+            raise ArgumentException(f"Родительская группа номенклатуры с ID '{parent_id}' не найдена")
+
+        return parent
     
     def _delete_group_nomenclature(self, item):
         # Проверяем использование группы номенклатуры
@@ -8,20 +8,24 @@ class ResponseCsv(AbstractResponse):
     Класс для формирования ответов в формате CSV (Comma-Separated Values).
     
     Наследует от AbstractResponse и реализует преобразование списка объектов
-    в CSV формат с разделителем точка с запятой (;). Обеспечивает корректное
-    экранирование значений содержащих специальные символы.
+    в CSV формат с разделителем точка с запятой (;). Ответ формируется построчно
+    генератором, поэтому выгрузка любого объема не накапливается в памяти.
     
     Особенности реализации:
     - Разделитель: точка с запятой (;)
-    - Экранирование строк в двойных кавычках при наличии разделителей или переносов
-    - Преобразование объектов моделей в их имена
+    - Экранирование по RFC 4180: значение с разделителем, кавычкой или переносом
+      строки заключается в двойные кавычки, кавычки внутри удваиваются
+    - План колонок строится по первой строке: для моделей по схеме класса,
+      преобразование значения выбирается по виду поля один раз
+    - Преобразование объектов моделей в их имена, пустые ссылки - пустое значение
     - Сериализация словарей в строку формата "key1:value1, key2:value2"
     
     Пример выходного формата:
     name;coefficient;base_unit
     грамм;1;
     килограмм;1000;грамм
-    "Специальный;продукт";200;"ингредиент:мука, тип:пшеничная"
+    "Специальный;продукт";200;ингредиент:мука, тип:пшеничная
+    "Сорт ""Экстра"" (мука)";1;
     """
 
     def __init__(self):
@@ -35,8 +39,6 @@ class ResponseCsv(AbstractResponse):
         Сформировать CSV представление данных.
         
         Создает CSV строку с заголовками столбцов (имена полей) и данными.
-        Обеспечивает корректное экранирование значений содержащих разделители
-        или символы переноса строки.
         
         Args:
             format (str): Название формата (игнорируется для CSV, сохраняется для совместимости)
@@ -57,58 +59,84 @@ class ResponseCsv(AbstractResponse):
         if len(data) == 0:
             raise OperationException("Нет данных!")
 
-        text = ""
-        
-        # Создание шапки таблицы (заголовки столбцов)
-        # Берем первый элемент для определения структуры полей
-        item = data[0]
-        
-        # Получаем список полей объекта (исключая словари и списки)
-        fields = common.get_fields(item, is_common=True)
-        
-        # Формирование строки с заголовками столбцов
-        headers = []
-        for field in fields:
-            headers.append(field)
-        
-        # Создание строки заголовков с разделителем точка с запятой
-        text += ";".join(headers) + "\n"
+        return "".join(self.stream(format, data))
+
+    def stream(self, format: str, data):
+        """
+        Сформировать CSV по частям: шапка по первой строке, затем по одной строке данных.
+
+        Args:
+            format (str): Название формата (игнорируется для CSV, сохраняется для совместимости)
+            data: Итерируемый источник объектов (например, генератор строк отчета)
 
-        # Заполнение таблицы данными
+        Yields:
+            str: Строка шапки, затем строки данных. Пустой источник - пустой ответ.
+        """
+        Validator.validate(format, str)
+
+        fields = None
         for item in data:
-            row = []
-            
-            # Обработка каждого поля текущего объекта
-            for field in fields:
-                value = getattr(item, field)
-                
-                # Обработка объектов моделей (имеющих атрибут 'name')
-                if hasattr(value, 'name'):
-                    # Для моделей используем значение поля 'name'
-                    row.append(str(value.name))
-                
-                # Обработка словарей
-                elif isinstance(value, dict):
-                    # Для словарей создаем строку формата "key1:value1, key2:value2"
-                    dict_str = ", ".join([f"{k}:{v}" for k, v in value.items()])
-                    
-                    # Экранируем строку словаря в двойных кавычках
-                    # для предотвращения конфликтов с разделителями
-                    row.append(f'"{dict_str}"')
-                
-                # Обработка строк содержащих специальные символы
-                elif isinstance(value, str) and (';' in value or '\n' in value):
-                    # Экранируем строки содержащие разделители или переносы строк
-                    # в двойных кавычках согласно стандарту CSV
-                    row.append(f'"{value}"')
-                
-                # Обработка простых типов данных
-                else:
-                    # Для простых типов преобразуем в строку
-                    row.append(str(value))
-            
-            # Добавление строки с данными в CSV
-            # Все значения объединяются через разделитель точка с запятой
-            text += ";".join(row) + "\n"
+            if fields is None:
+                columns = self._columns(item)
+                fields = [field for field, _ in columns]
+                convertors = [self.__convertor(kind) for _, kind in columns]
+                yield ";".join(self._quote(field) for field in fields) + "\n"
+
+            values = common.get_values(item, fields)
+            yield ";".join([convert(value) for convert, value in zip(convertors, values)]) + "\n"
+
+    @staticmethod
+    def _quote(text: str) -> str:
+        """
+        Экранировать значение по RFC 4180
+        """
+        if '"' in text:
+            return '"' + text.replace('"', '""') + '"'
+        if ';' in text or '\n' in text or '\r' in text:
+            return '"' + text + '"'
+
+        return text
+
+    def __convertor(self, kind: str):
+        """
+        Функция преобразования значения колонки в текст по виду поля
+        """
+        if kind == "value":
+            return self.__value_cell
+        if kind == "reference":
+            return self.__reference_cell
+
+        return self.__cell
+
+    def __value_cell(self, value) -> str:
+        if value is None:
+            return ""
+
+        # Числа и логические значения экранировать не нужно
+        if isinstance(value, str):
+            return self._quote(value)
+
+        return str(value)
+
+    def __reference_cell(self, value) -> str:
+        if value is None:
+            return ""
+
+        return self._quote(self._reference_text(value))
+
+    def __cell(self, value) -> str:
+        """
+        Значение колонки неизвестного заранее вида (строки отчетов, даты, перечисления)
+        """
+        if value is None:
+            return ""
+
+        # Обработка объектов моделей (имеющих атрибут 'name')
+        if hasattr(value, 'name'):
+            return self._quote(str(value.name))
+
+        # Для словарей создаем строку формата "key1:value1, key2:value2"
+        if isinstance(value, dict):
+            return self._quote(", ".join([f"{k}:{v}" for k, v in value.items()]))
 
-        return text
\ No newline at end of file
+        return self._quote(str(value))
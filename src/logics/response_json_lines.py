@@ -0,0 +1,73 @@
+from src.logics.convert_factory import ConvertFactory
+from src.logics.json_encoder import JsonEncoder
+from src.core.abstract_response import AbstractResponse
+from src.core.validator import Validator, OperationException
+
+
+class ResponseJsonLines(AbstractResponse):
+    """
+    Класс для формирования ответов в формате JSON Lines.
+
+    Каждый объект сериализуется через ConvertFactory в отдельную строку JSON,
+    поэтому ответ можно выдавать и читать построчно, не держа его целиком в памяти.
+    Строки кодируются JsonEncoder (тот же бэкенд и обработчики типов, что и у
+    остальных JSON ответов) сразу в байты UTF-8.
+
+    Пример выходного формата:
+    {"id":"550e8400-e29b-41d4-a716-446655440000","name":"грамм","coefficient":1}
+    {"id":"550e8400-e29b-41d4-a716-446655440001","name":"килограмм","coefficient":1000}
+    """
+
+    def __init__(self):
+        """
+        Инициализирует JSON Lines форматтер ответов и фабрику конверторов.
+        """
+        super().__init__()
+        self._convert_factory = ConvertFactory()
+        self._json_encoder = JsonEncoder()
+
+    def build(self, format: str, data: list) -> str:
+        """
+        Сформировать JSON Lines представление данных.
+
+        Args:
+            format (str): Название формата (игнорируется, сохраняется для совместимости)
+            data (list): Список объектов для преобразования
+
+        Returns:
+            str: Строки JSON, по одной на объект
+
+        Raises:
+            ArgumentException: Если аргументы не соответствуют ожидаемым типам
+            OperationException: Если список данных пуст
+        """
+        Validator.validate(format, str)
+        Validator.validate(data, list)
+
+        if len(data) == 0:
+            raise OperationException("Нет данных!")
+
+        return "".join(self.stream(format, data))
+
+    def stream(self, format: str, data):
+        """
+        Сформировать JSON Lines по частям - по одной строке на объект.
+
+        Args:
+            format (str): Название формата (игнорируется, сохраняется для совместимости)
+            data: Итерируемый источник объектов (например, генератор строк отчета)
+
+        Yields:
+            str: Строка JSON с переводом строки
+        """
+        for line in self._stream_encoded(format, data):
+            yield line.decode("utf-8")
+
+    def _stream_encoded(self, format: str, data):
+        """
+        Строки JSON Lines сразу в байтах UTF-8 - для stream_chunks без повторного кодирования
+        """
+        Validator.validate(format, str)
+
+        for item in data:
+            yield self._json_encoder.encode(self._convert_factory.convert(item)) + b"\n"
@@ -1,3 +1,4 @@
+from itertools import islice
 from src.core.abstract_response import AbstractResponse
 from src.core.common import common
 from src.core.validator import Validator, OperationException
@@ -8,22 +9,53 @@ class ResponseMarkdown(AbstractResponse):
     Класс для формирования ответов в формате Markdown таблицы.
     
     Наследует от AbstractResponse и реализует преобразование списка объектов
-    в таблицу формата Markdown. Поддерживает сериализацию простых типов, 
-    объектов моделей и словарей.
+    (моделей или строк отчетов - словарей) в таблицу формата Markdown.
+    Таблица выдается построчно; колонки берутся из плана колонок первой строки,
+    для моделей - по схеме класса. Ссылки (модели и вложенные словари строк
+    отчетов) выводятся наименованием, прочие словари - количеством элементов.
+
+    Режим выравнивания (align) дополняет ячейки пробелами до ширины колонки.
+    Ширина считается по ограниченной выборке первых sample_size строк, поэтому
+    в памяти удерживается не больше выборки; более длинные значения дальше
+    просто выходят за ширину колонки.
     
     Пример выходного формата:
     | name | coefficient | base_unit |
     | --- | --- | --- |
-    | грамм | 1 | None |
+    | грамм | 1 |  |
     | килограмм | 1000 | грамм |
-    | литр | 1 | None |
+    | литр | 1 |  |
     """
 
-    def __init__(self):
+    def __init__(self, align: bool = False, sample_size: int = 100):
         """
         Инициализирует Markdown форматтер ответов.
+
+        Args:
+            align (bool): Выравнивать колонки по ширине
+            sample_size (int): Количество первых строк для расчета ширины колонок
         """
         super().__init__()
+        self.align = align
+        self.sample_size = sample_size
+
+    @property
+    def align(self) -> bool:
+        return self.__align
+
+    @align.setter
+    def align(self, value: bool):
+        Validator.validate(value, bool)
+        self.__align = value
+
+    @property
+    def sample_size(self) -> int:
+        return self.__sample_size
+
+    @sample_size.setter
+    def sample_size(self, value: int):
+        Validator.validate(value, int)
+        self.__sample_size = max(value, 1)
 
     def build(self, format: str, data: list) -> str:
         """
@@ -51,50 +83,114 @@ class ResponseMarkdown(AbstractResponse):
         if len(data) == 0:
             raise OperationException("Нет данных!")
 
-        # Дополнительная проверка на пустой список (избыточная, но оставлена для ясности)
-        if len(data) == 0:
+        return "".join(self.stream(format, data))
+
+    def stream(self, format: str, data):
+        """
+        Сформировать Markdown таблицу по частям: шапка, разделитель, затем по строке данных.
+
+        Args:
+            format (str): Название формата (игнорируется для Markdown, сохраняется для совместимости)
+            data: Итерируемый источник объектов (например, генератор строк отчета)
+
+        Yields:
+            str: Строки таблицы. Пустой источник - пустой ответ.
+        """
+        Validator.validate(format, str)
+
+        rows = iter(data)
+        first = next(rows, None)
+        if first is None:
+            return
+
+        # План колонок по первой строке
+        columns = self._columns(first)
+        fields = [field for field, _ in columns]
+        convertors = [self.__convertor(kind) for _, kind in columns]
+        header = [self._escape(field) for field in fields]
+
+        def render(item) -> list:
+            return [convert(value) for convert, value in zip(convertors, common.get_values(item, fields))]
+
+        if not self.align:
+            yield self.__line(header)
+            yield self.__line(["---"] * len(fields))
+            yield self.__line(render(first))
+            for item in rows:
+                yield self.__line(render(item))
+            return
+
+        # Ширина колонок по ограниченной выборке первых строк
+        sample = [render(first)] + [render(item) for item in islice(rows, self.sample_size - 1)]
+        widths = [max([3, len(title)] + [len(row[index]) for row in sample]) for index, title in enumerate(header)]
+
+        yield self.__line(self.__pad(header, widths))
+        yield self.__line(["-" * width for width in widths])
+        for row in sample:
+            yield self.__line(self.__pad(row, widths))
+
+        for item in rows:
+            yield self.__line(self.__pad(render(item), widths))
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        """
+        Значение ячейки: вертикальная черта экранируется, перенос строки заменяется пробелом
+        """
+        if "|" in text:
+            text = text.replace("|", "\\|")
+        if "\n" in text or "\r" in text:
+            text = text.replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+
+        return text
+
+    @staticmethod
+    def __line(cells: list) -> str:
+        # Формат: | value1 | value2 | value3 |
+        return "| " + " | ".join(cells) + " |\n"
+
+    @staticmethod
+    def __pad(cells: list, widths: list) -> list:
+        return [cell.ljust(width) for cell, width in zip(cells, widths)]
+
+    def __convertor(self, kind: str):
+        """
+        Функция преобразования значения колонки в текст по виду поля
+        """
+        if kind == "value":
+            return self.__value_cell
+        if kind == "reference":
+            return self.__reference_cell
+
+        return self.__cell
+
+    def __value_cell(self, value) -> str:
+        if value is None:
             return ""
+        if isinstance(value, str):
+            return self._escape(value)
 
-        # Создание шапки таблицы
-        # Берем первый элемент для определения структуры полей
-        item = data[0]
-        
-        # Получаем список полей объекта (исключая словари и списки)
-        fields = common.get_fields(item, is_common=True)
-        
-        # Создание строки с заголовками столбцов
-        # Формат: | field1 | field2 | field3 |
-        text = "| " + " | ".join(fields) + " |\n"
-        
-        # Создание строки с разделителями столбцов
-        # Формат: | --- | --- | --- |
-        text += "| " + " | ".join(["---"] * len(fields)) + " |\n"
+        return str(value)
 
-        # Заполнение таблицы данными
-        for item in data:
-            row = []
-            
-            # Обработка каждого поля текущего объекта
-            for field in fields:
-                value = getattr(item, field)
-                
-                # Обработка объектов моделей (имеющих атрибут 'name')
-                if hasattr(value, 'name'):
-                    # Для моделей используем значение поля 'name'
-                    row.append(str(value.name))
-                
-                # Обработка словарей
-                elif isinstance(value, dict):
-                    # Для словарей выводим количество элементов
-                    row.append(str(len(value)))
-                
-                # Обработка простых типов данных
-                else:
-                    # Для простых типов преобразуем в строку
-                    row.append(str(value))
-            
-            # Добавление строки с данными в таблицу
-            # Формат: | value1 | value2 | value3 |
-            text += "| " + " | ".join(row) + " |\n"
+    def __reference_cell(self, value) -> str:
+        if value is None:
+            return ""
+
+        return self._escape(self._reference_text(value))
+
+    def __cell(self, value) -> str:
+        """
+        Значение колонки неизвестного заранее вида (строки отчетов, даты, перечисления)
+        """
+        if value is None:
+            return ""
+
+        # Обработка объектов моделей (имеющих атрибут 'name')
+        if hasattr(value, 'name'):
+            return self._escape(str(value.name))
+
+        # Для словарей выводим количество элементов
+        if isinstance(value, dict):
+            return str(len(value))
 
-        return text
\ No newline at end of file
+        return self._escape(str(value))
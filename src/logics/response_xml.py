@@ -1,7 +1,9 @@
 from src.core.abstract_response import AbstractResponse
 from src.core.common import common
 from src.core.validator import Validator, OperationException
-import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+from functools import lru_cache
+import re
 
 
 class ResponseXml(AbstractResponse):
@@ -11,20 +13,33 @@ class ResponseXml(AbstractResponse):
     Наследует от AbstractResponse и реализует преобразование списка объектов
     в XML структуру. Поддерживает сериализацию простых типов, объектов моделей
     и словарей.
+
+    Документ записывается инкрементально: каждый <item> формируется строкой
+    сразу по мере получения объекта, дерево элементов в памяти не строится.
+    Теги полей и способ вывода значений (план полей) вычисляются один раз
+    на класс модели по схеме класса, для строк отчетов - один раз на имя колонки
+    (кэш тегов колонок ограничен: имена колонок сводных отчетов приходят из данных).
     
     Пример XML структуры:
     <data>
         <item>
             <name>Значение</name>
             <field>Другое значение</field>
+            <empty_reference />
             <dictionary>
-                <entry key="ключ1" value="значение1"/>
-                <entry key="ключ2" value="значение2"/>
+                <entry key="ключ1" value="значение1" />
+                <entry key="ключ2" value="значение2" />
             </dictionary>
         </item>
     </data>
     """
 
+    # Допустимое имя XML элемента (без пробелов, не начинается с цифры)
+    __tag_pattern = re.compile(r"^[^\W\d][\w.-]*$")
+
+    # Класс модели -> план полей [(поле, (открывающий, закрывающий, пустой тег), вид поля)]
+    __plans = {}
+
     def __init__(self):
         """
         Инициализирует XML форматтер ответов.
@@ -57,40 +72,107 @@ class ResponseXml(AbstractResponse):
         if len(data) == 0:
             raise OperationException("Нет данных!")
 
-        # Создание корневого элемента XML
-        root = ET.Element("data")
-        
-        # Обработка каждого объекта в списке данных
+        return "".join(self.stream(format, data))
+
+    def stream(self, format: str, data):
+        """
+        Сформировать XML по частям: корневой элемент открывается сразу,
+        каждый <item> записывается строкой по мере получения объекта.
+
+        Args:
+            format (str): Название формата (игнорируется для XML, сохраняется для совместимости)
+            data: Итерируемый источник объектов (например, генератор строк отчета)
+
+        Yields:
+            str: Части XML документа. Пустой источник - пустой ответ.
+        """
+        Validator.validate(format, str)
+
+        started = False
         for item in data:
-            # Создание элемента для текущего объекта
-            item_element = ET.SubElement(root, "item")
-            
-            # Получение списка полей объекта (исключая словари и списки)
-            fields = common.get_fields(item, is_common=True)
-            
-            # Обработка каждого поля объекта
-            for field in fields:
-                value = getattr(item, field)
-                
-                # Обработка объектов моделей (имеющих атрибут 'name')
-                if hasattr(value, 'name'):
-                    field_element = ET.SubElement(item_element, field)
-                    field_element.text = str(value.name)
-                
-                # Обработка словарей
-                elif isinstance(value, dict):
-                    field_element = ET.SubElement(item_element, field)
-                    
-                    # Создание элементов для каждой пары ключ-значение в словаре
-                    for key, dict_value in value.items():
-                        sub_element = ET.SubElement(field_element, "entry")
-                        sub_element.set("key", str(key))
-                        sub_element.set("value", str(dict_value))
-                
-                # Обработка простых типов данных
-                else:
-                    field_element = ET.SubElement(item_element, field)
-                    field_element.text = str(value)
-
-        # Преобразование XML дерева в строку
-        return ET.tostring(root, encoding='unicode', method='xml')
\ No newline at end of file
+            if not started:
+                started = True
+                yield "<data>"
+
+            yield self._write_item(item)
+
+        if started:
+            yield "</data>"
+
+    def _write_item(self, item) -> str:
+        """
+        Сформировать элемент <item> с полями объекта.
+
+        Объекты моделей и вложенные ссылки строк отчетов сериализуются по их имени, словари - как набор
+        элементов <entry> с атрибутами key и value, пустые значения - пустым элементом.
+        """
+        if isinstance(item, dict):
+            plan = [(field, self._tags(field), kind) for field, kind in self._columns(item)]
+        else:
+            plan = self.__plan(item)
+        fields = [field for field, _, _ in plan]
+
+        parts = ["<item>"]
+        for (field, tags, kind), value in zip(plan, common.get_values(item, fields)):
+            open_tag, close_tag, empty_tag = tags
+
+            if value is None:
+                parts.append(empty_tag)
+                continue
+
+            if kind == "value":
+                text = escape(str(value))
+
+            # Ссылки - по наименованию (объект модели или вложенный словарь строки отчета)
+            elif kind == "reference":
+                text = escape(self._reference_text(value))
+
+            # Обработка объектов моделей (имеющих атрибут 'name')
+            elif hasattr(value, 'name'):
+                text = escape(str(value.name))
+
+            # Словари - элементы <entry> для каждой пары ключ-значение
+            elif isinstance(value, dict):
+                text = "".join([f"<entry key={quoteattr(str(key))} value={quoteattr(str(entry))} />"
+                                for key, entry in value.items()])
+
+            else:
+                text = escape(str(value))
+
+            parts.append(open_tag + text + close_tag if text else empty_tag)
+
+        parts.append("</item>")
+        return "".join(parts)
+
+    def __plan(self, item) -> list:
+        """
+        План полей класса модели по схеме класса
+        """
+        plan = self.__plans.get(type(item))
+        if plan is None:
+            plan = [(field, self._tags(field), kind) for field, kind in self._columns(item)]
+            self.__plans[type(item)] = plan
+
+        return plan
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _tags(field: str) -> tuple:
+        """
+        Теги элемента поля: (открывающий, закрывающий, пустой).
+
+        Ключи строк отчетов (например, наименования складов в сводной таблице)
+        могут не быть допустимыми именами XML. Такие поля выводятся как
+        <column name="...">.
+
+        Args:
+            field (str): Имя поля
+
+        Returns:
+            tuple: Открывающий, закрывающий и пустой тег
+        """
+        if ResponseXml.__tag_pattern.match(field):
+            return f"<{field}>", f"</{field}>", f"<{field} />"
+
+        name = quoteattr(field)
+        return f"<column name={name}>", "</column>", f"<column name={name} />"
@@ -0,0 +1,165 @@
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.source_tracker import SourceTracker
+from src.core.validator import Validator
+from src.dtos.filter_dto import FilterDto
+from src.models.filter_type import FilterType
+
+
+class TransactionIndex:
+    """
+    Индекс транзакций по номенклатуре и складу.
+
+    Пользовательские фильтры EQUALS по индексируемым путям (nomenclature/id,
+    storage/id, nomenclature/group_nomenclature/id) отделяются от остальных и
+    сразу сужают набор кандидатов через индекс, остальные фильтры применяются
+    уже к кандидатам. Группа раскрывается в номенклатуры по справочнику при
+    каждом запросе, поэтому перенос номенклатуры в другую группу индекс не портит.
+    Индекс обновляется по событию change_transaction и перестраивается при
+    следующем обращении, если транзакции изменены в обход событий.
+
+    Реализует паттерн Singleton - индекс общий для всех отчетов.
+
+    Attributes:
+        __by_nomenclature (dict): id номенклатуры -> {id транзакции: транзакция}
+        __by_storage (dict): id склада -> {id транзакции: транзакция}
+        __count (int): Количество проиндексированных транзакций
+    """
+
+    def __new__(cls, start_service):
+        if not hasattr(cls, 'instance'):
+            cls.instance = super(TransactionIndex, cls).__new__(cls)
+
+        return cls.instance
+
+    def __init__(self, start_service):
+        self.start_service = start_service
+        self.__by_nomenclature = {}
+        self.__by_storage = {}
+        self.__count = 0
+        self.__tracker = SourceTracker(start_service)
+        ObserveService.add(self)
+
+    @staticmethod
+    def indexed_fields() -> list:
+        """Индексируемые пути фильтров"""
+        return ["nomenclature/id", "storage/id", "nomenclature/group_nomenclature/id"]
+
+    def rebuild(self):
+        """
+        Перестроить индекс по всем транзакциям
+        """
+        transactions = self.start_service.transactions
+        self.__by_nomenclature = {}
+        self.__by_storage = {}
+        self.__count = 0
+
+        for transaction in transactions.values():
+            self.__add(transaction)
+
+        self.__tracker.mark()
+
+    def split_filters(self, filters: list[FilterDto]) -> tuple:
+        """
+        Разделить фильтры на индексируемые и остальные
+
+        Returns:
+            tuple: (id номенклатур или None, id складов или None, остальные фильтры).
+                   None - по этому измерению набор не ограничен
+        """
+        Validator.validate(filters, list)
+        nomenclature_ids = None
+        storage_ids = None
+        residual = []
+
+        for filter_dto in filters:
+            if filter_dto.type != FilterType.EQUALS or filter_dto.field_name not in self.indexed_fields():
+                residual.append(filter_dto)
+                continue
+
+            value = str(filter_dto.value)
+            if filter_dto.field_name == "storage/id":
+                storage_ids = self.__intersect(storage_ids, {value})
+            elif filter_dto.field_name == "nomenclature/id":
+                nomenclature_ids = self.__intersect(nomenclature_ids, {value})
+            else:
+                nomenclature_ids = self.__intersect(nomenclature_ids, {
+                    nomenclature.id for nomenclature in self.start_service.nomenclatures.values()
+                    if nomenclature.group_nomenclature is not None and nomenclature.group_nomenclature.id == value
+                })
+
+        return nomenclature_ids, storage_ids, residual
+
+    def candidates(self, nomenclature_ids: set = None, storage_ids: set = None) -> list:
+        """
+        Транзакции указанных номенклатур и складов (None - без ограничения)
+        """
+        self.__check_source()
+
+        if nomenclature_ids is None and storage_ids is None:
+            return list(self.start_service.transactions.values())
+
+        # Перебираем меньшую выборку и проверяем по ней второе измерение
+        by_nomenclature = self.__collect(self.__by_nomenclature, nomenclature_ids)
+        by_storage = self.__collect(self.__by_storage, storage_ids)
+
+        if by_storage is None:
+            return by_nomenclature
+        if by_nomenclature is None:
+            return by_storage
+
+        if len(by_nomenclature) <= len(by_storage):
+            return [t for t in by_nomenclature if t.storage.id in storage_ids]
+
+        return [t for t in by_storage if t.nomenclature.id in nomenclature_ids]
+
+    @staticmethod
+    def __collect(index: dict, ids: set):
+        if ids is None:
+            return None
+
+        result = []
+        for item_id in ids:
+            result.extend(index.get(item_id, {}).values())
+
+        return result
+
+    @staticmethod
+    def __intersect(current: set, values: set) -> set:
+        return values if current is None else current & values
+
+    def __add(self, transaction):
+        self.__by_nomenclature.setdefault(transaction.nomenclature.id, {})[transaction.id] = transaction
+        self.__by_storage.setdefault(transaction.storage.id, {})[transaction.id] = transaction
+        self.__count += 1
+
+    def __remove(self, transaction):
+        self.__by_nomenclature.get(transaction.nomenclature.id, {}).pop(transaction.id, None)
+        self.__by_storage.get(transaction.storage.id, {}).pop(transaction.id, None)
+        self.__count -= 1
+
+    def __check_source(self):
+        """
+        Транзакции изменены в обход событий (например, перезагрузкой данных) - индекс устарел
+        """
+        if self.__tracker.is_stale(self.__count):
+            self.rebuild()
+
+    def handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        if event == EventType.reload_transactions_key():
+            # Данные загружены заново - индекс перестроится при обращении
+            self.__tracker.invalidate()
+
+        elif event == EventType.change_transaction_key():
+            # Индекс еще не построен или построен по другому хранилищу - перестроится при чтении
+            if not self.__tracker.is_built:
+                return
+
+            if params["old"] is not None:
+                self.__remove(params["old"])
+
+            if params["new"] is not None:
+                self.__add(params["new"])
@@ -0,0 +1,316 @@
+from datetime import datetime
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.source_tracker import SourceTracker
+from src.core.validator import Validator, ArgumentException, OperationException
+from src.logics.balance_index import BalanceIndex
+from src.logics.unit_conversion_service import UnitConversionService
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.transaction_model import TransactionModel
+from src.models.unit_measurement_model import UnitMeasurement
+
+
+class TransactionService:
+    """
+    Сервис записи складских транзакций.
+
+    Реализует два варианта списания (п. 2.2 - 2.4 ТЗ):
+    - с блокировкой в случае недостатка остатков (по умолчанию);
+    - "под сальдо" (allow_negative=True) - списание без проверки остатка.
+
+    Остаток проверяется по индексу нарастающих остатков BalanceIndex, который
+    обновляется при каждой записи через сервис. О каждом добавлении, изменении
+    и удалении транзакции сервис сообщает событием change_transaction.
+    """
+
+    def __init__(self, start_service):
+        self.start_service = start_service
+        self.balance_index = BalanceIndex()
+        self.unit_conversion_service = UnitConversionService(start_service)
+        self.__tracker = SourceTracker(start_service)
+        ObserveService.add(self)
+
+    def add_transaction(self, transaction: TransactionModel, allow_negative: bool = False) -> TransactionModel:
+        """
+        Записать транзакцию.
+
+        Args:
+            transaction (TransactionModel): Транзакция прихода или расхода
+            allow_negative (bool): Списание "под сальдо" - без проверки остатка
+
+        Returns:
+            TransactionModel: Записанная транзакция
+
+        Raises:
+            OperationException: Если остатка недостаточно для списания
+        """
+        Validator.validate(transaction, TransactionModel)
+        self.unit_conversion_service.precompute(transaction)
+        self._check_write_off(self._index(), [transaction], allow_negative)
+        self._write(transaction)
+        return transaction
+
+    def write_off(self, date: datetime, storage: StorageModel, items: list, allow_negative: bool = False) -> list:
+        """
+        Списать несколько номенклатур одной операцией (например, ингредиенты проданного блюда).
+
+        Списание атомарно: сначала проверяются все позиции, и только если остатка
+        хватает по каждой из них, все транзакции записываются.
+
+        Args:
+            date (datetime): Дата списания
+            storage (StorageModel): Склад
+            items (list): Позиции вида {"nomenclature": NomenclatureModel, "quantity": float,
+                          "unit_measurement": UnitMeasurement (опционально)}
+            allow_negative (bool): Списание "под сальдо" - без проверки остатка
+
+        Returns:
+            list: Записанные транзакции
+
+        Raises:
+            OperationException: Если остатка недостаточно хотя бы по одной позиции
+        """
+        Validator.validate(date, datetime)
+        Validator.validate(storage, StorageModel)
+        Validator.validate(items, list)
+
+        transactions = []
+        for item in items:
+            Validator.validate(item, dict)
+            nomenclature = item.get("nomenclature")
+            Validator.validate(nomenclature, NomenclatureModel)
+
+            unit = item.get("unit_measurement") or nomenclature.unit_measurement
+            Validator.validate(unit, UnitMeasurement)
+
+            transaction = TransactionModel(
+                date=date,
+                nomenclature=nomenclature,
+                storage=storage,
+                quantity=item.get("quantity"),
+                unit_measurement=unit,
+                transaction_type="out"
+            )
+            self.unit_conversion_service.precompute(transaction)
+            transactions.append(transaction)
+
+        self._check_write_off(self._index(), transactions, allow_negative)
+
+        for transaction in transactions:
+            self._write(transaction)
+
+        return transactions
+
+    def update_transaction(self, transaction_id: str, item_data: dict, allow_negative: bool = False) -> TransactionModel:
+        """
+        Изменить транзакцию.
+
+        Args:
+            transaction_id (str): ID транзакции
+            item_data (dict): Новые значения полей (date, nomenclature, storage, quantity,
+                              unit_measurement, transaction_type)
+            allow_negative (bool): Списание "под сальдо" - без проверки остатка
+
+        Returns:
+            TransactionModel: Измененная транзакция
+
+        Raises:
+            OperationException: Если после изменения остатка недостаточно для списания
+        """
+        Validator.validate(transaction_id, str)
+        Validator.validate(item_data, dict)
+
+        transaction = self._get_transaction(transaction_id)
+        old = self._snapshot(transaction)
+
+        # Новое состояние собираем на копии, чтобы при ошибке не испортить транзакцию
+        new = self._snapshot(transaction)
+        for field in ["date", "nomenclature", "storage", "quantity", "unit_measurement", "transaction_type"]:
+            if field in item_data:
+                setattr(new, field, item_data[field])
+        self.unit_conversion_service.precompute(new)
+
+        # Проверяем остатки после замены старого состояния транзакции новым
+        self._apply_change(self._index(), old, new, allow_negative)
+
+        transaction.date = new.date
+        transaction.nomenclature = new.nomenclature
+        transaction.storage = new.storage
+        transaction.quantity = new.quantity
+        transaction.unit_measurement = new.unit_measurement
+        transaction.transaction_type = new.transaction_type
+        transaction.set_quantity_in_base_units(new.get_quantity_in_base_units())
+
+        ObserveService.create_event(EventType.change_transaction_key(), {"old": old, "new": transaction})
+        return transaction
+
+    def delete_transaction(self, transaction_id: str, allow_negative: bool = False) -> TransactionModel:
+        """
+        Удалить транзакцию
+
+        Args:
+            transaction_id (str): ID транзакции
+            allow_negative (bool): Удаление без проверки остатка
+
+        Returns:
+            TransactionModel: Удаленная транзакция
+
+        Raises:
+            OperationException: Если после удаления прихода остатка недостаточно для более поздних списаний
+        """
+        Validator.validate(transaction_id, str)
+
+        transaction = self._get_transaction(transaction_id)
+        self._apply_change(self._index(), transaction, None, allow_negative)
+
+        del self.start_service.transactions[transaction_id]
+
+        ObserveService.create_event(EventType.change_transaction_key(), {"old": transaction, "new": None})
+        return transaction
+
+    def get_balance(self, nomenclature: NomenclatureModel, storage: StorageModel, date: datetime) -> float:
+        """
+        Остаток номенклатуры на складе на дату (включительно) в базовых единицах
+        """
+        Validator.validate(nomenclature, NomenclatureModel)
+        Validator.validate(storage, StorageModel)
+        Validator.validate(date, datetime)
+
+        return self._index().balance_at(nomenclature.id, storage.id, date)
+
+    def _check_write_off(self, index: BalanceIndex, transactions: list, allow_negative: bool):
+        """
+        Проверить достаточность остатков для списаний. Ничего не записывает.
+        """
+        if allow_negative:
+            return
+
+        # Суммируем списания по паре (номенклатура, склад): одна номенклатура
+        # может встретиться в операции несколько раз
+        required = {}
+        for transaction in transactions:
+            if transaction.transaction_type != "out":
+                continue
+
+            key = (transaction.nomenclature.id, transaction.storage.id)
+            if key not in required:
+                required[key] = {"transaction": transaction, "quantity": 0}
+
+            required[key]["quantity"] += transaction.get_quantity_in_base_units()
+
+        for (nom_id, storage_id), data in required.items():
+            transaction = data["transaction"]
+            available = index.min_balance_from(nom_id, storage_id, transaction.date)
+
+            if round(available - data["quantity"], 6) < 0:
+                raise OperationException(
+                    f"Недостаточно остатка номенклатуры '{transaction.nomenclature.name}' "
+                    f"на складе '{transaction.storage.name}': "
+                    f"доступно {round(available, 2)}, требуется {round(data['quantity'], 2)}"
+                )
+
+    def _apply_change(self, index: BalanceIndex, old: TransactionModel, new: TransactionModel,
+                      allow_negative: bool):
+        """
+        Заменить в индексе старое состояние транзакции новым (None - удаление).
+
+        Уменьшение или удаление прихода, перенос движения на другую дату, склад
+        или номенклатуру уменьшают остатки начиная с даты изменения. Изменение
+        отклоняется, если минимальный остаток затронутой пары после него становится
+        отрицательным и меньше, чем был до изменения. При ошибке индекс не меняется.
+        """
+        # Затронутые пары (номенклатура, склад) и самая ранняя дата изменения по каждой
+        pairs = {}
+        for transaction in (old, new):
+            if transaction is None:
+                continue
+
+            key = (transaction.nomenclature.id, transaction.storage.id)
+            if key not in pairs or transaction.date < pairs[key]["date"]:
+                pairs[key] = {"date": transaction.date, "transaction": transaction}
+
+        before = {key: index.min_balance_from(key[0], key[1], data["date"]) for key, data in pairs.items()}
+
+        index.remove(old)
+        if new is not None:
+            index.add(new)
+
+        if allow_negative:
+            return
+
+        for key, data in pairs.items():
+            after = index.min_balance_from(key[0], key[1], data["date"])
+            if round(after, 6) >= 0 or round(after - before[key], 6) >= 0:
+                continue
+
+            if new is not None:
+                index.remove(new)
+            index.add(old)
+
+            transaction = data["transaction"]
+            raise OperationException(
+                f"Недостаточно остатка номенклатуры '{transaction.nomenclature.name}' "
+                f"на складе '{transaction.storage.name}': "
+                f"после изменения остаток станет {round(after, 2)}"
+            )
+
+    def _write(self, transaction: TransactionModel):
+        """
+        Сохранить транзакцию в хранилище и в индексе остатков
+        """
+        index = self._index()
+        transactions = self.start_service.transactions
+
+        if transaction.id in transactions:
+            raise ArgumentException(f"Транзакция с ID '{transaction.id}' уже существует")
+
+        transactions[transaction.id] = transaction
+        index.add(transaction)
+
+        ObserveService.create_event(EventType.change_transaction_key(), {"old": None, "new": transaction})
+
+    def _get_transaction(self, transaction_id: str) -> TransactionModel:
+        """
+        Найти транзакцию по ID
+        """
+        transaction = self.start_service.transactions.get(transaction_id)
+        if transaction is None:
+            raise ArgumentException(f"Транзакция с ID '{transaction_id}' не найдена")
+
+        return transaction
+
+    @staticmethod
+    def _snapshot(transaction: TransactionModel) -> TransactionModel:
+        """
+        Копия транзакции с тем же ID - состояние до изменения
+        """
+        snapshot = TransactionModel(
+            date=transaction.date,
+            nomenclature=transaction.nomenclature,
+            storage=transaction.storage,
+            quantity=transaction.quantity,
+            unit_measurement=transaction.unit_measurement,
+            transaction_type=transaction.transaction_type
+        )
+        snapshot.id = transaction.id
+        return snapshot
+
+    def _index(self) -> BalanceIndex:
+        """
+        Получить индекс остатков, перестроив его, если хранилище изменилось в обход сервиса
+        """
+        if self.__tracker.is_stale(self.balance_index.count):
+            self.balance_index.build(list(self.start_service.transactions.values()))
+            self.__tracker.mark()
+
+        return self.balance_index
+
+    def handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        if event in (EventType.change_unit_key(), EventType.reload_transactions_key()):
+            # Количества в базовых единицах изменились или данные загружены заново -
+            # индекс перестроится при обращении
+            self.__tracker.invalidate()
@@ -0,0 +1,186 @@
+import copy
+from collections import OrderedDict
+from datetime import datetime
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.source_tracker import SourceTracker
+from src.core.validator import Validator
+from src.logics.json_encoder import JsonEncoder
+
+
+class TurnoverReportCache:
+    """
+    Кэш результатов оборотно-сальдовой ведомости.
+
+    Ключ - (начало, конец, склад, нормализованные фильтры, единица вывода, разбивка,
+    набор полей, режим вывода ссылок).
+    Для каждой записи запоминается область зависимости: конец периода, склад и
+    номенклатуры отчета. Запись сбрасывается только если измененная транзакция
+    или номенклатура попадает в эту область - отчеты по закрытым периодам
+    считаются один раз. Вытеснение - LRU с ограничением по количеству записей
+    и по объему (размер отчета в JSON).
+
+    Attributes:
+        __entries (OrderedDict): ключ -> {"value", "size", "end_date", "storage_id", "nomenclatures"}
+        __size (int): Суммарный объем записей в байтах
+    """
+
+    def __init__(self, start_service, max_entries: int = 128, max_bytes: int = 16 * 1024 * 1024):
+        Validator.validate(max_entries, int)
+        Validator.validate(max_bytes, int)
+
+        self.start_service = start_service
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__tracker = SourceTracker(start_service)
+        self.__count = 0
+        self.__encoder = JsonEncoder()
+        ObserveService.add(self)
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def make_key(start_date: datetime, end_date: datetime, storage=None, filters: list = None,
+                 unit=None, granularity=None, fields: list = None, reference_mode=None) -> tuple:
+        """
+        Сформировать ключ кэша. Порядок фильтров не влияет на ключ.
+        """
+        normalized_filters = tuple(sorted(
+            (f.field_name, f.type.name, f.value) for f in (filters or [])
+        ))
+
+        return (
+            start_date.isoformat(),
+            end_date.isoformat(),
+            storage.id if storage else None,
+            normalized_filters,
+            unit.id if unit else None,
+            granularity.value if granularity else None,
+            tuple(sorted(fields)) if fields is not None else None,
+            reference_mode.value if reference_mode else None
+        )
+
+    def get(self, key: tuple):
+        """
+        Получить копию отчета из кэша или None
+        """
+        self.__check_source()
+
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(entry["value"])
+
+    def put(self, key: tuple, value: list):
+        """
+        Сохранить отчет в кэш
+        """
+        Validator.validate(value, list)
+        self.__check_source()
+
+        size = len(self.__encoder.encode(value))
+        if size > self.max_bytes:
+            return
+
+        self.remove(key)
+        self.__entries[key] = {
+            "value": copy.deepcopy(value),
+            "size": size,
+            "end_date": datetime.fromisoformat(key[1]),
+            "storage_id": key[2],
+            "nomenclatures": self.__collect_nomenclatures(value)
+        }
+        self.__size += size
+
+        # Вытесняем давно не использованные записи
+        while len(self.__entries) > self.max_entries or self.__size > self.max_bytes:
+            _, evicted = self.__entries.popitem(last=False)
+            self.__size -= evicted["size"]
+
+    def remove(self, key: tuple):
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__size -= entry["size"]
+
+    def clear(self):
+        self.__entries = OrderedDict()
+        self.__size = 0
+
+    def invalidate_transaction(self, transaction):
+        """
+        Сбросить записи, в область зависимости которых попадает транзакция
+        """
+        for key in [key for key, entry in self.__entries.items() if self.__depends_on(entry, transaction)]:
+            self.remove(key)
+
+    def invalidate_nomenclature(self, nomenclature_id: str):
+        """
+        Сбросить записи, в которых есть строка по номенклатуре
+        (или строки без nomenclature_id, если поле исключено из набора полей)
+        """
+        for key in [key for key, entry in self.__entries.items()
+                    if nomenclature_id in entry["nomenclatures"] or None in entry["nomenclatures"]]:
+            self.remove(key)
+
+    @staticmethod
+    def __depends_on(entry: dict, transaction) -> bool:
+        if transaction.date > entry["end_date"]:
+            return False
+
+        # Начальный остаток и обороты ведомости считаются по складу отчета
+        return entry["storage_id"] is None or transaction.storage.id == entry["storage_id"]
+
+    @staticmethod
+    def __collect_nomenclatures(value: list) -> set:
+        result = set()
+        for row in value:
+            for item in row.get("data", [row]):
+                result.add(item.get("nomenclature_id"))
+
+        return result
+
+    def __check_source(self):
+        """
+        Транзакции изменены в обход событий (например, перезагрузкой данных) - кэш устарел
+        """
+        if self.__tracker.is_stale(self.__count):
+            self.clear()
+            self.__tracker.mark()
+            self.__count = len(self.start_service.transactions)
+
+    def handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        if event == EventType.change_transaction_key():
+            for transaction in (params["old"], params["new"]):
+                if transaction is not None:
+                    self.invalidate_transaction(transaction)
+
+            self.__count = len(self.start_service.transactions)
+
+        elif event == EventType.change_reference_type_key():
+            if params and params.get("reference_type") == "nomenclatures":
+                self.invalidate_nomenclature(params["item"].id)
+            elif params and params.get("reference_type") == "units":
+                self.clear()
+
+        elif event in (EventType.change_unit_key(), EventType.change_nomenclature_unit_key()):
+            self.clear()
+
+        elif event == EventType.reload_transactions_key():
+            # Данные загружены заново - кэш сбросится при обращении
+            self.__tracker.invalidate()
@@ -1,8 +1,16 @@
-from datetime import datetime
+from bisect import bisect_right
+from datetime import datetime, timedelta
 from src.logics.convert_factory import ConvertFactory
 from src.core.validator import Validator, ArgumentException
 from src.models.transaction_model import TransactionModel
 from src.models.storage_model import StorageModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.models.period_type import PeriodType
+from src.models.reference_mode import ReferenceMode
+from src.logics.unit_conversion_service import UnitConversionService
+from src.logics.turnover_report_cache import TurnoverReportCache
+from src.logics.daily_rollup_service import DailyRollupService
+from src.logics.transaction_index import TransactionIndex
 from src.repository import Repository
 from src.start_service import StartService
 from src.core.prototype import Prototype
@@ -13,11 +21,20 @@ class TurnoverReportService:
     Сервис для формирования оборотно-сальдовой ведомости
     """
     
-    def __init__(self, start_service):
+    def __init__(self, start_service, daily_rollup_service: DailyRollupService = None,
+                 transaction_index: TransactionIndex = None):
         self.start_service = start_service
         self.convert_factory = ConvertFactory()
+        self.unit_conversion_service = UnitConversionService(start_service)
+        self.report_cache = TurnoverReportCache(start_service)
+        # Общие дневные итоги и индекс передаются приложением, чтобы перестроение
+        # затрагивало именно тот экземпляр, из которого читают отчеты
+        self.daily_rollup_service = daily_rollup_service or DailyRollupService(start_service)
+        self.transaction_index = transaction_index or TransactionIndex(start_service)
     
-    def generate_turnover_report(self, start_date: datetime, end_date: datetime, storage: StorageModel = None, filters: list[FilterDto] = None):
+    def generate_turnover_report(self, start_date: datetime, end_date: datetime, storage: StorageModel = None, filters: list[FilterDto] = None,
+                                 unit: UnitMeasurement = None, granularity: PeriodType = None,
+                                 fields: list = None, reference_mode: ReferenceMode = ReferenceMode.FULL):
         """
         Сформировать оборотно-сальдовую ведомость с использованием прототипа
         
@@ -25,39 +42,109 @@ class TurnoverReportService:
             start_date (datetime): Дата начала периода
             end_date (datetime): Дата окончания периода
             storage (StorageModel): Склад (опционально)
-            filters (list[FilterDto]): Фильтры для транзакций (опционально)
+            filters (list[FilterDto]): Фильтры для транзакций (опционально). Склад и фильтры
+                                       применяются и к оборотам, и к начальному остатку
+            unit (UnitMeasurement): Единица вывода (опционально). Показатели совместимых
+                                    с ней номенклатур пересчитываются в эту единицу
+            granularity (PeriodType): Разбивка по периодам (опционально)
+            fields (list): Поля строк ОСВ (опционально). Исключенные поля не вычисляются
+            reference_mode (ReferenceMode): Вывод номенклатуры и единицы - id, наименование
+                                            или объект целиком (по умолчанию)
             
         Returns:
-            list: Список словарей с данными ОСВ
+            list: Список словарей с данными ОСВ. При указании granularity - список
+                  периодов вида {"start_date", "end_date", "data": [строки ОСВ]}
         """
         Validator.validate(start_date, datetime)
         Validator.validate(end_date, datetime)
         if storage:
             Validator.validate(storage, StorageModel)
+        if unit:
+            Validator.validate(unit, UnitMeasurement)
+        if granularity:
+            Validator.validate(granularity, PeriodType)
+        if fields is not None:
+            Validator.validate(fields, list)
+        Validator.validate(reference_mode, ReferenceMode)
         
         if start_date > end_date:
             raise ArgumentException("Дата начала не может быть позже даты окончания")
-        
-        # Получаем все транзакции
-        all_transactions = list(self.start_service.transactions.values())
-        
-        # Создаем прототип для транзакций
-        transaction_prototype = Prototype(all_transactions)
-        
-        # Применяем базовые фильтры по дате и складу
-        filtered_transactions = self._apply_base_filters(transaction_prototype, start_date, end_date, storage)
-        
-        # Применяем пользовательские фильтры если есть
-        if filters:
-            filtered_transactions = Prototype.filter(filtered_transactions, filters)
+
+        # Повторный запрос с теми же параметрами берется из кэша
+        cache_key = TurnoverReportCache.make_key(start_date, end_date, storage, filters, unit, granularity,
+                                                 fields, reference_mode)
+        report_data = self.report_cache.get(cache_key)
+        if report_data is not None:
+            return report_data
+
+        if granularity:
+            report_data = self._generate_turnover_report_by_period(start_date, end_date, granularity, storage, filters, unit,
+                                                                   fields, reference_mode)
         else:
-            filtered_transactions = filtered_transactions
-        
-        # Формируем ОСВ на основе отфильтрованных транзакций
-        report_data = self._build_turnover_report_from_transactions(filtered_transactions, start_date)
-        
+            report_data = self._generate_turnover_report(start_date, end_date, storage, filters, unit,
+                                                         fields, reference_mode)
+
+        self.report_cache.put(cache_key, report_data)
         return report_data
-    
+
+    def iter_turnover_report(self, start_date: datetime, end_date: datetime, storage: StorageModel = None,
+                             filters: list[FilterDto] = None, unit: UnitMeasurement = None,
+                             fields: list = None, reference_mode: ReferenceMode = ReferenceMode.FULL):
+        """
+        Сформировать ОСВ генератором строк - для потоковой выдачи больших ведомостей.
+
+        В памяти держатся только числовые накопители по номенклатурам, строки
+        отчета создаются по одной. Кэш отчетов не используется.
+        """
+        Validator.validate(start_date, datetime)
+        Validator.validate(end_date, datetime)
+        if storage:
+            Validator.validate(storage, StorageModel)
+        if unit:
+            Validator.validate(unit, UnitMeasurement)
+        if fields is not None:
+            Validator.validate(fields, list)
+        Validator.validate(reference_mode, ReferenceMode)
+
+        if start_date > end_date:
+            raise ArgumentException("Дата начала не может быть позже даты окончания")
+
+        return self._iter_turnover_report(start_date, end_date, storage, filters, unit, fields, reference_mode)
+
+    def _generate_turnover_report(self, start_date: datetime, end_date: datetime, storage: StorageModel = None,
+                                  filters: list[FilterDto] = None, unit: UnitMeasurement = None,
+                                  fields: list = None, reference_mode: ReferenceMode = ReferenceMode.FULL):
+        """
+        Сформировать ОСВ за весь период без разбивки
+        """
+        return list(self._iter_turnover_report(start_date, end_date, storage, filters, unit, fields, reference_mode))
+
+    def _iter_turnover_report(self, start_date: datetime, end_date: datetime, storage: StorageModel = None,
+                              filters: list[FilterDto] = None, unit: UnitMeasurement = None,
+                              fields: list = None, reference_mode: ReferenceMode = ReferenceMode.FULL):
+        nomenclatures, opening, buckets = self._period_totals([start_date], end_date, storage, filters)
+
+        # Выводим номенклатуры с движением за период
+        for nom_id, (income, outcome, count) in buckets[0].items():
+            yield self._build_turnover_row(nomenclatures[nom_id], opening.get(nom_id, 0), income, outcome, count,
+                                           unit, fields, reference_mode)
+
+    def _pushdown_filters(self, storage: StorageModel = None, filters: list[FilterDto] = None) -> tuple:
+        """
+        Объединить склад отчета и фильтры по индексируемым путям в один запрос к индексу
+
+        Returns:
+            tuple: (id номенклатур или None, id складов или None, остальные фильтры)
+        """
+        nomenclature_ids, storage_ids, residual = None, None, []
+        if filters:
+            nomenclature_ids, storage_ids, residual = self.transaction_index.split_filters(filters)
+
+        if storage:
+            storage_ids = {storage.id} if storage_ids is None else storage_ids & {storage.id}
+
+        return nomenclature_ids, storage_ids, residual
+
     def _apply_base_filters(self, prototype: Prototype, start_date: datetime, end_date: datetime, storage: StorageModel = None):
         """Применить базовые фильтры по дате и складу через прототип"""
         filters = []
@@ -86,75 +173,264 @@ class TurnoverReportService:
         # Возвращаем отфильтрованный список, а не объект Prototype
         return Prototype.filter(prototype.data, filters)
     
-    def _build_turnover_report_from_transactions(self, transactions: list, start_date: datetime):
-        """Построить ОСВ на основе отфильтрованных транзакций"""
-        # Группируем транзакции по номенклатуре
-        nomenclature_data = {}
-        
+    def _generate_turnover_report_by_period(self, start_date: datetime, end_date: datetime, granularity: PeriodType,
+                                            storage: StorageModel = None, filters: list[FilterDto] = None,
+                                            unit: UnitMeasurement = None, fields: list = None,
+                                            reference_mode: ReferenceMode = ReferenceMode.FULL):
+        """
+        Сформировать ОСВ с разбивкой по периодам.
+
+        Конечный остаток периода переносится в начальный остаток следующего.
+        """
+        points = granularity.points(start_date, end_date)
+        nomenclatures, opening, buckets = self._period_totals(points, end_date, storage, filters)
+
+        report_data = []
+        for index, point in enumerate(points):
+            period_end = points[index + 1] if index + 1 < len(points) else end_date
+            rows = []
+
+            for nom_id, nomenclature in nomenclatures.items():
+                income, outcome, count = buckets[index].get(nom_id, (0, 0, 0))
+                opening_balance = opening.get(nom_id, 0)
+
+                # Конечный остаток периода - начальный остаток следующего
+                opening[nom_id] = opening_balance + income - outcome
+
+                # Как и в ОСВ без разбивки, выводим номенклатуры с движением за период
+                if count == 0:
+                    continue
+
+                rows.append(self._build_turnover_row(nomenclature, opening_balance, income, outcome, count, unit,
+                                                     fields, reference_mode))
+
+            report_data.append({
+                "start_date": point.isoformat(),
+                "end_date": period_end.isoformat(),
+                "data": rows
+            })
+
+        return report_data
+
+    def _period_totals(self, points: list, end_date: datetime, storage: StorageModel = None,
+                       filters: list[FilterDto] = None) -> tuple:
+        """
+        Начальные остатки и обороты по периодам [p0, p1), ..., [pn, end_date].
+
+        Начальный остаток и обороты считаются по одному набору движений: склад
+        отчета и пользовательские фильтры применяются к обоим. Без неиндексируемых
+        фильтров итоги берутся из дневных итогов, иначе кандидаты индекса
+        раскладываются по периодам за один проход (бинарный поиск по границам).
+
+        Returns:
+            tuple: (id номенклатуры -> номенклатура, id номенклатуры -> остаток до p0,
+                    по каждому периоду {id номенклатуры: [приход, расход, количество транзакций]})
+        """
+        nomenclatures = {}
+        opening = {}
+        buckets = [{} for _ in points]
+
+        nomenclature_ids, storage_ids, residual = self._pushdown_filters(storage, filters)
+
+        if not residual:
+            totals = self.daily_rollup_service.aggregate(points, end_date, storage_ids, nomenclature_ids)
+            known = self.daily_rollup_service.nomenclatures
+
+            for (nom_id, _), (income, outcome, _) in totals[0].items():
+                nomenclatures[nom_id] = known[nom_id]
+                opening[nom_id] = opening.get(nom_id, 0) + income - outcome
+
+            for index, period_totals in enumerate(totals[1:]):
+                for (nom_id, _), (income, outcome, count) in period_totals.items():
+                    nomenclatures[nom_id] = known[nom_id]
+                    turnover = buckets[index].setdefault(nom_id, [0, 0, 0])
+                    turnover[0] += income
+                    turnover[1] += outcome
+                    turnover[2] += count
+
+            return nomenclatures, opening, buckets
+
+        # Кандидаты сужены индексом, склад уже учтен в storage_ids
+        candidates = self.transaction_index.candidates(nomenclature_ids, storage_ids)
+        transactions = Prototype.filter(candidates, [FilterDto.from_dict({
+            "field_name": "date",
+            "value": end_date.isoformat(),
+            "type": "LESS_EQUAL"
+        })])
+        transactions = Prototype.filter(transactions, residual)
+
         for transaction in transactions:
             nom_id = transaction.nomenclature.id
-            if nom_id not in nomenclature_data:
-                nomenclature_data[nom_id] = {
-                    'nomenclature': transaction.nomenclature,
-                    'transactions': []
-                }
-            nomenclature_data[nom_id]['transactions'].append(transaction)
-        
-        # Рассчитываем показатели для каждой номенклатуры
+            nomenclatures[nom_id] = transaction.nomenclature
+            quantity = transaction.get_quantity_in_base_units()
+
+            if transaction.date < points[0]:
+                opening[nom_id] = opening.get(nom_id, 0) + (
+                    quantity if transaction.transaction_type == "in" else -quantity
+                )
+                continue
+
+            turnover = buckets[bisect_right(points, transaction.date) - 1].setdefault(nom_id, [0, 0, 0])
+            turnover[0 if transaction.transaction_type == "in" else 1] += quantity
+            turnover[2] += 1
+
+        return nomenclatures, opening, buckets
+
+    def generate_comparison_report(self, base_period: tuple, comparison_periods: list, storage: StorageModel = None,
+                                   unit: UnitMeasurement = None):
+        """
+        Сравнительная ОСВ: базовый период против одного или нескольких периодов сравнения.
+
+        Все периоды считаются одним проходом по дневным итогам: границы периодов
+        (начала и моменты сразу после окончаний) объединяются в один отсортированный
+        список, после чего итоги периода складываются из соседних интервалов.
+        Показатели периода, в том числе начальный остаток по складу, совпадают
+        с ОСВ за тот же период.
+
+        Args:
+            base_period (tuple): (дата начала, дата окончания) базового периода
+            comparison_periods (list): Периоды сравнения [(дата начала, дата окончания), ...]
+            storage (StorageModel): Склад (опционально)
+            unit (UnitMeasurement): Единица вывода (опционально)
+
+        Returns:
+            list: Строки {"nomenclature_id", "nomenclature_name", "unit_measurement",
+                  "base": {показатели}, "comparisons": [{"start_date", "end_date", показатели,
+                  "delta": {...}, "change_percent": {...}}]}. delta = база - сравнение,
+                  change_percent = delta / |сравнение| * 100 (None, если в сравнении 0)
+        """
+        Validator.validate(comparison_periods, list)
+        if storage:
+            Validator.validate(storage, StorageModel)
+        if unit:
+            Validator.validate(unit, UnitMeasurement)
+
+        periods = [base_period] + comparison_periods
+        for period in periods:
+            Validator.validate(period, tuple)
+            if len(period) != 2:
+                raise ArgumentException("Период задается парой (дата начала, дата окончания)")
+            Validator.validate(period[0], datetime)
+            Validator.validate(period[1], datetime)
+            if period[0] > period[1]:
+                raise ArgumentException("Дата начала не может быть позже даты окончания")
+
+        if len(comparison_periods) == 0:
+            raise ArgumentException("Не указаны периоды сравнения")
+
+        # Границы всех периодов: начало и момент сразу после окончания (периоды включают дату окончания)
+        bounds = sorted({point for start_date, end_date in periods
+                         for point in (start_date, end_date + timedelta(microseconds=1))})
+        _, storage_ids, _ = self._pushdown_filters(storage)
+        intervals = self.daily_rollup_service.aggregate(bounds, bounds[-1], storage_ids)
+        known = self.daily_rollup_service.nomenclatures
+
+        # Итоги интервалов по номенклатурам: движения до b0, затем [b0, b1), ...
+        interval_totals = []
+        for interval in intervals:
+            nomenclature_totals = {}
+            for (nom_id, _), (income, outcome, count) in interval.items():
+                values = nomenclature_totals.setdefault(nom_id, [0, 0, 0])
+                values[0] += income
+                values[1] += outcome
+                values[2] += count
+            interval_totals.append(nomenclature_totals)
+
+        nomenclatures = {nom_id: known[nom_id] for interval in interval_totals for nom_id in interval}
+        # id номенклатуры -> по каждому периоду [начальный остаток, приход, расход, количество]
+        totals = {nom_id: [[0, 0, 0, 0] for _ in periods] for nom_id in nomenclatures}
+
+        for index, (start_date, end_date) in enumerate(periods):
+            first = bisect_right(bounds, start_date)
+            last = bisect_right(bounds, end_date + timedelta(microseconds=1))
+
+            for position, interval in enumerate(interval_totals[:last]):
+                for nom_id, (income, outcome, count) in interval.items():
+                    values = totals[nom_id][index]
+                    if position < first:
+                        values[0] += income - outcome
+                    else:
+                        values[1] += income
+                        values[2] += outcome
+                        values[3] += count
+
         report_data = []
-        
-        for nom_id, data in nomenclature_data.items():
-            nomenclature = data['nomenclature']
-            nom_transactions = data['transactions']
-            
-            # Начальный остаток (транзакции до start_date)
-            opening_balance = self._calculate_opening_balance(nomenclature, start_date)
-            
-            # Обороты за период
-            income = sum(
-                t.get_quantity_in_base_units() 
-                for t in nom_transactions 
-                if t.transaction_type == "in"
-            )
-            
-            outcome = sum(
-                t.get_quantity_in_base_units() 
-                for t in nom_transactions 
-                if t.transaction_type == "out"
-            )
-            
-            # Конечный остаток
-            closing_balance = opening_balance + income - outcome
-            
+        for nom_id, values in totals.items():
+            # Выводим номенклатуры с движением хотя бы в одном из периодов
+            if not any(period_values[3] for period_values in values):
+                continue
+
+            nomenclature = nomenclatures[nom_id]
+            rows = [
+                self._build_turnover_row(nomenclature, opening, income, outcome, count, unit,
+                                         reference_mode=ReferenceMode.NAME)
+                for opening, income, outcome, count in values
+            ]
+            base = rows[0]
+
+            comparisons = []
+            for (start_date, end_date), row in zip(comparison_periods, rows[1:]):
+                comparison = {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()}
+                comparison.update(self._turnover_figures(row))
+                comparison["delta"] = {}
+                comparison["change_percent"] = {}
+
+                for field in ["opening_balance", "income", "outcome", "closing_balance", "transaction_count"]:
+                    delta = base[field] - row[field]
+                    comparison["delta"][field] = round(delta, 2)
+                    comparison["change_percent"][field] = round(delta / abs(row[field]) * 100, 2) if row[field] else None
+
+                comparisons.append(comparison)
+
             report_data.append({
-                "nomenclature_id": nomenclature.id,
-                "nomenclature_name": self.convert_factory.convert(nomenclature),
-                "unit_measurement": self.convert_factory.convert(nomenclature.unit_measurement),
-                "opening_balance": round(opening_balance, 2),
-                "income": round(income, 2),
-                "outcome": round(outcome, 2),
-                "closing_balance": round(closing_balance, 2),
-                "transaction_count": len(nom_transactions)
+                "nomenclature_id": nom_id,
+                "nomenclature_name": base["nomenclature_name"],
+                "unit_measurement": base["unit_measurement"],
+                "base": self._turnover_figures(base),
+                "comparisons": comparisons
             })
-        
+
         return report_data
-    
-    def _calculate_opening_balance(self, nomenclature, start_date: datetime):
-        """Рассчитать начальный остаток до указанной даты"""
-        all_transactions = list(self.start_service.transactions.values())
-        
-        balance = 0
-        for transaction in all_transactions:
-            if (transaction.nomenclature.id == nomenclature.id and 
-                transaction.date < start_date):
-                
-                quantity = transaction.get_quantity_in_base_units()
-                if transaction.transaction_type == "in":
-                    balance += quantity
-                else:
-                    balance -= quantity
-        
-        return balance
+
+    @staticmethod
+    def _turnover_figures(row: dict) -> dict:
+        """Числовые показатели строки ОСВ"""
+        return {field: row[field] for field in ["opening_balance", "income", "outcome", "closing_balance", "transaction_count"]}
+
+    def _build_turnover_row(self, nomenclature, opening_balance: float, income: float, outcome: float,
+                            transaction_count: int, unit: UnitMeasurement = None, fields: list = None,
+                            reference_mode: ReferenceMode = ReferenceMode.FULL) -> dict:
+        """Сформировать строку ОСВ по номенклатуре (только запрошенные поля)"""
+        # Конечный остаток
+        closing_balance = opening_balance + income - outcome
+
+        # Пересчет в единицу вывода, если она совместима с единицей номенклатуры
+        output_unit = nomenclature.unit_measurement
+        if unit and self.unit_conversion_service.is_compatible(output_unit, unit):
+            opening_balance, income, outcome, closing_balance = [
+                self.unit_conversion_service.from_base(value, unit)
+                for value in (opening_balance, income, outcome, closing_balance)
+            ]
+            output_unit = unit
+
+        row = {"nomenclature_id": nomenclature.id}
+
+        # Сериализация ссылок - самая дорогая часть строки, выполняется только для запрошенных полей
+        if fields is None or "nomenclature_name" in fields:
+            row["nomenclature_name"] = self.convert_factory.convert_reference(nomenclature, reference_mode)
+        if fields is None or "unit_measurement" in fields:
+            row["unit_measurement"] = self.convert_factory.convert_reference(output_unit, reference_mode)
+
+        row["opening_balance"] = round(opening_balance, 2)
+        row["income"] = round(income, 2)
+        row["outcome"] = round(outcome, 2)
+        row["closing_balance"] = round(closing_balance, 2)
+        row["transaction_count"] = transaction_count
+
+        if fields is not None:
+            row = {key: value for key, value in row.items() if key in fields}
+
+        return row
     
     # Старый метод для обратной совместимости
     def generate_turnover_report_old(self, start_date: datetime, end_date: datetime, storage: StorageModel = None):
@@ -0,0 +1,104 @@
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.validator import Validator, ArgumentException
+from src.models.transaction_model import TransactionModel
+from src.models.unit_measurement_model import UnitMeasurement
+
+
+class UnitConversionService:
+    """
+    Сервис пересчета единиц измерения.
+
+    Для каждой единицы один раз определяет корневую единицу и итоговый коэффициент
+    по всей цепочке базовых единиц (тонна -> кг -> грамм) и кэширует результат.
+    Кэш и рассчитанные количества транзакций сбрасываются при изменении
+    единиц измерения (событие change_unit).
+
+    Реализует паттерн Singleton - кэш общий для всех сервисов.
+    """
+
+    def __new__(cls, start_service):
+        if not hasattr(cls, 'instance'):
+            cls.instance = super(UnitConversionService, cls).__new__(cls)
+
+        return cls.instance
+
+    def __init__(self, start_service):
+        self.start_service = start_service
+        self.__cache = {}
+        ObserveService.add(self)
+
+    def resolve(self, unit: UnitMeasurement) -> tuple:
+        """
+        Получить корневую единицу и коэффициент пересчета в нее
+
+        Returns:
+            tuple: (корневая единица, коэффициент)
+        """
+        Validator.validate(unit, UnitMeasurement)
+
+        result = self.__cache.get(unit.id)
+        if result is None:
+            result = unit.resolve_base()
+            self.__cache[unit.id] = result
+
+        return result
+
+    def to_base(self, quantity: float, unit: UnitMeasurement) -> float:
+        """
+        Пересчитать количество в корневую единицу
+        """
+        _, coefficient = self.resolve(unit)
+        return quantity * coefficient
+
+    def from_base(self, quantity: float, unit: UnitMeasurement) -> float:
+        """
+        Пересчитать количество из корневой единицы в указанную
+        """
+        _, coefficient = self.resolve(unit)
+        return quantity / coefficient
+
+    def convert(self, quantity: float, from_unit: UnitMeasurement, to_unit: UnitMeasurement) -> float:
+        """
+        Пересчитать количество из одной единицы в другую
+
+        Raises:
+            ArgumentException: Если единицы не приводятся к одной корневой единице
+        """
+        if not self.is_compatible(from_unit, to_unit):
+            raise ArgumentException(
+                f"Единицы измерения '{from_unit.name}' и '{to_unit.name}' несовместимы"
+            )
+
+        return self.from_base(self.to_base(quantity, from_unit), to_unit)
+
+    def is_compatible(self, first: UnitMeasurement, second: UnitMeasurement) -> bool:
+        """
+        Приводятся ли единицы к одной корневой единице
+        """
+        return self.resolve(first)[0].id == self.resolve(second)[0].id
+
+    def precompute(self, transaction: TransactionModel):
+        """
+        Рассчитать и сохранить в транзакции количество в базовых единицах
+        """
+        Validator.validate(transaction, TransactionModel)
+        transaction.set_quantity_in_base_units(
+            self.to_base(transaction.quantity, transaction.unit_measurement)
+        )
+
+    def invalidate(self):
+        """
+        Сбросить кэш коэффициентов и пересчитать количества транзакций
+        """
+        self.__cache = {}
+
+        for transaction in self.start_service.transactions.values():
+            self.precompute(transaction)
+
+    def handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        if event == EventType.change_unit_key():
+            self.invalidate()
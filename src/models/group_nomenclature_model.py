@@ -1,6 +1,46 @@
+from src.core.validator import Validator, ArgumentException
 from src.core.entity_model import EntityModel
 
 
 class GroupNomenclatureModel(EntityModel):
-    def __init__(self):
-        super().__init__()
\ No newline at end of file
+    __parent: "GroupNomenclatureModel" = None
+
+    def __init__(self, parent = None):
+        super().__init__()
+        self.parent = parent
+
+
+    '''
+    Родительская группа (None - группа верхнего уровня)
+    '''
+    @property
+    def parent(self):
+        return self.__parent
+
+
+    @parent.setter
+    def parent(self, value):
+        Validator.validate(value, (type(None), GroupNomenclatureModel))
+
+        # Группа не может оказаться среди собственных предков
+        group = value
+        while group is not None:
+            if group is self:
+                raise ArgumentException(f"Группа '{self.name}' не может быть вложена сама в себя")
+            group = group.parent
+
+        self.__parent = value
+
+
+    '''
+    Цепочка групп от верхнего уровня до текущей группы включительно
+    '''
+    def path(self) -> list:
+        result = []
+        group = self
+        while group is not None:
+            result.append(group)
+            group = group.parent
+
+        result.reverse()
+        return result
@@ -0,0 +1,38 @@
+import calendar
+from enum import Enum
+from datetime import datetime, timedelta
+
+
+class PeriodType(Enum):
+    DAY = "DAY"       # День
+    WEEK = "WEEK"     # Неделя
+    MONTH = "MONTH"   # Месяц
+
+    def shift(self, value: datetime, count: int = 1) -> datetime:
+        """Сдвинуть дату на count периодов"""
+        if self == PeriodType.DAY:
+            return value + timedelta(days=count)
+
+        if self == PeriodType.WEEK:
+            return value + timedelta(weeks=count)
+
+        # Для месяца сохраняем день, обрезая его по длине месяца
+        month = value.month - 1 + count
+        year = value.year + month // 12
+        month = month % 12 + 1
+        day = min(value.day, calendar.monthrange(year, month)[1])
+        return value.replace(year=year, month=month, day=day)
+
+    def points(self, start_date: datetime, end_date: datetime) -> list:
+        """Получить список дат от start_date до end_date включительно с шагом периода"""
+        result = []
+        count = 0
+        point = start_date
+
+        # Сдвигаем всегда от начальной даты, чтобы месяцы не "съезжали" после февраля
+        while point <= end_date:
+            result.append(point)
+            count += 1
+            point = self.shift(start_date, count)
+
+        return result
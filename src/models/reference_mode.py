@@ -0,0 +1,6 @@
+from enum import Enum
+
+class ReferenceMode(Enum):
+    ID = "ID"      # Ссылка выводится идентификатором (поле <имя>_id)
+    NAME = "NAME"  # Ссылка выводится наименованием
+    FULL = "FULL"  # Ссылка выводится вложенным объектом целиком
@@ -12,6 +12,7 @@ class TransactionModel(AbstractModel):
     __quantity: float = 0
     __unit_measurement: UnitMeasurement = None
     __transaction_type: str = ""  # "in" - приход, "out" - расход
+    __base_quantity: float = None  # Количество в базовых единицах (вычисляется один раз)
 
     def __init__(self, date: datetime, nomenclature: NomenclatureModel, 
                  storage: StorageModel, quantity: float, unit_measurement: UnitMeasurement, 
@@ -59,6 +60,7 @@ class TransactionModel(AbstractModel):
     def quantity(self, value: float):
         Validator.validate(value, (int, float))
         self.__quantity = float(value)
+        self.__base_quantity = None
 
     @property
     def unit_measurement(self) -> UnitMeasurement:
@@ -68,6 +70,7 @@ class TransactionModel(AbstractModel):
     def unit_measurement(self, value: UnitMeasurement):
         Validator.validate(value, UnitMeasurement)
         self.__unit_measurement = value
+        self.__base_quantity = None
 
     @property
     def transaction_type(self) -> str:
@@ -81,7 +84,13 @@ class TransactionModel(AbstractModel):
         self.__transaction_type = value
 
     def get_quantity_in_base_units(self) -> float:
-        """Получить количество в базовых единицах измерения"""
-        if self.unit_measurement.base_unit is None:
-            return self.quantity
-        return self.quantity * self.unit_measurement.coefficient
\ No newline at end of file
+        """Получить количество в базовых единицах измерения (по всей цепочке базовых единиц)"""
+        if self.__base_quantity is None:
+            _, coefficient = self.unit_measurement.resolve_base()
+            self.__base_quantity = self.quantity * coefficient
+        return self.__base_quantity
+
+    def set_quantity_in_base_units(self, value: float):
+        """Установить заранее рассчитанное количество в базовых единицах (None - пересчитать при обращении)"""
+        Validator.validate(value, (int, float, type(None)))
+        self.__base_quantity = value
\ No newline at end of file
@@ -1,10 +1,10 @@
-from src.core.validator import Validator
+from src.core.validator import Validator, OperationException
 from src.core.entity_model import EntityModel
 
 
 class UnitMeasurement(EntityModel):
     __coefficient: int = 0
-    __base_unit = None
+    __base_unit: "UnitMeasurement" = None
     
     def __init__(self, name: str, coefficient: int, base_unit = None):
         super().__init__()
@@ -36,6 +36,26 @@ class UnitMeasurement(EntityModel):
         self.__base_unit = value
 
 
+    '''
+    Корневая единица и итоговый коэффициент пересчета в нее по всей цепочке базовых единиц
+    (тонна -> кг -> грамм: грамм, 1000 * 1000)
+    '''
+    def resolve_base(self) -> tuple:
+        unit = self
+        coefficient = 1
+        visited = set()
+
+        while unit.base_unit is not None:
+            if unit.id in visited:
+                raise OperationException(f"Циклическая ссылка в базовых единицах измерения '{self.name}'")
+
+            visited.add(unit.id)
+            coefficient *= unit.coefficient
+            unit = unit.base_unit
+
+        return unit, coefficient
+
+
     '''
     Киллограмм
     '''
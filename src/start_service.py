@@ -195,6 +195,9 @@ class StartService():
         self.__default_create_recipes()
         self.__default_create_transactions()
 
+        # Транзакции созданы в обход событий - производные структуры перестроятся
+        ObserveService.create_event(EventType.reload_transactions_key(), None)
+
     '''
     Стартовый набор данных
     '''
@@ -239,41 +242,46 @@ class StartService():
         """
         if event == EventType.delete_group_nomenclature_key():
             for nomenclature_key, nomenclature in self.nomenclatures.items():
-                if nomenclature.group_nomenclature == params.group:
+                if nomenclature.group_nomenclature == params["group"]:
+                    raise OperationException("Невозможно удалить, так как сущность используется в других справочниках")
+
+            # Проверка во вложенных группах
+            for group_key, group in self.groups_nomenclature.items():
+                if group.parent == params["group"]:
                     raise OperationException("Невозможно удалить, так как сущность используется в других справочниках")
                 
 
         elif event == EventType.delete_nomenclature_key():
             # Проверка в рецептах
             for recipe_key, recipe in self.recipes.items():
-                if params.nomenclature.name in recipe.ingredients:
+                if params["nomenclature"].name in recipe.ingredients:
                     raise OperationException("Невозможно удалить, так как сущность используется в других справочниках")
             
             # Проверка в транзакциях
             for transaction_key, transaction in self.transactions.items():
-                if transaction.nomenclature == params.nomenclature:
+                if transaction.nomenclature == params["nomenclature"]:
                     raise OperationException("Невозможно удалить, так как сущность используется в других справочниках")
                 
 
         elif event == EventType.delete_storage_key():
             # Проверка в транзакциях
             for transaction_key, transaction in self.transactions.items():
-                if transaction.storage == params.storage:
+                if transaction.storage == params["storage"]:
                     raise OperationException("Невозможно удалить, так как сущность используется в других справочниках")
                 
 
         elif event == EventType.delete_unit_key():
             # Проверка в номенклатурах
             for nomenclature_key, nomenclature in self.nomenclatures.items():
-                if nomenclature.unit_measurement == params.unit:
+                if nomenclature.unit_measurement == params["unit"]:
                     raise OperationException("Невозможно удалить, так как сущность используется в других справочниках")
             
             # Проверка в транзакциях
             for transaction_key, transaction in self.transactions.items():
-                if transaction.unit_measurement == params.unit:
+                if transaction.unit_measurement == params["unit"]:
                     raise OperationException("Невозможно удалить, так как сущность используется в других справочниках")
             
             # Проверка в других единицах измерения (как базовая)
             for unit_key, other_unit in self.units_measure.items():
-                if other_unit.base_unit == params.unit:
+                if other_unit.base_unit == params["unit"]:
                     raise OperationException("Невозможно удалить, так как сущность используется в других справочниках")
\ No newline at end of file
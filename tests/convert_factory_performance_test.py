@@ -0,0 +1,74 @@
+import unittest
+import time
+from datetime import datetime, timedelta
+from src.logics.convert_factory import ConvertFactory
+from src.logics.response_csv import ResponseCsv
+from src.start_service import StartService
+from src.models.transaction_model import TransactionModel
+
+
+class TestConvertFactoryPerformance(unittest.TestCase):
+
+    def setUp(self):
+        self.start_service = StartService()
+        self.start_service.start()
+        self.convert_factory = ConvertFactory()
+        self.count = 20000
+
+    def _objects(self) -> dict:
+        """Наборы объектов по типам моделей"""
+        storage = self.start_service.storages["main"]
+        sugar = self.start_service.nomenclatures["sugar"]
+        gramm = self.start_service.units_measure["gramm"]
+        base_date = datetime.now() - timedelta(days=365)
+
+        sources = {
+            "UnitMeasurement": list(self.start_service.units_measure.values()),
+            "GroupNomenclatureModel": list(self.start_service.groups_nomenclature.values()),
+            "NomenclatureModel": list(self.start_service.nomenclatures.values()),
+            "StorageModel": list(self.start_service.storages.values()),
+            "RecipeModel": list(self.start_service.recipes.values()),
+            "TransactionModel": [
+                TransactionModel(base_date + timedelta(minutes=i), sugar, storage, i + 1, gramm, "in")
+                for i in range(100)
+            ]
+        }
+
+        return {name: (items * (self.count // len(items) + 1))[:self.count] for name, items in sources.items()}
+
+    def test_performance_serializer_per_model_type(self):
+        """Нагрузочный тест: быстрая функция сериализации против общего пути по типам моделей"""
+        print(f"Сериализация по {self.count} объектов:")
+        print("=" * 80)
+
+        for name, items in self._objects().items():
+            with self.subTest(model=name):
+                generic_start_time = time.time()
+                expected = [self.convert_factory._convert_generic(item) for item in items]
+                generic_time = time.time() - generic_start_time
+
+                fast_start_time = time.time()
+                result = [self.convert_factory.convert(item) for item in items]
+                fast_time = time.time() - fast_start_time
+
+                # Проверяем корректность
+                self.assertEqual(result, expected)
+
+                print(f"{name}: общий путь {generic_time:.3f} сек, быстрый {fast_time:.3f} сек")
+
+    def test_performance_csv_transactions(self):
+        """Нагрузочный тест: CSV по транзакциям"""
+        items = self._objects()["TransactionModel"]
+
+        start_time = time.time()
+        text = ResponseCsv().build("csv", items)
+        total_time = time.time() - start_time
+
+        self.assertEqual(len(text.splitlines()), len(items) + 1)
+        self.assertLess(total_time, 3.0)
+
+        print(f"CSV по {len(items)} транзакциям: {total_time:.3f} сек")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import time
+import random
+from datetime import datetime, timedelta
+from src.logics.daily_rollup_service import DailyRollupService
+from src.logics.turnover_report_service import TurnoverReportService
+from src.start_service import StartService
+from src.models.transaction_model import TransactionModel
+
+
+class TestDailyRollupPerformance(unittest.TestCase):
+
+    def setUp(self):
+        self.start_service = StartService()
+        self.start_service.start()
+        self.daily_rollup_service = DailyRollupService(self.start_service)
+        self.turnover_service = TurnoverReportService(self.start_service)
+
+        # Создаем тестовые данные: по 100 транзакций в день за год
+        self._create_test_transactions(365, 100)
+
+    def _create_test_transactions(self, days, per_day):
+        """Создание тестовых транзакций"""
+        nomenclatures = list(self.start_service.nomenclatures.values())
+        storages = list(self.start_service.storages.values())
+        gramm = self.start_service.units_measure["gramm"]
+        start_date = datetime.now() - timedelta(days=days)
+
+        for day in range(days):
+            for _ in range(per_day):
+                transaction = TransactionModel(
+                    date=start_date + timedelta(days=day, seconds=random.randint(0, 86399)),
+                    nomenclature=random.choice(nomenclatures),
+                    storage=random.choice(storages),
+                    quantity=random.randint(100, 5000),
+                    unit_measurement=gramm,
+                    transaction_type=random.choice(["in", "out"])
+                )
+                self.start_service.transactions[transaction.id] = transaction
+
+    def _raw_turnovers(self, start_date, end_date) -> dict:
+        """Обороты за период полным перебором транзакций"""
+        result = {}
+        for transaction in self.start_service.transactions.values():
+            if start_date <= transaction.date <= end_date:
+                values = result.setdefault(transaction.nomenclature.id, [0, 0, 0])
+                values[0 if transaction.transaction_type == "in" else 1] += transaction.get_quantity_in_base_units()
+                values[2] += 1
+
+        return result
+
+    def test_performance_turnovers_from_rollups(self):
+        """Нагрузочный тест: обороты по дневным итогам против перебора транзакций"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=300)
+
+        rebuild_start_time = time.time()
+        self.daily_rollup_service.rebuild()
+        rebuild_time = time.time() - rebuild_start_time
+
+        raw_start_time = time.time()
+        expected = self._raw_turnovers(start_date, end_date)
+        raw_time = time.time() - raw_start_time
+
+        rollup_start_time = time.time()
+        totals = self.daily_rollup_service.aggregate([start_date], end_date)[1]
+        rollup_time = time.time() - rollup_start_time
+
+        report_start_time = time.time()
+        report = self.turnover_service.generate_turnover_report(start_date, end_date)
+        report_time = time.time() - report_start_time
+
+        # Проверяем корректность
+        actual = {}
+        for (nom_id, _), values in totals.items():
+            row = actual.setdefault(nom_id, [0, 0, 0])
+            for index in range(3):
+                row[index] += values[index]
+
+        self.assertEqual(set(actual.keys()), set(expected.keys()))
+        for nom_id, values in expected.items():
+            self.assertEqual(actual[nom_id][2], values[2])
+            self.assertAlmostEqual(actual[nom_id][0], values[0], places=6)
+            self.assertAlmostEqual(actual[nom_id][1], values[1], places=6)
+        self.assertEqual(len(report), len(expected))
+
+        # Проверяем производительность
+        self.assertLess(rollup_time, raw_time)
+
+        print("Дневные итоги против перебора транзакций:")
+        print(f"  Транзакций: {len(self.start_service.transactions)}")
+        print(f"  Строк дневных итогов: {self.daily_rollup_service.rows_count}")
+        print(f"  Перестроение итогов: {rebuild_time:.3f} сек")
+        print(f"  Перебор транзакций: {raw_time:.3f} сек")
+        print(f"  Дневные итоги: {rollup_time:.3f} сек")
+        print(f"  ОСВ: {report_time:.3f} сек")
+
+
+if __name__ == '__main__':
+    unittest.main()
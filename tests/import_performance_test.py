@@ -0,0 +1,88 @@
+import unittest
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from src.logics.import_service import ImportService
+from src.start_service import StartService
+from src.logics.convert_factory import ConvertFactory
+
+
+class TestImportPerformance(unittest.TestCase):
+    """
+    Нагрузочный тест загрузки data.json.
+    Количество транзакций задается переменной окружения IMPORT_BENCHMARK_TRANSACTIONS
+    (например, 1000000 для замера на миллионе транзакций)
+    """
+
+    def setUp(self):
+        self.start_service = StartService()
+        self.start_service.start()
+        self.import_service = ImportService(self.start_service)
+        self.count = int(os.environ.get("IMPORT_BENCHMARK_TRANSACTIONS", "20000"))
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
+            self.temp_path = temp_file.name
+
+        self._write_export_file()
+
+    def tearDown(self):
+        if os.path.exists(self.temp_path):
+            os.unlink(self.temp_path)
+
+    def _write_export_file(self):
+        """Файл в формате ExportService: справочники из стартовых данных и случайные транзакции"""
+        factory = ConvertFactory()
+        nomenclatures = list(self.start_service.nomenclatures.values())
+        storages = list(self.start_service.storages.values())
+        gramm = self.start_service.units_measure["gramm"]
+        start_date = datetime.now() - timedelta(days=365)
+
+        transactions = [
+            {
+                "date": (start_date + timedelta(seconds=random.randint(0, 365 * 86400))).isoformat(),
+                "id": f"t{i}",
+                "nomenclature_id": random.choice(nomenclatures).id,
+                "quantity": float(random.randint(100, 5000)),
+                "storage_id": random.choice(storages).id,
+                "transaction_type": random.choice(["in", "out"]),
+                "unit_measurement_id": gramm.id
+            }
+            for i in range(self.count)
+        ]
+
+        data = {
+            "export_date": datetime.now().isoformat(),
+            "units_measure": [factory.convert(item) for item in self.start_service.units_measure.values()],
+            "groups_nomenclature": [factory.convert(item) for item in self.start_service.groups_nomenclature.values()],
+            "nomenclatures": [factory.convert(item) for item in nomenclatures],
+            "storages": [factory.convert(item) for item in storages],
+            "recipes": [factory.convert(item) for item in self.start_service.recipes.values()],
+            "transactions": transactions
+        }
+
+        with open(self.temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def test_performance_import(self):
+        """Нагрузочный тест: потоковая загрузка с доверенным созданием моделей против проверяемого"""
+        trusted_start_time = time.time()
+        counts = self.import_service.import_all_data(self.temp_path)
+        trusted_time = time.time() - trusted_start_time
+
+        checked_start_time = time.time()
+        self.import_service.import_all_data(self.temp_path, trusted=False)
+        checked_time = time.time() - checked_start_time
+
+        print(f"\nЗагрузка {self.count} транзакций ({os.path.getsize(self.temp_path) // 1024} КБ):")
+        print(f"  Доверенная загрузка: {trusted_time:.4f} сек")
+        print(f"  Загрузка с проверкой: {checked_time:.4f} сек")
+
+        self.assertEqual(counts["transactions"], self.count)
+        self.assertEqual(len(self.start_service.transactions), self.count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from src.logics.balance_index import BalanceIndex
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.transaction_model import TransactionModel
+from src.models.unit_measurement_model import UnitMeasurement
+
+
+class TestBalanceIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка номенклатуры, склада и базовой даты"""
+        self.gramm = UnitMeasurement.create_gramm()
+        group = GroupNomenclatureModel()
+        group.name = "Ингредиенты"
+        self.sugar = NomenclatureModel("sugar", "granulated sugar", group, self.gramm)
+        self.storage = StorageModel("Основной склад")
+        self.base_date = datetime(2025, 1, 1)
+
+    def _transaction(self, days: int, quantity: int, transaction_type: str) -> TransactionModel:
+        return TransactionModel(self.base_date + timedelta(days=days), self.sugar, self.storage,
+                                quantity, self.gramm, transaction_type)
+
+    def test_balance_at_built_index_running_balance_returned(self):
+        # Подготовка
+        index = BalanceIndex([
+            self._transaction(0, 100, "in"),
+            self._transaction(2, 30, "out"),
+            self._transaction(1, 50, "in")
+        ])
+
+        # Действие
+        before = index.balance_at(self.sugar.id, self.storage.id, self.base_date - timedelta(days=1))
+        middle = index.balance_at(self.sugar.id, self.storage.id, self.base_date + timedelta(days=1))
+        after = index.balance_at(self.sugar.id, self.storage.id, self.base_date + timedelta(days=5))
+
+        # Проверка
+        assert before == 0
+        assert middle == 150
+        assert after == 120
+        assert index.count == 3
+
+    def test_add_back_dated_transaction_later_balances_shifted(self):
+        # Подготовка
+        index = BalanceIndex([
+            self._transaction(0, 100, "in"),
+            self._transaction(2, 30, "out")
+        ])
+
+        # Действие
+        index.add(self._transaction(1, 60, "out"))
+
+        # Проверка
+        assert index.balance_at(self.sugar.id, self.storage.id, self.base_date + timedelta(days=1)) == 40
+        assert index.balance_at(self.sugar.id, self.storage.id, self.base_date + timedelta(days=2)) == 10
+        assert index.min_balance_from(self.sugar.id, self.storage.id, self.base_date) == 10
+
+    def test_remove_transaction_balances_restored(self):
+        # Подготовка
+        income = self._transaction(0, 100, "in")
+        outcome = self._transaction(1, 40, "out")
+        index = BalanceIndex([income, outcome])
+
+        # Действие
+        removed = index.remove(outcome)
+
+        # Проверка
+        assert removed is True
+        assert index.balance_at(self.sugar.id, self.storage.id, self.base_date + timedelta(days=1)) == 100
+        assert index.remove(outcome) is False
+        assert index.count == 1
+
+    def test_random_operations_same_as_full_scan(self):
+        # Подготовка
+        rng = random.Random(28)
+        transactions = [self._transaction(rng.randint(0, 30), rng.randint(1, 100), rng.choice(["in", "out"]))
+                        for _ in range(50)]
+        index = BalanceIndex(transactions[:20])
+        current = transactions[:20]
+
+        # Действие
+        for transaction in transactions[20:]:
+            if rng.random() < 0.3 and current:
+                removed = current.pop(rng.randrange(len(current)))
+                assert index.remove(removed) is True
+            index.add(transaction)
+            current.append(transaction)
+
+        # Проверка
+        def balance(date):
+            return sum(t.quantity if t.transaction_type == "in" else -t.quantity for t in current if t.date <= date)
+
+        for days in range(-1, 32):
+            date = self.base_date + timedelta(days=days)
+            later = [balance(t.date) for t in current if t.date > date]
+            assert index.balance_at(self.sugar.id, self.storage.id, date) == balance(date)
+            assert index.min_balance_from(self.sugar.id, self.storage.id, date) == min([balance(date)] + later)
+        assert index.count == len(current)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,8 @@ from src.logics.balance_service import BalanceService
 from src.start_service import StartService
 from src.settings_manager import SettingsManager
 from src.models.storage_model import StorageModel
+from src.models.period_type import PeriodType
+from src.core.validator import ArgumentException
 
 class TestBalanceService(unittest.TestCase):
     
@@ -112,6 +114,25 @@ class TestBalanceService(unittest.TestCase):
         self.assertIsInstance(balances, dict)
         self.assertEqual(len(balances), len(self.start_service.nomenclatures))
 
+    def test_balance_calculation_with_caching_storage_matches_full_calculation(self):
+        """Тест остатков по складу через кэш на дату блокировки: кэш раскладывается по складам"""
+        # Подготовка
+        blocking_date = datetime.now() - timedelta(days=15)
+        self.settings_manager.settings.blocking_date = blocking_date
+        self.balance_service.calculate_turnovers_until_blocking_date()
+        target_date = datetime.now()
+
+        for storage in self.start_service.storages.values():
+            # Действие
+            balances = self.balance_service.calculate_balances_until_date(target_date, storage)
+
+            # Проверка
+            # Итог кэша по всем складам не должен попадать в остатки одного склада
+            expected = self.balance_service._calculate_full_balances_with_prototype(target_date, storage)
+            for nom_id, data in expected.items():
+                actual = balances[nom_id]['balance'] if nom_id in balances else 0
+                self.assertAlmostEqual(actual, data['balance'], places=2)
+
     def test_get_balance_report(self):
         """Тест получения отчета по остаткам"""
         target_date = datetime.now()
@@ -123,6 +144,104 @@ class TestBalanceService(unittest.TestCase):
             self.assertIn('balance', item)
             self.assertIn('calculation_date', item)
 
+    def test_get_balance_series_day_step_matches_full_calculation(self):
+        """Тест ряда остатков: каждая точка совпадает с полным расчетом на ту же дату"""
+        # Подготовка
+        start_date = datetime.now() - timedelta(days=30)
+        end_date = datetime.now()
+
+        # Действие
+        series = self.balance_service.get_balance_series(start_date, end_date, PeriodType.DAY)
+
+        # Проверка
+        self.assertEqual(len(series), 31)
+        for point in series:
+            expected = self.balance_service._calculate_full_balances_with_prototype(
+                datetime.fromisoformat(point["date"])
+            )
+            actual = {row["nomenclature_id"]: row["balance"] for row in point["data"]}
+            for nom_id, data in expected.items():
+                self.assertAlmostEqual(actual[nom_id], data['balance'], places=2)
+
+    def test_get_balance_series_storage_filter_matches_storage_balance(self):
+        """Тест ряда остатков с фильтром по складу и номенклатуре"""
+        # Подготовка
+        storage = list(self.start_service.storages.values())[0]
+        nomenclature = list(self.start_service.nomenclatures.values())[0]
+        start_date = datetime.now() - timedelta(days=30)
+        end_date = datetime.now()
+
+        # Действие
+        series = self.balance_service.get_balance_series(
+            start_date, end_date, PeriodType.WEEK, [storage], [nomenclature]
+        )
+
+        # Проверка
+        self.assertEqual(len(series), 5)
+        last_point = series[-1]
+        expected = self.balance_service._calculate_full_balances_with_prototype(
+            datetime.fromisoformat(last_point["date"]), storage
+        )
+        for row in last_point["data"]:
+            self.assertEqual(row["nomenclature_id"], nomenclature.id)
+            self.assertAlmostEqual(row["balance"], expected[nomenclature.id]['balance'], places=2)
+
+    def test_get_balance_series_invalid_dates_throws_argument_exception(self):
+        """Тест ряда остатков с датой начала позже даты окончания"""
+        # Подготовка
+        start_date = datetime.now()
+        end_date = datetime.now() - timedelta(days=1)
+
+        # Действие и Проверка
+        with self.assertRaises(ArgumentException):
+            self.balance_service.get_balance_series(start_date, end_date, PeriodType.MONTH)
+
+
+    def test_get_balance_pivot_report_cells_match_storage_balances(self):
+        """Тест сводного отчета: ячейки и итоги совпадают с расчетом по каждому складу"""
+        # Подготовка
+        target_date = datetime.now()
+        storages = list(self.start_service.storages.values())
+
+        # Действие
+        report = self.balance_service.get_balance_pivot_report(target_date)
+
+        # Проверка
+        total_row = report[-1]
+        self.assertEqual(total_row["nomenclature_name"], "Итого")
+        rows = {row["nomenclature_id"]: row for row in report[:-1]}
+        for storage in storages:
+            expected = self.balance_service._calculate_full_balances_with_prototype(target_date, storage)
+            for nom_id, row in rows.items():
+                balance = expected[nom_id]['balance'] if nom_id in expected else 0
+                self.assertAlmostEqual(row[storage.name], balance, places=2)
+            self.assertAlmostEqual(
+                total_row[storage.name],
+                sum(data['balance'] for data in expected.values()),
+                places=2
+            )
+        for row in report:
+            self.assertAlmostEqual(row["total"], sum(row[s.name] for s in storages), places=2)
+
+
+    def test_get_balance_pivot_report_with_blocking_cache_matches_full_calculation(self):
+        """Тест сводного отчета через кэш на дату блокировки и дневные итоги"""
+        # Подготовка
+        self.settings_manager.settings.blocking_date = datetime.now() - timedelta(days=15)
+        self.balance_service.calculate_turnovers_until_blocking_date()
+        target_date = datetime.now()
+        storage = list(self.start_service.storages.values())[0]
+
+        # Действие
+        report = self.balance_service.get_balance_pivot_report(target_date, [storage])
+
+        # Проверка
+        expected = self.balance_service._calculate_full_balances_with_prototype(target_date, storage)
+        rows = {row["nomenclature_id"]: row for row in report[:-1]}
+        for nom_id, data in expected.items():
+            if round(data['balance'], 2) != 0:
+                self.assertAlmostEqual(rows[nom_id][storage.name], data['balance'], places=2)
+        self.assertEqual(len(rows), len([d for d in expected.values() if round(d['balance'], 2) != 0]))
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,114 @@
+import unittest
+from src.core.common import common
+from src.core.validator import ArgumentException
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.recipe_model import RecipeModel
+from src.models.transaction_model import TransactionModel
+from datetime import datetime
+
+
+class TestCommon(unittest.TestCase):
+
+    def test_get_schema_transaction_kinds(self):
+        """Проверка схемы полей транзакции по объявлениям класса"""
+        # Действие
+        schema = {field["name"]: field for field in common.get_schema(TransactionModel)}
+
+        # Проверка
+        self.assertEqual(schema["date"]["kind"], "date")
+        self.assertEqual(schema["nomenclature"]["kind"], "reference")
+        self.assertEqual(schema["unit_measurement"]["kind"], "reference")
+        self.assertEqual(schema["quantity"]["kind"], "value")
+        self.assertEqual(schema["transaction_type"]["kind"], "value")
+        self.assertFalse(any(field["collection"] for field in schema.values()))
+
+    def test_get_schema_built_once(self):
+        """Проверка построения схемы один раз на класс"""
+        # Действие
+        schema = common.get_schema(GroupNomenclatureModel)
+
+        # Проверка
+        self.assertIs(common.get_schema(GroupNomenclatureModel), schema)
+        self.assertEqual({f["name"]: f["kind"] for f in schema}["parent"], "reference")
+
+    def test_get_fields_common_skips_collections_without_reading_values(self):
+        """Проверка исключения коллекций по схеме без чтения значений свойств"""
+        # Подготовка
+        class Counted(GroupNomenclatureModel):
+            reads = 0
+
+            @property
+            def items(self) -> list:
+                Counted.reads += 1
+                return []
+
+            @property
+            def total(self) -> int:
+                Counted.reads += 1
+                return 0
+
+        item = Counted()
+
+        # Действие
+        all_fields = common.get_fields(item)
+        common_fields = common.get_fields(item, is_common=True)
+
+        # Проверка
+        self.assertIn("items", all_fields)
+        self.assertNotIn("items", common_fields)
+        self.assertIn("total", common_fields)
+        self.assertEqual(Counted.reads, 0)
+
+    def test_get_fields_collections_from_field_declarations(self):
+        """Проверка коллекций, объявленных полем класса или типом свойства"""
+        # Подготовка
+        class Report:
+            __rows: dict = None
+            __tags = []
+
+            @property
+            def rows(self):
+                return {}
+
+            @property
+            def tags(self):
+                return []
+
+            @property
+            def totals(self) -> list:
+                return []
+
+            @property
+            def start_date(self) -> datetime:
+                return None
+
+        recipe = RecipeModel("Блины", "Рецепт")
+
+        # Действие
+        recipe_fields = common.get_fields(recipe, is_common=True)
+        report_fields = common.get_fields(Report(), is_common=True)
+
+        # Проверка
+        self.assertEqual(recipe_fields, ["description", "id", "name"])
+        self.assertEqual(report_fields, ["start_date"])
+
+    def test_get_fields_dict_row_uses_keys(self):
+        """Проверка полей строки отчета - ключи словаря"""
+        # Подготовка
+        row = {"nomenclature": "мука", "opening": 1.0, "data": []}
+
+        # Действие
+        result = common.get_fields(row, is_common=True)
+
+        # Проверка
+        self.assertEqual(result, ["nomenclature", "opening"])
+
+    def test_get_fields_none_raises(self):
+        """Проверка исключения для пустого источника"""
+        # Действие и проверка
+        with self.assertRaises(ArgumentException):
+            common.get_fields(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
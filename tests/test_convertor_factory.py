@@ -3,6 +3,7 @@ from src.models.group_nomenclature_model import GroupNomenclatureModel
 from src.models.unit_measurement_model import UnitMeasurement
 from src.models.nomenclature_model import NomenclatureModel
 from src.logics.convert_factory import ConvertFactory
+from src.models.reference_mode import ReferenceMode
 from datetime import datetime
 
 class TestConvertFactory(unittest.TestCase):
@@ -69,5 +70,194 @@ class TestConvertFactory(unittest.TestCase):
         self.assertIsNotNone(self.factory._convertors)
         self.assertTrue(len(self.factory._convertors) > 0)
 
+    def test_convert_fields_only_requested_fields(self):
+        """Проверка вывода только запрошенных полей (ссылку можно указать с суффиксом _id)"""
+        # Подготовка
+        group = GroupNomenclatureModel()
+        group.name = "Группа"
+        unit = UnitMeasurement("грамм", 1)
+        nomenclature = NomenclatureModel("мука", "пшеничная мука", group, unit)
+
+        # Действие
+        result = self.factory.convert(nomenclature, fields=["name", "unit_measurement_id"])
+
+        # Проверка
+        self.assertEqual(result, {"name": "мука", "unit_measurement_id": unit.id})
+
+    def test_convert_reference_mode_name_and_full(self):
+        """Проверка вывода ссылок наименованием и вложенным объектом"""
+        # Подготовка
+        group = GroupNomenclatureModel()
+        group.name = "Группа"
+        unit = UnitMeasurement("грамм", 1)
+        nomenclature = NomenclatureModel("мука", "пшеничная мука", group, unit)
+
+        # Действие
+        by_name = self.factory.convert(nomenclature, reference_mode=ReferenceMode.NAME)
+        full = self.factory.convert(nomenclature, fields=["group_nomenclature"], reference_mode=ReferenceMode.FULL)
+
+        # Проверка
+        self.assertEqual(by_name["group_nomenclature"], "Группа")
+        self.assertEqual(by_name["unit_measurement"], "грамм")
+        self.assertNotIn("unit_measurement_id", by_name)
+        self.assertEqual(full["group_nomenclature"]["name"], "Группа")
+        self.assertEqual(full["group_nomenclature"]["id"], group.id)
+
+    def test_get_plan_built_once_without_reading_values(self):
+        """Проверка плана сериализации: строится один раз по классу, значения не читаются"""
+        # Подготовка
+        class Counted(GroupNomenclatureModel):
+            reads = 0
+
+            @property
+            def counted(self):
+                Counted.reads += 1
+                return 1
+
+        # Действие
+        plan = ConvertFactory.get_plan(Counted)
+
+        # Проверка
+        self.assertIs(ConvertFactory.get_plan(Counted), plan)
+        self.assertIn("counted", [field for field, _ in plan])
+        self.assertEqual(Counted.reads, 0)
+
+    def test_convert_transaction_same_as_reflection(self):
+        """Проверка совпадения результата по плану с разбором полей через common.get_fields"""
+        # Подготовка
+        from src.core.common import common
+        from src.models.storage_model import StorageModel
+        from src.models.transaction_model import TransactionModel
+
+        unit = UnitMeasurement.create_gramm()
+        group = GroupNomenclatureModel()
+        group.name = "Группа"
+        nomenclature = NomenclatureModel("мука", "пшеничная мука", group, unit)
+        transaction = TransactionModel(datetime(2025, 1, 1, 12), nomenclature, StorageModel("Склад"), 5, unit, "in")
+
+        expected = {}
+        for field in common.get_fields(transaction):
+            value = getattr(transaction, field)
+            if hasattr(value, "id") and not isinstance(value, (str, datetime)):
+                expected[f"{field}_id"] = value.id
+            else:
+                expected[field] = value.isoformat() if isinstance(value, datetime) else value
+
+        # Действие
+        first = self.factory.convert(transaction)
+        second = ConvertFactory().convert(transaction)
+
+        # Проверка
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+
+    def test_convert_fast_path_falls_back_on_failing_property(self):
+        """Проверка перехода на общий путь, если свойство не читается"""
+        # Подготовка
+        class Broken(GroupNomenclatureModel):
+            @property
+            def broken(self):
+                raise ValueError("ошибка")
+
+        item = Broken()
+        item.name = "Группа"
+
+        # Действие
+        result = self.factory.convert(item)
+
+        # Проверка
+        self.assertEqual(result["name"], "Группа")
+        self.assertNotIn("broken", result)
+
+    def test_convert_value_field_with_other_type_uses_general_path(self):
+        """Проверка поля-значения, в котором затем встретилась модель: модель не попадает в ответ как есть"""
+        # Подготовка
+        class Tagged(GroupNomenclatureModel):
+            payload = None
+
+            @property
+            def tag(self):
+                return self.payload
+
+        first = Tagged()
+        first.payload = "текст"
+        inner = GroupNomenclatureModel.create("Вложенная")
+        second = Tagged()
+        second.payload = inner
+
+        # Действие
+        self.factory.convert(first)
+        result = self.factory.convert(second)
+
+        # Проверка
+        self.assertNotIsInstance(result["tag"], GroupNomenclatureModel)
+        self.assertEqual(result["tag"], inner.id)
+
+    def test_convert_reference_first_none_then_model(self):
+        """Проверка ссылки, которая сначала встретилась пустой, а затем заполненной"""
+        # Подготовка
+        gramm = UnitMeasurement.create_gramm()
+        kilo = UnitMeasurement.create_kilo(gramm)
+
+        # Действие
+        first = self.factory.convert(gramm)
+        second = self.factory.convert(kilo)
+        third = self.factory.convert(kilo)
+
+        # Проверка
+        self.assertIsNone(first["base_unit"])
+        self.assertEqual(second["base_unit_id"], gramm.id)
+        self.assertEqual(third, second)
+
+    def test_expand_serializes_shared_reference_once(self):
+        """Проверка таблицы связанных моделей: общий объект сериализуется один раз за ответ"""
+        # Подготовка
+        gramm = UnitMeasurement.create_gramm()
+        group = GroupNomenclatureModel()
+        group.name = "Группа"
+        nomenclatures = [NomenclatureModel(f"товар {i}", "товар", group, gramm) for i in range(5)]
+        converted = []
+        convert = self.factory.convert
+        self.factory.convert = lambda obj, *args: converted.append(obj) or convert(obj, *args)
+
+        # Действие
+        references = self.factory.expand(nomenclatures)
+
+        # Проверка
+        self.assertEqual(set(references.keys()), {gramm.id, group.id})
+        self.assertEqual(references[gramm.id]["name"], "грамм")
+        self.assertEqual(len(converted), 2)
+
+    def test_expand_depth(self):
+        """Проверка глубины раскрытия ссылок"""
+        # Подготовка
+        parent = GroupNomenclatureModel()
+        parent.name = "Родитель"
+        group = GroupNomenclatureModel(parent)
+        group.name = "Группа"
+        gramm = UnitMeasurement.create_gramm()
+        kilo = UnitMeasurement.create_kilo(gramm)
+        nomenclature = NomenclatureModel("мука", "пшеничная мука", group, kilo)
+
+        # Действие
+        none = self.factory.expand([nomenclature], 0)
+        first = self.factory.expand([nomenclature], 1)
+        second = self.factory.expand([nomenclature], 2)
+
+        # Проверка
+        self.assertEqual(none, {})
+        self.assertEqual(set(first.keys()), {group.id, kilo.id})
+        self.assertEqual(first[group.id]["parent_id"], parent.id)
+        self.assertEqual(set(second.keys()), {group.id, kilo.id, parent.id, gramm.id})
+
+    def test_expand_negative_depth_raises(self):
+        """Проверка исключения для отрицательной глубины"""
+        # Подготовка
+        from src.core.validator import ArgumentException
+
+        # Действие и проверка
+        with self.assertRaises(ArgumentException):
+            self.factory.expand([], -1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
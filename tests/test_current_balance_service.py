@@ -0,0 +1,99 @@
+import unittest
+from datetime import datetime, timedelta
+
+from src.logics.current_balance_service import CurrentBalanceService
+from src.logics.transaction_service import TransactionService
+from src.models.transaction_model import TransactionModel
+from src.start_service import StartService
+from src.core.observe_service import ObserveService
+from src.core.event_type import EventType
+
+
+class TestCurrentBalanceService(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка справочников, стартовых транзакций и сервисов"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.transaction_service = TransactionService(self.start_service)
+        self.current_balance_service = CurrentBalanceService(self.start_service)
+
+        self.storage = self.start_service.storages["main"]
+        self.sugar = self.start_service.nomenclatures["sugar"]
+        self.gramm = self.start_service.units_measure["gramm"]
+
+    def test_get_balance_transaction_added_table_updated(self):
+        # Подготовка
+        before = self.current_balance_service.get_balance(self.sugar, self.storage)
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 250, self.gramm, "in")
+
+        # Действие
+        self.transaction_service.add_transaction(transaction)
+
+        # Проверка
+        assert self.current_balance_service.get_balance(self.sugar, self.storage) == before + 250
+        assert self.current_balance_service.check_consistency() == []
+
+    def test_get_balance_transaction_updated_and_deleted_table_updated(self):
+        # Подготовка
+        before = self.current_balance_service.get_balance(self.sugar, self.storage)
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 250, self.gramm, "in")
+        self.transaction_service.add_transaction(transaction)
+
+        # Действие
+        self.transaction_service.update_transaction(transaction.id, {"quantity": 100}, allow_negative=True)
+        after_update = self.current_balance_service.get_balance(self.sugar, self.storage)
+        self.transaction_service.delete_transaction(transaction.id, allow_negative=True)
+        after_delete = self.current_balance_service.get_balance(self.sugar, self.storage)
+
+        # Проверка
+        assert after_update == before + 100
+        assert after_delete == before
+        assert self.current_balance_service.check_consistency() == []
+
+    def test_get_current_balances_report_matches_full_recalculation(self):
+        # Подготовка
+        expected = {}
+        for transaction in self.start_service.transactions.values():
+            quantity = transaction.get_quantity_in_base_units()
+            sign = 1 if transaction.transaction_type == "in" else -1
+            nom_id = transaction.nomenclature.id
+            expected[nom_id] = expected.get(nom_id, 0) + sign * quantity
+
+        # Действие
+        report = self.current_balance_service.get_current_balances_report()
+
+        # Проверка
+        for row in report:
+            self.assertAlmostEqual(row["balance"], expected[row["nomenclature_id"]], places=2)
+
+    def test_check_consistency_table_changed_outside_events_differences_found(self):
+        # Подготовка
+        transaction = list(self.start_service.transactions.values())[0]
+        self.current_balance_service.get_balance(self.sugar, self.storage)
+
+        # Действие
+        # Количество меняется напрямую, без события - таблица об этом не знает
+        transaction.quantity = transaction.quantity + 1
+        differences = self.current_balance_service.check_consistency()
+
+        # Проверка
+        assert len(differences) == 1
+        assert differences[0]["nomenclature_id"] == transaction.nomenclature.id
+
+
+    def test_get_balance_reload_event_same_count_table_rebuilt(self):
+        # Подготовка
+        transaction = list(self.start_service.transactions.values())[0]
+        self.current_balance_service.get_balance(self.sugar, self.storage)
+        # Правка на месте без изменения количества транзакций - по хранилищу не обнаружить
+        transaction.quantity = transaction.quantity + 1
+
+        # Действие
+        ObserveService.create_event(EventType.reload_transactions_key(), None)
+
+        # Проверка
+        assert self.current_balance_service.check_consistency() == []
+
+if __name__ == '__main__':
+    unittest.main()
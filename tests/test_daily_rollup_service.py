@@ -0,0 +1,120 @@
+import unittest
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from src.logics.daily_rollup_service import DailyRollupService
+from src.logics.transaction_service import TransactionService
+from src.logics.turnover_report_service import TurnoverReportService
+from src.logics.balance_service import BalanceService
+from src.models.transaction_model import TransactionModel
+from src.start_service import StartService
+
+
+class TestDailyRollupService(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка справочников, стартовых транзакций и сервисов"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.transaction_service = TransactionService(self.start_service)
+        self.daily_rollup_service = DailyRollupService(self.start_service)
+
+        self.storage = self.start_service.storages["main"]
+        self.sugar = self.start_service.nomenclatures["sugar"]
+        self.gramm = self.start_service.units_measure["gramm"]
+
+    def _raw_aggregate(self, bounds: list, end_date: datetime) -> list:
+        """Эталонный расчет по всем транзакциям"""
+        result = [{} for _ in range(len(bounds) + 1)]
+        for transaction in self.start_service.transactions.values():
+            if transaction.date > end_date:
+                continue
+
+            key = (transaction.nomenclature.id, transaction.storage.id)
+            values = result[bisect_right(bounds, transaction.date)].setdefault(key, [0, 0, 0])
+            values[0 if transaction.transaction_type == "in" else 1] += transaction.get_quantity_in_base_units()
+            values[2] += 1
+
+        return result
+
+    def _assert_same(self, actual: list, expected: list):
+        assert len(actual) == len(expected)
+        for actual_totals, expected_totals in zip(actual, expected):
+            assert set(actual_totals.keys()) == set(expected_totals.keys())
+            for key, values in expected_totals.items():
+                assert all(abs(a - b) < 1e-6 for a, b in zip(actual_totals[key], values))
+
+    def test_aggregate_partial_day_bounds_match_raw_transactions(self):
+        # Подготовка
+        end_date = datetime.now()
+        bounds = [end_date - timedelta(days=20, hours=5), end_date - timedelta(days=10)]
+
+        # Действие
+        result = self.daily_rollup_service.aggregate(bounds, end_date)
+
+        # Проверка
+        self._assert_same(result, self._raw_aggregate(bounds, end_date))
+
+    def test_aggregate_whole_day_bounds_match_raw_transactions(self):
+        # Подготовка
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        bounds = [today - timedelta(days=20), today - timedelta(days=10)]
+        end_date = today - timedelta(microseconds=1)
+
+        # Действие
+        result = self.daily_rollup_service.aggregate(bounds, end_date)
+
+        # Проверка
+        self._assert_same(result, self._raw_aggregate(bounds, end_date))
+
+    def test_aggregate_transactions_changed_rollups_updated(self):
+        # Подготовка
+        transaction = TransactionModel(datetime.now() - timedelta(days=3), self.sugar, self.storage, 250, self.gramm, "in")
+        self.daily_rollup_service.aggregate([datetime.now()], datetime.now())
+
+        # Действие
+        self.transaction_service.add_transaction(transaction)
+        self.transaction_service.update_transaction(transaction.id, {"date": datetime.now() - timedelta(days=1),
+                                                                     "quantity": 400}, allow_negative=True)
+        other = TransactionModel(datetime.now() - timedelta(days=5), self.sugar, self.storage, 100, self.gramm, "in")
+        self.transaction_service.add_transaction(other)
+        self.transaction_service.delete_transaction(other.id, allow_negative=True)
+
+        # Проверка
+        assert self.daily_rollup_service.check_consistency() == []
+        bounds = [datetime.now() - timedelta(days=2)]
+        self._assert_same(self.daily_rollup_service.aggregate(bounds, datetime.now()),
+                          self._raw_aggregate(bounds, datetime.now()))
+
+    def test_rebuild_rows_fewer_than_transactions(self):
+        # Подготовка
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 1, self.gramm, "in")
+        self.start_service.transactions[transaction.id] = transaction
+
+        # Действие
+        self.daily_rollup_service.rebuild()
+
+        # Проверка
+        assert self.daily_rollup_service.rows_count <= len(self.start_service.transactions)
+        assert self.daily_rollup_service.check_consistency() == []
+
+
+    def test_services_use_injected_rollups(self):
+        """Отчеты читают переданный экземпляр дневных итогов - перестроение видно отчетам"""
+        # Подготовка
+        turnover_service = TurnoverReportService(self.start_service, self.daily_rollup_service)
+        balance_service = BalanceService(self.start_service, None, self.daily_rollup_service)
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 1, self.gramm, "in")
+        self.start_service.transactions[transaction.id] = transaction
+
+        # Действие
+        self.daily_rollup_service.rebuild()
+        report = turnover_service.generate_turnover_report(datetime.now() - timedelta(days=1), datetime.now())
+
+        # Проверка
+        assert turnover_service.daily_rollup_service is self.daily_rollup_service
+        assert balance_service.daily_rollup_service is self.daily_rollup_service
+        assert self.sugar.id in [row["nomenclature_id"] for row in report]
+
+if __name__ == '__main__':
+    unittest.main()
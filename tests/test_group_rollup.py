@@ -0,0 +1,98 @@
+import unittest
+
+from src.core.validator import ArgumentException
+from src.logics.group_rollup import GroupRollup
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.unit_measurement_model import UnitMeasurement
+
+
+class TestGroupRollup(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка иерархии: Продукты -> (Молочные, Мясо), Бакалея"""
+        self.gramm = UnitMeasurement("грамм", 1)
+
+        self.products = self._create_group("Продукты")
+        self.dairy = self._create_group("Молочные", self.products)
+        self.meat = self._create_group("Мясо", self.products)
+        self.dry = self._create_group("Бакалея")
+
+        self.milk = NomenclatureModel("milk", "milk", self.dairy, self.gramm)
+        self.butter = NomenclatureModel("butter", "butter", self.dairy, self.gramm)
+        self.beef = NomenclatureModel("beef", "beef", self.meat, self.gramm)
+        self.sugar = NomenclatureModel("sugar", "sugar", self.dry, self.gramm)
+        self.nomenclatures = [self.milk, self.butter, self.beef, self.sugar]
+
+    def _create_group(self, name: str, parent: GroupNomenclatureModel = None) -> GroupNomenclatureModel:
+        group = GroupNomenclatureModel(parent)
+        group.name = name
+        return group
+
+    def test_build_nested_groups_subtotals_rolled_up(self):
+        # Подготовка
+        report_data = [
+            {"nomenclature_id": self.milk.id, "balance": 100},
+            {"nomenclature_id": self.butter.id, "balance": 50.5},
+            {"nomenclature_id": self.beef.id, "balance": 200},
+            {"nomenclature_id": self.sugar.id, "balance": 30}
+        ]
+
+        # Действие
+        result = GroupRollup.build(report_data, self.nomenclatures, ["balance"])
+
+        # Проверка
+        totals = {row["group_name"]: row for row in result}
+        assert totals["Молочные"]["balance"] == 150.5
+        assert totals["Мясо"]["balance"] == 200
+        assert totals["Продукты"]["balance"] == 350.5
+        assert totals["Продукты"]["nomenclature_count"] == 3
+        assert totals["Бакалея"]["balance"] == 30
+
+    def test_build_nested_groups_parent_before_children(self):
+        # Подготовка
+        report_data = [
+            {"nomenclature_id": self.beef.id, "balance": 1},
+            {"nomenclature_id": self.milk.id, "balance": 1},
+            {"nomenclature_id": self.sugar.id, "balance": 1}
+        ]
+
+        # Действие
+        result = GroupRollup.build(report_data, self.nomenclatures, ["balance"])
+
+        # Проверка
+        assert [row["group_name"] for row in result] == ["Бакалея", "Продукты", "Молочные", "Мясо"]
+        assert [row["level"] for row in result] == [0, 0, 1, 1]
+        assert result[2]["parent_id"] == self.products.id
+
+    def test_build_with_unit_skips_incompatible_rows(self):
+        # Подготовка: отчет в килограммах, говядина учитывается в штуках
+        kilo = UnitMeasurement.create_kilo(self.gramm)
+        self.beef.unit_measurement = UnitMeasurement("штука", 1)
+        report_data = [
+            {"nomenclature_id": self.milk.id, "balance": 1.5},
+            {"nomenclature_id": self.beef.id, "balance": 4},
+            {"nomenclature_id": self.sugar.id, "balance": 2}
+        ]
+
+        # Действие
+        result = GroupRollup.build(report_data, self.nomenclatures, ["balance"], kilo)
+
+        # Проверка
+        totals = {row["group_name"]: row for row in result}
+        assert "Мясо" not in totals
+        assert totals["Продукты"]["balance"] == 1.5
+        assert totals["Продукты"]["nomenclature_count"] == 1
+        assert totals["Бакалея"]["balance"] == 2
+
+    def test_set_group_parent_cycle_throws_argument_exception(self):
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            self.products.parent = self.dairy
+
+        assert self.products.parent is None
+        assert self.dairy.path() == [self.products, self.dairy]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import json
+import os
+import tempfile
+from src.logics.import_service import ImportService
+from src.logics.export_service import ExportService
+from src.start_service import StartService
+from src.repository import Repository
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.core.validator import ArgumentException, OperationException
+
+
+class TestImportService(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.import_service = ImportService(self.start_service)
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
+            self.temp_path = temp_file.name
+
+    def tearDown(self):
+        if os.path.exists(self.temp_path):
+            os.unlink(self.temp_path)
+
+    def _snapshot(self) -> dict:
+        """Содержимое репозитория в виде словарей ExportService"""
+        export_service = ExportService(self.start_service)
+        return {
+            key: sorted((export_service.convert_factory.convert(item) for item in items.values()),
+                        key=lambda item: item["id"])
+            for key, items in self.start_service.data.items()
+        }
+
+    def _write(self, data: dict):
+        with open(self.temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def test_import_round_trip(self):
+        """Проверка загрузки выгрузки ExportService: доверенный и проверяемый режимы, разные блоки чтения"""
+        # Подготовка
+        ExportService(self.start_service).export_all_data(self.temp_path)
+        expected = self._snapshot()
+
+        for trusted in (True, False):
+            for chunk_size in (7, 1024 * 1024):
+                with self.subTest(trusted=trusted, chunk_size=chunk_size):
+                    # Действие
+                    counts = self.import_service.import_all_data(self.temp_path, trusted, chunk_size)
+
+                    # Проверка
+                    self.assertEqual(self._snapshot(), expected)
+                    self.assertEqual(counts["transactions"], len(expected[Repository.transaction_key]))
+
+    def test_import_resolves_shared_references(self):
+        """Проверка разрешения ссылок: общие модели загружаются одним объектом"""
+        # Подготовка
+        ExportService(self.start_service).export_all_data(self.temp_path)
+
+        # Действие
+        self.import_service.import_all_data(self.temp_path)
+
+        # Проверка
+        units = {unit.id: unit for unit in self.start_service.units_measure.values()}
+        for transaction in self.start_service.transactions.values():
+            self.assertIs(transaction.unit_measurement, units[transaction.unit_measurement.id])
+            self.assertIs(transaction.nomenclature,
+                          next(n for n in self.start_service.nomenclatures.values() if n.id == transaction.nomenclature.id))
+            self.assertGreater(transaction.get_quantity_in_base_units(), 0)
+
+    def test_import_sections_out_of_order(self):
+        """Проверка загрузки, если разделы и ссылки внутри справочника идут не по порядку"""
+        # Подготовка
+        gramm = UnitMeasurement.create_gramm()
+        kilo = UnitMeasurement.create_kilo(gramm)
+        parent = GroupNomenclatureModel()
+        parent.name = "Родитель"
+        group = GroupNomenclatureModel(parent)
+        group.name = "Группа"
+        nomenclature = {"id": "n1", "name": "мука", "full_name": "мука",
+                        "group_nomenclature_id": group.id, "unit_measurement_id": kilo.id}
+        self._write({
+            "transactions": [{"id": "t1", "date": "2025-01-01T10:00:00", "nomenclature_id": "n1",
+                              "storage_id": "s1", "quantity": 2, "unit_measurement_id": kilo.id,
+                              "transaction_type": "in"}],
+            "nomenclatures": [nomenclature],
+            "groups_nomenclature": [{"id": group.id, "name": "Группа", "parent_id": parent.id},
+                                    {"id": parent.id, "name": "Родитель", "parent": None}],
+            "units_measure": [{"id": kilo.id, "name": "кг", "coefficient": 1000, "base_unit_id": gramm.id},
+                              {"id": gramm.id, "name": "грамм", "coefficient": 1, "base_unit": None}],
+            "storages": [{"id": "s1", "name": "Склад"}]
+        })
+
+        for trusted in (True, False):
+            with self.subTest(trusted=trusted):
+                # Действие
+                counts = self.import_service.import_all_data(self.temp_path, trusted)
+
+                # Проверка
+                transaction = self.start_service.transactions["t1"]
+                self.assertEqual(counts["recipes"], 0)
+                self.assertEqual(transaction.get_quantity_in_base_units(), 2000)
+                self.assertEqual(transaction.nomenclature.group_nomenclature.parent.name, "Родитель")
+                self.assertEqual(transaction.unit_measurement.base_unit.name, "грамм")
+
+    def test_import_missing_reference_keeps_repository(self):
+        """Проверка ошибки по неизвестной ссылке: данные репозитория не заменяются"""
+        # Подготовка
+        self._write({
+            "units_measure": [],
+            "storages": [{"id": "s1", "name": "Склад"}],
+            "transactions": [{"id": "t1", "date": "2025-01-01T10:00:00", "nomenclature_id": "n1",
+                              "storage_id": "s1", "quantity": 2, "unit_measurement_id": "u1",
+                              "transaction_type": "in"}]
+        })
+        transactions = self.start_service.transactions
+
+        # Действие и проверка
+        with self.assertRaises(ArgumentException):
+            self.import_service.import_all_data(self.temp_path)
+
+        self.assertIs(self.start_service.transactions, transactions)
+
+    def test_import_malformed_pending_item(self):
+        """Проверка ошибки в отложенном до конца файла элементе: ArgumentException, репозиторий не заменяется"""
+        # Подготовка: раздела рецептов нет - транзакции загружаются после чтения всего файла
+        self._write({
+            "units_measure": [{"id": "u1", "name": "грамм", "coefficient": 1}],
+            "storages": [{"id": "s1", "name": "Склад"}],
+            "nomenclatures": [{"id": "n1", "name": "Сахар", "full_name": "Сахар",
+                               "unit_measurement_id": "u1"}],
+            "transactions": [{"id": "t1", "nomenclature_id": "n1", "storage_id": "s1", "quantity": 2,
+                              "unit_measurement_id": "u1", "transaction_type": "in"}]
+        })
+        transactions = self.start_service.transactions
+
+        # Действие и проверка
+        with self.assertRaises(ArgumentException):
+            self.import_service.import_all_data(self.temp_path)
+
+        self.assertIs(self.start_service.transactions, transactions)
+
+    def test_import_invalid_file(self):
+        """Проверка ошибок для отсутствующего и поврежденного файла"""
+        # Подготовка
+        with open(self.temp_path, 'w', encoding='utf-8') as f:
+            f.write('{"units_measure": [{"id": "u1", ')
+
+        # Действие и проверка
+        with self.assertRaises(ArgumentException):
+            self.import_service.import_all_data(self.temp_path)
+
+        with self.assertRaises(OperationException):
+            self.import_service.import_all_data(self.temp_path + ".missing")
+
+
+if __name__ == '__main__':
+    unittest.main()
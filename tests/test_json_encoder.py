@@ -0,0 +1,90 @@
+import unittest
+import json
+import uuid
+from datetime import datetime, date
+from src.logics.json_encoder import JsonEncoder
+from src.models.filter_type import FilterType
+from src.models.storage_model import StorageModel
+from src.core.validator import ArgumentException
+
+
+class TestJsonEncoder(unittest.TestCase):
+
+    def test_backends_produce_same_compact_bytes(self):
+        """Проверка одинакового компактного результата у всех доступных бэкендов"""
+        # Подготовка
+        storage = StorageModel("Склад")
+        identifier = uuid.uuid4()
+        value = {
+            "name": "Мука \"высший сорт\"",
+            "date": datetime(2025, 1, 2, 3, 4, 5, 6),
+            "day": date(2025, 1, 2),
+            "type": FilterType.EQUALS,
+            "storage": storage,
+            "uuid": identifier,
+            "items": [1, 2.5, None, True],
+            1: "ключ-число"
+        }
+        expected = json.dumps({
+            "name": "Мука \"высший сорт\"",
+            "date": "2025-01-02T03:04:05.000006",
+            "day": "2025-01-02",
+            "type": FilterType.EQUALS.value,
+            "storage": storage.id,
+            "uuid": str(identifier),
+            "items": [1, 2.5, None, True],
+            "1": "ключ-число"
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        for backend in JsonEncoder.available_backends():
+            with self.subTest(backend=backend):
+                # Действие
+                result = JsonEncoder(backend).encode(value)
+
+                # Проверка
+                self.assertIsInstance(result, bytes)
+                self.assertEqual(result, expected)
+
+    def test_indent(self):
+        """Проверка вывода с отступами"""
+        for backend in JsonEncoder.available_backends():
+            with self.subTest(backend=backend):
+                # Действие
+                result = JsonEncoder(backend).encode({"a": [1]}, indent=True)
+
+                # Проверка
+                self.assertEqual(json.loads(result), {"a": [1]})
+                self.assertIn(b"\n  ", result)
+
+    def test_unknown_type_raises(self):
+        """Проверка ошибки для типа без обработчика (вместо вывода str(value))"""
+        for backend in JsonEncoder.available_backends():
+            with self.subTest(backend=backend):
+                # Действие и проверка
+                with self.assertRaises(TypeError):
+                    JsonEncoder(backend).encode({"value": object()})
+
+    def test_register_handler(self):
+        """Проверка регистрации обработчика типа"""
+        # Подготовка
+        class Money:
+            def __init__(self, amount):
+                self.amount = amount
+
+        JsonEncoder.register(Money, lambda value: {"amount": value.amount})
+
+        # Действие
+        result = JsonEncoder("stdlib").encode([Money(5)])
+
+        # Проверка
+        self.assertEqual(result, b'[{"amount":5}]')
+
+    def test_unknown_backend_raises(self):
+        """Проверка исключения для неизвестного бэкенда"""
+        # Действие и проверка
+        with self.assertRaises(ArgumentException):
+            JsonEncoder("yaml")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from src.core.observe_service import ObserveService
+
+
+class TestObserveService(unittest.TestCase):
+
+    class Listener:
+        """Наблюдатель, запоминающий полученные события"""
+
+        def __init__(self):
+            self.events = []
+
+        def handle(self, event: str, params):
+            self.events.append(event)
+
+    def setUp(self):
+        """Подготовка наблюдателя"""
+        self.listener = self.Listener()
+        ObserveService.add(self.listener)
+
+    def tearDown(self):
+        ObserveService.delete(self.listener)
+
+    def test_delete_removes_instance(self):
+        # Действие
+        ObserveService.delete(self.listener)
+        ObserveService.create_event("test_event", None)
+
+        # Проверка
+        assert self.listener not in ObserveService.handlers
+        assert self.listener.events == []
+
+    def test_delete_unknown_instance_ignored(self):
+        # Подготовка
+        handlers = list(ObserveService.handlers)
+
+        # Действие
+        ObserveService.delete(self.Listener())
+        ObserveService.delete(None)
+
+        # Проверка
+        assert ObserveService.handlers == handlers
+
+    def test_add_instance_once(self):
+        # Действие
+        ObserveService.add(self.listener)
+        ObserveService.create_event("test_event", None)
+
+        # Проверка
+        assert ObserveService.handlers.count(self.listener) == 1
+        assert self.listener.events == ["test_event"]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,507 @@
+import os
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from src.dtos.filter_dto import FilterDto
+from src.logics.balance_service import BalanceService
+from src.logics.current_balance_service import CurrentBalanceService
+from src.logics.transaction_service import TransactionService
+from src.logics.turnover_report_service import TurnoverReportService
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.period_type import PeriodType
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+from src.settings_manager import SettingsManager
+from src.start_service import StartService
+
+
+class TestReportOracle(unittest.TestCase):
+    """
+    Дифференциальная проверка движков отчетов.
+
+    Транзакции генерируются по seed, для каждого случая выбираются период, склад
+    и фильтры. Результат каждого движка сравнивается с медленным эталонным
+    расчетом по списку транзакций. Найденное расхождение сжимается: убираются
+    фильтры, склад и блоки транзакций, пока расхождение сохраняется.
+    Seed и количество случаев задаются переменными окружения
+    REPORT_ORACLE_SEED и REPORT_ORACLE_CASES.
+    """
+
+    seed = int(os.environ.get("REPORT_ORACLE_SEED", "20251019"))
+    cases = int(os.environ.get("REPORT_ORACLE_CASES", "25"))
+    base_date = datetime(2025, 1, 1)
+
+    def setUp(self):
+        """Подготовка справочников и сервисов"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.settings_manager = SettingsManager("test_data/test_settings.json")
+        self.settings_manager.load()
+
+        self.turnover_service = TurnoverReportService(self.start_service)
+        self.balance_service = BalanceService(self.start_service, self.settings_manager)
+        self.balance_service.balances_file = "test_data/oracle_balances_cache.json"
+        self.current_balance_service = CurrentBalanceService(self.start_service)
+        self.transaction_service = TransactionService(self.start_service)
+
+        # Вторая группа, чтобы фильтр по группе отбирал часть номенклатур
+        grocery = GroupNomenclatureModel()
+        grocery.name = "Бакалея"
+        self.start_service.groups_nomenclature["grocery"] = grocery
+        for key in ["sugar", "salt", "oatmeal"]:
+            self.start_service.nomenclatures[key].group_nomenclature = grocery
+
+    def tearDown(self):
+        if os.path.exists("test_data/oracle_balances_cache.json"):
+            os.remove("test_data/oracle_balances_cache.json")
+
+    # Генерация данных
+
+    def _generate_transactions(self, rng: random.Random, count: int) -> list:
+        """Транзакции за 60 дней, часть - ровно в полночь (граница дневных итогов)"""
+        nomenclatures = list(self.start_service.nomenclatures.values())
+        storages = list(self.start_service.storages.values())
+        units = [self.start_service.units_measure["gramm"], self.start_service.units_measure["kg"]]
+
+        result = []
+        for _ in range(count):
+            seconds = 0 if rng.random() < 0.2 else rng.randint(0, 86399)
+            result.append(TransactionModel(
+                date=self.base_date + timedelta(days=rng.randint(0, 59), seconds=seconds),
+                nomenclature=rng.choice(nomenclatures),
+                storage=rng.choice(storages),
+                quantity=rng.randint(1, 50),
+                unit_measurement=rng.choice(units),
+                transaction_type=rng.choice(["in", "out"])
+            ))
+
+        return result
+
+    def _random_case(self, rng: random.Random) -> dict:
+        """Случайные период, склад и фильтры"""
+        nomenclatures = list(self.start_service.nomenclatures.values())
+        storages = list(self.start_service.storages.values())
+        groups = list(self.start_service.groups_nomenclature.values())
+
+        start_date = self.base_date + timedelta(days=rng.randint(0, 50))
+        if rng.random() < 0.5:
+            start_date += timedelta(seconds=rng.randint(1, 86399))
+        end_date = start_date + timedelta(days=rng.randint(0, 20))
+        if rng.random() < 0.5:
+            end_date += timedelta(seconds=rng.randint(0, 86399))
+
+        filters = [
+            {"field_name": "nomenclature/id", "value": rng.choice(nomenclatures).id, "type": "EQUALS"},
+            {"field_name": "storage/id", "value": rng.choice(storages).id, "type": "EQUALS"},
+            {"field_name": "nomenclature/group_nomenclature/id", "value": rng.choice(groups).id, "type": "EQUALS"},
+            {"field_name": "transaction_type", "value": rng.choice(["in", "out"]), "type": "EQUALS"},
+            {"field_name": "quantity", "value": str(rng.randint(1, 50)), "type": "GREATER"}
+        ]
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "storage": rng.choice([None] + storages),
+            "filters": rng.sample(filters, rng.randint(0, 2))
+        }
+
+    def _install(self, transactions: list):
+        """Подменить хранилище транзакций (новый словарь - индексы и итоги перестроятся)"""
+        self.start_service.data[Repository.transaction_key] = {t.id: t for t in transactions}
+
+    # Эталонный расчет
+
+    @staticmethod
+    def _matches(transaction, case: dict) -> bool:
+        """Простая проверка склада и фильтров без прототипа"""
+        if case["storage"] is not None and transaction.storage.id != case["storage"].id:
+            return False
+
+        for filter_data in case["filters"]:
+            value = transaction
+            for part in filter_data["field_name"].split("/"):
+                value = getattr(value, part) if value is not None else None
+
+            if filter_data["type"] == "EQUALS" and str(value) != filter_data["value"]:
+                return False
+            if filter_data["type"] == "GREATER" and not float(value) > float(filter_data["value"]):
+                return False
+
+        return True
+
+    def _reference_turnovers(self, case: dict, opening_filtered: bool, opening_inclusive: bool = False) -> dict:
+        """
+        Эталонная ОСВ: id номенклатуры -> (начальный остаток, приход, расход, конечный остаток, количество).
+        opening_filtered - начальный остаток с учетом склада и фильтров (иначе по всем транзакциям),
+        opening_inclusive - начальный остаток включает транзакции ровно на дату начала
+        (устаревший движок учитывает их и в остатке, и в оборотах)
+        """
+        turnovers = {}
+        for transaction in self.start_service.transactions.values():
+            if case["start_date"] <= transaction.date <= case["end_date"] and self._matches(transaction, case):
+                values = turnovers.setdefault(transaction.nomenclature.id, [0, 0, 0])
+                values[0 if transaction.transaction_type == "in" else 1] += transaction.get_quantity_in_base_units()
+                values[2] += 1
+
+        opening = dict.fromkeys(turnovers, 0)
+        for transaction in self.start_service.transactions.values():
+            nom_id = transaction.nomenclature.id
+            if nom_id not in opening or transaction.date > case["start_date"]:
+                continue
+            if transaction.date == case["start_date"] and not opening_inclusive:
+                continue
+            if opening_filtered and not self._matches(transaction, case):
+                continue
+
+            quantity = transaction.get_quantity_in_base_units()
+            opening[nom_id] += quantity if transaction.transaction_type == "in" else -quantity
+
+        return {
+            nom_id: (opening[nom_id], income, outcome, opening[nom_id] + income - outcome, count)
+            for nom_id, (income, outcome, count) in turnovers.items()
+        }
+
+    def _reference_balances(self, case: dict) -> dict:
+        """Эталонные ненулевые остатки на конец периода с учетом склада"""
+        balances = {}
+        for transaction in self.start_service.transactions.values():
+            if transaction.date <= case["end_date"] and self._matches(transaction, {**case, "filters": []}):
+                quantity = transaction.get_quantity_in_base_units()
+                nom_id = transaction.nomenclature.id
+                balances[nom_id] = balances.get(nom_id, 0) + (
+                    quantity if transaction.transaction_type == "in" else -quantity
+                )
+
+        return {nom_id: balance for nom_id, balance in balances.items() if round(balance, 2) != 0}
+
+    # Движки
+
+    @staticmethod
+    def _filters(case: dict) -> list:
+        return [FilterDto.from_dict(filter_data) for filter_data in case["filters"]]
+
+    @staticmethod
+    def _storages(case: dict):
+        return [case["storage"]] if case["storage"] else None
+
+    @staticmethod
+    def _rows(rows: list) -> dict:
+        return {
+            row["nomenclature_id"]: (row["opening_balance"], row["income"], row["outcome"],
+                                     row["closing_balance"], row["transaction_count"])
+            for row in rows if row["transaction_count"] > 0
+        }
+
+    def _run_by_period(self, case: dict, granularity: PeriodType = PeriodType.DAY) -> dict:
+        periods = self.turnover_service.generate_turnover_report(
+            case["start_date"], case["end_date"], case["storage"], self._filters(case), granularity=granularity
+        )
+        # Строки периода есть только у номенклатур с движением: начальный остаток -
+        # из первой строки номенклатуры, конечный - из последней
+        first, last, totals = {}, {}, {}
+        for period in periods:
+            for row in period["data"]:
+                nom_id = row["nomenclature_id"]
+                first.setdefault(nom_id, row)
+                last[nom_id] = row
+                values = totals.setdefault(nom_id, [0, 0, 0])
+                values[0] += row["income"]
+                values[1] += row["outcome"]
+                values[2] += row["transaction_count"]
+
+        return {
+            nom_id: (first[nom_id]["opening_balance"], income, outcome, last[nom_id]["closing_balance"], count)
+            for nom_id, (income, outcome, count) in totals.items() if count > 0
+        }
+
+    def _run_old(self, case: dict) -> dict:
+        rows = self.turnover_service.generate_turnover_report_old(case["start_date"], case["end_date"], case["storage"])
+        return {
+            row["nomenclature_name"]["id"]: (row["opening_balance"], row["income"], row["outcome"],
+                                             row["closing_balance"], None)
+            for row in rows if row["income"] != 0 or row["outcome"] != 0
+        }
+
+    def _run_comparison(self, case: dict) -> dict:
+        period = (case["start_date"], case["end_date"])
+        rows = self.turnover_service.generate_comparison_report(period, [period], case["storage"])
+        return {
+            row["nomenclature_id"]: (row["base"]["opening_balance"], row["base"]["income"], row["base"]["outcome"],
+                                     row["base"]["closing_balance"], row["base"]["transaction_count"])
+            for row in rows if row["base"]["transaction_count"] > 0
+        }
+
+    def _run_balance_series(self, case: dict) -> dict:
+        # Последняя точка ряда совпадает с концом периода
+        series = self.balance_service.get_balance_series(case["end_date"] - timedelta(days=3), case["end_date"],
+                                                         PeriodType.DAY, self._storages(case))
+        return {row["nomenclature_id"]: row["balance"] for row in series[-1]["data"] if row["balance"] != 0}
+
+    @staticmethod
+    def _nonzero(balances: dict) -> dict:
+        return {nom_id: balance for nom_id, balance in balances.items() if round(balance, 2) != 0}
+
+    def _run_pivot(self, case: dict) -> dict:
+        report = self.balance_service.get_balance_pivot_report(case["end_date"], self._storages(case))
+        columns = [storage.name for storage in (self._storages(case) or self.start_service.storages.values())]
+
+        # Итоги строк и итоговая строка согласованы с ячейками
+        for row in report:
+            if abs(row["total"] - sum(row[column] for column in columns)) > 0.05:
+                raise AssertionError(f"итог строки {row['nomenclature_name']} не равен сумме ячеек")
+        for column in columns:
+            if abs(report[-1][column] - sum(row[column] for row in report[:-1])) > 0.05:
+                raise AssertionError(f"итог столбца {column} не равен сумме ячеек")
+
+        return self._nonzero({row["nomenclature_id"]: row["total"] for row in report[:-1]})
+
+    def _run_current(self, case: dict) -> dict:
+        differences = self.current_balance_service.check_consistency()
+        if differences:
+            raise AssertionError(f"расхождения таблицы текущих остатков: {differences[:3]}")
+
+        return {row["nomenclature_id"]: row["balance"]
+                for row in self.current_balance_service.get_current_balances_report(case["storage"])}
+
+    def _run_balance_index(self, case: dict) -> dict:
+        storages = self._storages(case) or list(self.start_service.storages.values())
+        return self._nonzero({
+            nomenclature.id: sum(self.transaction_service.get_balance(nomenclature, storage, case["end_date"])
+                                 for storage in storages)
+            for nomenclature in self.start_service.nomenclatures.values()
+        })
+
+    def _run_blocking_cache(self, case: dict) -> dict:
+        """
+        Остатки через кэш на дату блокировки - до и после изменения транзакции через TransactionService
+        """
+        settings = self.settings_manager.settings
+        blocking_date = settings.blocking_date
+        settings.blocking_date = case["start_date"] - timedelta(days=1)
+
+        def balances() -> dict:
+            return self._nonzero({
+                nom_id: data["balance"]
+                for nom_id, data in self.balance_service.calculate_balances_until_date(
+                    case["end_date"], case["storage"]).items()
+            })
+
+        try:
+            self.balance_service.calculate_turnovers_until_blocking_date()
+            message = self._compare(balances(), self._reference_balances(case))
+            if message:
+                raise AssertionError(f"до изменения: {message}")
+
+            # Изменение до даты блокировки - сохраненные на нее остатки должны пересчитаться
+            self.transaction_service.add_transaction(TransactionModel(
+                date=settings.blocking_date - timedelta(days=1),
+                nomenclature=self.start_service.nomenclatures["sugar"],
+                storage=case["storage"] or self.start_service.storages["main"],
+                quantity=7,
+                unit_measurement=self.start_service.units_measure["gramm"],
+                transaction_type="in"
+            ))
+            return balances()
+        finally:
+            settings.blocking_date = blocking_date
+            if os.path.exists(self.balance_service.balances_file):
+                os.remove(self.balance_service.balances_file)
+
+    def _turnover_engines(self) -> list:
+        """
+        Движки ОСВ: (имя, расчет, поддержка фильтров, начальный остаток с учетом фильтров,
+        начальный остаток включает дату начала)
+        """
+        service = self.turnover_service
+        return [
+            ("turnover", lambda case: self._rows(service.generate_turnover_report(
+                case["start_date"], case["end_date"], case["storage"], self._filters(case))), True, True, False),
+            ("turnover_iter", lambda case: self._rows(list(service.iter_turnover_report(
+                case["start_date"], case["end_date"], case["storage"], self._filters(case)))), True, True, False),
+            ("turnover_by_period", self._run_by_period, True, True, False),
+            ("turnover_by_week", lambda case: self._run_by_period(case, PeriodType.WEEK), True, True, False),
+            ("turnover_by_month", lambda case: self._run_by_period(case, PeriodType.MONTH), True, True, False),
+            ("turnover_old", self._run_old, False, True, True),
+            ("turnover_comparison", self._run_comparison, False, True, False)
+        ]
+
+    def _balance_engines(self) -> list:
+        """Движки остатков: (имя, расчет, текущие остатки - по всем транзакциям без даты расчета)"""
+        service = self.balance_service
+        return [
+            ("balances", lambda case: {
+                nom_id: data["balance"]
+                for nom_id, data in service.calculate_balances_until_date(case["end_date"], case["storage"]).items()
+                if round(data["balance"], 2) != 0
+            }, False),
+            ("balance_report", lambda case: {
+                row["nomenclature_id"]: row["balance"]
+                for row in service.get_balance_report(case["end_date"], case["storage"])
+                if row["balance"] != 0
+            }, False),
+            ("balance_series", self._run_balance_series, False),
+            ("balance_pivot", self._run_pivot, False),
+            ("balance_index", self._run_balance_index, False),
+            ("balance_blocking_cache", self._run_blocking_cache, False),
+            ("current_balances", self._run_current, True)
+        ]
+
+    def _balance_checks(self) -> list:
+        return [
+            (name, run, lambda case, current=current:
+                self._reference_balances({**case, "end_date": datetime.max} if current else case), False)
+            for name, run, current in self._balance_engines()
+        ]
+
+    # Сравнение и сжатие
+
+    @staticmethod
+    def _compare(actual: dict, expected: dict):
+        """Описание первого расхождения или None"""
+        for nom_id in set(actual.keys()) | set(expected.keys()):
+            if nom_id not in actual or nom_id not in expected:
+                return f"номенклатура {nom_id}: получено {actual.get(nom_id)}, ожидалось {expected.get(nom_id)}"
+
+            actual_values = actual[nom_id] if isinstance(actual[nom_id], tuple) else (actual[nom_id],)
+            expected_values = expected[nom_id] if isinstance(expected[nom_id], tuple) else (expected[nom_id],)
+            for actual_value, expected_value in zip(actual_values, expected_values):
+                if actual_value is not None and abs(actual_value - expected_value) > 0.01:
+                    return f"номенклатура {nom_id}: получено {actual[nom_id]}, ожидалось {expected[nom_id]}"
+
+        return None
+
+    def _mismatch(self, run, reference, case: dict, transactions: list):
+        """Прогнать движок и эталон на наборе транзакций"""
+        self._install(transactions)
+        try:
+            actual = run(case)
+        except Exception as e:
+            return f"исключение {e!r}"
+
+        return self._compare(actual, reference(case))
+
+    def _shrink(self, run, reference, case: dict, transactions: list) -> tuple:
+        """
+        Сжать расхождение: убрать лишние фильтры, склад и блоки транзакций
+        """
+        for filter_data in list(case["filters"]):
+            candidate = {**case, "filters": [f for f in case["filters"] if f is not filter_data]}
+            if self._mismatch(run, reference, candidate, transactions):
+                case = candidate
+
+        if case["storage"] is not None and self._mismatch(run, reference, {**case, "storage": None}, transactions):
+            case = {**case, "storage": None}
+
+        chunk = len(transactions) // 2
+        while chunk >= 1:
+            index = 0
+            while index < len(transactions):
+                candidate = transactions[:index] + transactions[index + chunk:]
+                if self._mismatch(run, reference, case, candidate):
+                    transactions = candidate
+                else:
+                    index += chunk
+            chunk //= 2
+
+        return case, transactions
+
+    def _describe(self, name: str, case_number: int, case: dict, transactions: list, message: str) -> str:
+        lines = [
+            f"Движок {name}, seed {self.seed}, случай {case_number}: {message}",
+            f"Период: {case['start_date'].isoformat()} - {case['end_date'].isoformat()}",
+            f"Склад: {case['storage'].name if case['storage'] else 'все'}",
+            f"Фильтры: {case['filters']}",
+            f"Транзакции ({len(transactions)}):"
+        ]
+        for t in transactions:
+            lines.append(f"  {t.date.isoformat()} {t.nomenclature.name} {t.storage.name} "
+                         f"{t.transaction_type} {t.quantity} {t.unit_measurement.name}")
+
+        return "\n".join(lines)
+
+    def _check_engines(self, engines: list, storage_scoped: bool = False):
+        rng = random.Random(self.seed)
+        storages = list(self.start_service.storages.values())
+
+        for case_number in range(self.cases):
+            transactions = self._generate_transactions(rng, rng.randint(20, 200))
+            case = self._random_case(rng)
+            if storage_scoped:
+                case["storage"] = rng.choice(storages)
+
+            for name, run, reference, supports_filters in engines:
+                engine_case = case if supports_filters else {**case, "filters": []}
+                message = self._mismatch(run, reference, engine_case, transactions)
+                if message is None:
+                    continue
+
+                small_case, small_transactions = self._shrink(run, reference, engine_case, transactions)
+                message = self._mismatch(run, reference, small_case, small_transactions)
+                self.fail(self._describe(name, case_number, small_case, small_transactions, message))
+
+    def _turnover_checks(self) -> list:
+        return [
+            (name, run, lambda case, filtered=opening_filtered, inclusive=opening_inclusive:
+                self._reference_turnovers(case, filtered, inclusive), filters)
+            for name, run, filters, opening_filtered, opening_inclusive in self._turnover_engines()
+        ]
+
+    def test_turnover_engines_match_reference(self):
+        # Подготовка
+        engines = self._turnover_checks()
+
+        # Действие и Проверка
+        self._check_engines(engines)
+
+    def test_turnover_engines_match_reference_by_storage(self):
+        # Подготовка
+        engines = self._turnover_checks()
+
+        # Действие и Проверка
+        self._check_engines(engines, storage_scoped=True)
+
+    def test_balance_engines_match_reference(self):
+        # Подготовка
+        engines = self._balance_checks()
+
+        # Действие и Проверка
+        self._check_engines(engines)
+
+    def test_balance_engines_match_reference_by_storage(self):
+        # Подготовка
+        engines = self._balance_checks()
+
+        # Действие и Проверка
+        self._check_engines(engines, storage_scoped=True)
+
+    def test_shrink_broken_engine_minimal_case(self):
+        # Подготовка
+        rng = random.Random(self.seed)
+        transactions = self._generate_transactions(rng, 150)
+        case = self._random_case(rng)
+        case["start_date"], case["end_date"] = self.base_date, self.base_date + timedelta(days=59)
+        reference = self._reference_balances
+
+        # Движок с ошибкой: при наличии расхода теряет все остатки
+        def broken(engine_case):
+            return {
+                nom_id: data["balance"]
+                for nom_id, data in self.balance_service.calculate_balances_until_date(
+                    engine_case["end_date"], engine_case["storage"]).items()
+                if data["balance"] != 0
+            } if not any(t.transaction_type == "out" for t in self.start_service.transactions.values()) else {}
+
+        # Действие
+        assert self._mismatch(broken, reference, case, transactions) is not None
+        small_case, small_transactions = self._shrink(broken, reference, case, transactions)
+
+        # Проверка
+        assert self._mismatch(broken, reference, small_case, small_transactions) is not None
+        assert small_case["filters"] == []
+        assert len(small_transactions) == 1
+        assert small_transactions[0].transaction_type == "out"
+
+
+if __name__ == '__main__':
+    unittest.main()
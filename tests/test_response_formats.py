@@ -10,6 +10,10 @@ from src.logics.response_csv import ResponseCsv
 from src.logics.response_markdown import ResponseMarkdown
 from src.logics.response_json import ResponseJson
 from src.logics.response_xml import ResponseXml
+from src.logics.response_json_lines import ResponseJsonLines
+from src.logics.turnover_report_service import TurnoverReportService
+from src.start_service import StartService
+from datetime import datetime
 
 
 class TestResponseFormats(unittest.TestCase):
@@ -216,6 +220,85 @@ class TestResponseFormats(unittest.TestCase):
         self.assertIn("соль", names)
         self.assertIn("пшеничная мука", full_names)
 
+    # Тесты для строк отчетов (словарей)
+    def test_all_formats_build_report_rows_columns_rendered(self):
+        """Тест вывода строк отчета (словарей) во всех форматах"""
+        # Подготовка
+        rows = [
+            {"nomenclature_name": "мука", "Основной склад": 100.0, "total": 100.0},
+            {"nomenclature_name": "Итого", "Основной склад": 100.0, "total": 100.0}
+        ]
+
+        # Действие
+        csv_result = ResponseCsv().build("csv", rows)
+        markdown_result = ResponseMarkdown().build("markdown", rows)
+        json_result = ResponseJson().build("json", rows)
+        xml_result = ResponseXml().build("xml", rows)
+
+        # Проверка
+        self.assertEqual(csv_result.split("\n")[0], "nomenclature_name;Основной склад;total")
+        self.assertIn("| мука | 100.0 | 100.0 |", markdown_result)
+        self.assertEqual(json_result, rows)
+        root = ET.fromstring(xml_result)
+        column = root.find("item").find("column")
+        self.assertEqual(column.get("name"), "Основной склад")
+        self.assertEqual(column.text, "100.0")
+
+    def test_xml_column_tags_cache_bounded(self):
+        """Тест кэша тегов колонок XML: имена колонок из данных не накапливаются без ограничения"""
+        # Подготовка
+        cache = ResponseXml._tags.cache_info()
+        rows = [{f"Склад {index}": float(index)} for index in range(cache.maxsize + 100)]
+
+        # Действие
+        root = ET.fromstring(ResponseXml().build("xml", rows))
+
+        # Проверка
+        self.assertLessEqual(ResponseXml._tags.cache_info().currsize, cache.maxsize)
+        self.assertEqual(root.findall("item")[-1].find("column").get("name"), f"Склад {len(rows) - 1}")
+
+
+    # Тесты потоковой выдачи
+    def test_csv_and_xml_stream_generator_same_as_build(self):
+        """Тест потоковой выдачи CSV и XML из генератора: результат совпадает с build"""
+        # Подготовка
+        rows = [{"nomenclature_name": name, "balance": float(index)} for index, name in enumerate(["мука", "сахар", "соль"])]
+
+        # Действие
+        csv_chunks = list(ResponseCsv().stream("csv", (row for row in rows)))
+        xml_chunks = list(ResponseXml().stream("xml", (row for row in rows)))
+
+        # Проверка
+        self.assertEqual(len(csv_chunks), 4)
+        self.assertEqual("".join(csv_chunks), ResponseCsv().build("csv", rows))
+        self.assertEqual("".join(xml_chunks), ResponseXml().build("xml", rows))
+        self.assertEqual(list(ResponseCsv().stream("csv", iter([]))), [])
+
+    def test_json_lines_stream_one_object_per_line(self):
+        """Тест формата JSON Lines: каждая строка - отдельный JSON объект"""
+        # Действие
+        chunks = list(ResponseJsonLines().stream("jsonl", iter(self.units_data)))
+
+        # Проверка
+        self.assertEqual(len(chunks), 3)
+        self.assertTrue(all(chunk.endswith("\n") for chunk in chunks))
+        self.assertEqual([json.loads(chunk)["name"] for chunk in chunks], ["грамм", "килограмм", "литр"])
+
+
+    def test_json_lines_uses_json_encoder(self):
+        """Тест JSON Lines: значения кодируются JsonEncoder, stream_chunks совпадает со stream"""
+        # Подготовка
+        rows = [{"nomenclature_name": "мука", "date": datetime(2025, 1, 1, 12, 30), "balance": 1.5}]
+        formatter = ResponseJsonLines()
+
+        # Действие
+        lines = list(formatter.stream("jsonl", iter(rows)))
+        chunks = list(formatter.stream_chunks("jsonl", iter(rows)))
+
+        # Проверка
+        self.assertEqual(lines, ['{"nomenclature_name":"мука","date":"2025-01-01T12:30:00","balance":1.5}\n'])
+        self.assertEqual(b"".join(chunks).decode("utf-8"), "".join(lines))
+
     # Тесты обработки ошибок
     def test_all_formats_handle_empty_data_gracefully(self):
         """Тест обработки пустых данных для всех форматов"""
@@ -250,4 +333,176 @@ class TestResponseFormats(unittest.TestCase):
                     self.assertGreater(len(result), 0)
                     self.assertIn("штука", result)
                 except Exception as e:
-                    self.fail(f"Формат {format_name} не смог обработать один элемент: {e}")
\ No newline at end of file
+                    self.fail(f"Формат {format_name} не смог обработать один элемент: {e}")
+
+    # Тесты потокового CSV
+    def test_csv_rfc4180_quoting(self):
+        """Тест экранирования CSV по RFC 4180: кавычки удваиваются, разделители и переносы в кавычках"""
+        # Подготовка
+        rows = [{"name": 'Мука "Экстра"', "note": "a;b", "text": "строка 1\nстрока 2", "plain": "соль"}]
+
+        # Действие
+        result = ResponseCsv().build("csv", rows)
+
+        # Проверка
+        self.assertEqual(result, 'name;note;text;plain\n"Мука ""Экстра""";"a;b";"строка 1\nстрока 2";соль\n')
+
+    def test_csv_models_references_by_name(self):
+        """Тест CSV по плану колонок модели: ссылки выводятся наименованием, пустые ссылки - пустым значением"""
+        # Подготовка
+        kilo = UnitMeasurement("килограмм", 1000, self.gram_unit)
+
+        # Действие
+        lines = ResponseCsv().build("csv", [self.gram_unit, kilo]).split("\n")
+
+        # Проверка
+        header = lines[0].split(";")
+        self.assertEqual(lines[1].split(";")[header.index("base_unit")], "")
+        self.assertEqual(lines[2].split(";")[header.index("base_unit")], "грамм")
+        self.assertEqual(lines[2].split(";")[header.index("coefficient")], "1000")
+
+    def test_stream_chunks_encoded_and_joined(self):
+        """Тест выдачи частями в байтах: шапка сразу, затем блоки, результат совпадает с build"""
+        # Подготовка
+        units = [UnitMeasurement(f"единица {index}", index + 1) for index in range(200)]
+
+        # Действие
+        small = list(ResponseCsv().stream_chunks("csv", iter(units), chunk_size=1024))
+        large = list(ResponseCsv().stream_chunks("csv", iter(units)))
+
+        # Проверка
+        expected = ResponseCsv().build("csv", units).encode("utf-8")
+        self.assertTrue(all(isinstance(chunk, bytes) for chunk in small))
+        self.assertGreater(len(small), 1)
+        self.assertEqual(len(large), 2)
+        self.assertEqual(large[0], expected.split(b"\n")[0] + b"\n")
+        self.assertEqual(b"".join(small), expected)
+        self.assertEqual(list(ResponseCsv().stream_chunks("csv", iter([]))), [])
+
+    # Тесты инкрементального XML
+    def test_xml_incremental_writer_escaping_and_empty_values(self):
+        """Тест XML: экранирование, пустые ссылки и недопустимые имена колонок"""
+        # Подготовка
+        kilo = UnitMeasurement("кило <&> \"грамм\"", 1000, self.gram_unit)
+        rows = [{"1 склад": "a < b", "empty": None}]
+
+        # Действие
+        units_root = ET.fromstring(ResponseXml().build("xml", [self.gram_unit, kilo]))
+        rows_root = ET.fromstring(ResponseXml().build("xml", rows))
+
+        # Проверка
+        items = units_root.findall("item")
+        self.assertIsNone(items[0].find("base_unit").text)
+        self.assertEqual(items[1].find("base_unit").text, "грамм")
+        self.assertEqual(items[1].find("name").text, "кило <&> \"грамм\"")
+        item = rows_root.find("item")
+        self.assertEqual(item.find("column").get("name"), "1 склад")
+        self.assertEqual(item.find("column").text, "a < b")
+        self.assertIsNone(item.find("empty").text)
+
+    def test_xml_stream_first_chunk_before_source_exhausted(self):
+        """Тест XML: первая часть выдается до чтения всего источника"""
+        # Подготовка
+        read = []
+
+        def source():
+            for unit in self.units_data:
+                read.append(unit)
+                yield unit
+
+        # Действие
+        chunks = ResponseXml().stream_chunks("xml", source())
+        first = next(chunks)
+
+        # Проверка
+        self.assertEqual(len(read), 1)
+        self.assertTrue(first.startswith(b"<data>"))
+        self.assertEqual(first + b"".join(chunks), ResponseXml().build("xml", self.units_data).encode("utf-8"))
+
+    # Тесты потокового Markdown
+    def test_markdown_stream_report_rows_and_escaping(self):
+        """Тест Markdown по строкам отчета: экранирование, пустые значения, совпадение с build"""
+        # Подготовка
+        rows = [
+            {"nomenclature_name": "мука | высший сорт", "balance": 1.5, "note": "строка 1\nстрока 2"},
+            {"nomenclature_name": "сахар", "balance": None, "note": ""}
+        ]
+
+        # Действие
+        chunks = list(ResponseMarkdown().stream("markdown", (row for row in rows)))
+
+        # Проверка
+        self.assertEqual(chunks, [
+            "| nomenclature_name | balance | note |\n",
+            "| --- | --- | --- |\n",
+            "| мука \\| высший сорт | 1.5 | строка 1 строка 2 |\n",
+            "| сахар |  |  |\n"
+        ])
+        self.assertEqual("".join(chunks), ResponseMarkdown().build("markdown", rows))
+        self.assertEqual(list(ResponseMarkdown().stream("markdown", iter([]))), [])
+
+    def test_stream_turnover_report_rows_references_by_name(self):
+        """Тест потоковой выдачи строк ОСВ (reference=full): вложенные ссылки выводятся наименованием"""
+        # Подготовка
+        start_service = StartService()
+        start_service.start()
+        service = TurnoverReportService(start_service)
+
+        def rows():
+            return service.iter_turnover_report(datetime(2000, 1, 1), datetime(2100, 1, 1))
+
+        names = sorted({row["nomenclature_name"]["name"] for row in rows()})
+
+        # Действие
+        csv_lines = "".join(ResponseCsv().stream("csv", rows())).splitlines()
+        markdown_lines = "".join(ResponseMarkdown().stream("markdown", rows())).splitlines()
+        root = ET.fromstring("".join(ResponseXml().stream("xml", rows())))
+
+        # Проверка
+        header = csv_lines[0].split(";")
+        self.assertIn("nomenclature_name", header)
+        self.assertIn("unit_measurement", header)
+        csv_names = sorted(line.split(";")[header.index("nomenclature_name")] for line in csv_lines[1:])
+        self.assertEqual(csv_names, names)
+        self.assertIn("грамм", csv_lines[1].split(";")[header.index("unit_measurement")])
+
+        self.assertIn("nomenclature_name", markdown_lines[0])
+        markdown_names = sorted(line.split(" | ")[header.index("nomenclature_name")].strip("| ")
+                                for line in markdown_lines[2:])
+        self.assertEqual(markdown_names, names)
+
+        xml_names = sorted(item.find("nomenclature_name").text for item in root.findall("item"))
+        self.assertEqual(xml_names, names)
+        self.assertIsNotNone(root.find("item").find("unit_measurement").text)
+
+    def test_markdown_align_width_from_bounded_sample(self):
+        """Тест выравнивания Markdown: ширина по выборке, источник читается не дальше выборки"""
+        # Подготовка
+        read = []
+        rows = [
+            {"name": "грамм", "coefficient": 1},
+            {"name": "килограмм", "coefficient": 1000},
+            {"name": "л", "coefficient": 1},
+            {"name": "очень длинное название", "coefficient": 1}
+        ]
+
+        def source():
+            for row in rows:
+                read.append(row)
+                yield row
+
+        response = ResponseMarkdown(align=True, sample_size=2)
+
+        # Действие
+        chunks = response.stream("markdown", source())
+        header = next(chunks)
+        read_before_rows = len(read)
+        lines = [header] + list(chunks)
+
+        # Проверка
+        self.assertEqual(read_before_rows, 2)
+        self.assertEqual(lines[0], "| name      | coefficient |\n")
+        self.assertEqual(lines[1], "| --------- | ----------- |\n")
+        self.assertEqual(lines[3], "| килограмм | 1000        |\n")
+        self.assertEqual(lines[4], "| л         | 1           |\n")
+        self.assertEqual(lines[5], "| очень длинное название | 1           |\n")
@@ -0,0 +1,48 @@
+import unittest
+
+from src.core.source_tracker import SourceTracker
+from src.start_service import StartService
+
+
+class TestSourceTracker(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка стартовых данных и отслеживания"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.tracker = SourceTracker(self.start_service)
+
+    def test_is_stale_not_built(self):
+        # Действие и Проверка
+        assert self.tracker.is_stale(len(self.start_service.transactions))
+        assert not self.tracker.is_built
+
+    def test_is_stale_marked_actual(self):
+        # Действие
+        self.tracker.mark()
+
+        # Проверка
+        assert not self.tracker.is_stale(len(self.start_service.transactions))
+        assert self.tracker.is_built
+
+    def test_is_stale_count_differs(self):
+        # Подготовка
+        self.tracker.mark()
+
+        # Действие и Проверка
+        assert self.tracker.is_stale(len(self.start_service.transactions) - 1)
+
+    def test_is_stale_invalidated(self):
+        # Подготовка
+        self.tracker.mark()
+
+        # Действие
+        self.tracker.invalidate()
+
+        # Проверка
+        assert self.tracker.is_stale(len(self.start_service.transactions))
+        assert not self.tracker.is_built
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 
+from src.core.event_type import EventType
+from src.core.validator import OperationException
 from src.models.group_nomenclature_model import GroupNomenclatureModel
 from src.models.nomenclature_model import NomenclatureModel
 from src.models.recipe_model import RecipeModel
@@ -246,6 +248,24 @@ class TestStartService(unittest.TestCase):
         assert isinstance(self.__start_service.recipes["cookies"], RecipeModel)
         assert len(self.__start_service.recipes["cookies"].ingredients) > 0
 
+    def test_delete_handlers_read_event_params_by_key(self):
+        """Проверка запрета удаления используемых справочников: параметры события - словарь"""
+        # Подготовка
+        service = StartService()
+        service.start()
+        storage = list(service.storages.values())[0]
+        unused_group = GroupNomenclatureModel()
+
+        # Действие и проверка
+        with self.assertRaises(OperationException):
+            service.handle(EventType.delete_storage_key(), {"storage": storage})
+        with self.assertRaises(OperationException):
+            service.handle(EventType.delete_unit_key(), {"unit": service.units_measure["gramm"]})
+        with self.assertRaises(OperationException):
+            service.handle(EventType.delete_nomenclature_key(), {"nomenclature": service.nomenclatures["sugar"]})
+
+        service.handle(EventType.delete_group_nomenclature_key(), {"group": unused_group})
+
     def test_start_service_start_all_data_populated(self):
         # Подготовка
         service = StartService()
@@ -0,0 +1,82 @@
+import unittest
+from datetime import datetime
+
+from src.core.prototype import Prototype
+from src.dtos.filter_dto import FilterDto
+from src.logics.transaction_index import TransactionIndex
+from src.logics.transaction_service import TransactionService
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.transaction_model import TransactionModel
+from src.start_service import StartService
+
+
+class TestTransactionIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка справочников, стартовых транзакций и сервисов"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.transaction_service = TransactionService(self.start_service)
+        self.transaction_index = TransactionIndex(self.start_service)
+
+        self.storage = self.start_service.storages["main"]
+        self.sugar = self.start_service.nomenclatures["sugar"]
+        self.gramm = self.start_service.units_measure["gramm"]
+
+    def test_split_filters_indexed_paths_pushed_down(self):
+        # Подготовка
+        group = GroupNomenclatureModel()
+        group.name = "Сладкое"
+        self.sugar.group_nomenclature = group
+        filters = [
+            FilterDto.from_dict({"field_name": "nomenclature/group_nomenclature/id", "value": group.id}),
+            FilterDto.from_dict({"field_name": "storage/id", "value": self.storage.id}),
+            FilterDto.from_dict({"field_name": "quantity", "value": "100", "type": "GREATER"}),
+            FilterDto.from_dict({"field_name": "nomenclature/id", "value": self.sugar.id, "type": "NOT_EQUAL"})
+        ]
+
+        # Действие
+        nomenclature_ids, storage_ids, residual = self.transaction_index.split_filters(filters)
+
+        # Проверка
+        assert nomenclature_ids == {self.sugar.id}
+        assert storage_ids == {self.storage.id}
+        assert residual == filters[2:]
+
+    def test_candidates_same_as_prototype_filter(self):
+        # Подготовка
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 100, self.gramm, "in")
+        self.start_service.transactions[transaction.id] = transaction
+        filters = [
+            FilterDto.from_dict({"field_name": "nomenclature/id", "value": self.sugar.id}),
+            FilterDto.from_dict({"field_name": "storage/id", "value": self.storage.id})
+        ]
+        expected = Prototype.filter(list(self.start_service.transactions.values()), filters)
+        nomenclature_ids, storage_ids, _ = self.transaction_index.split_filters(filters)
+
+        # Действие
+        result = self.transaction_index.candidates(nomenclature_ids, storage_ids)
+
+        # Проверка
+        assert len(result) > 0
+        assert {t.id for t in result} == {t.id for t in expected}
+
+    def test_candidates_transactions_changed_index_updated(self):
+        # Подготовка
+        self.transaction_index.candidates({self.sugar.id})
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 250, self.gramm, "in")
+        oatmeal = self.start_service.nomenclatures["oatmeal"]
+
+        # Действие
+        self.transaction_service.add_transaction(transaction)
+        added = self.transaction_index.candidates({self.sugar.id})
+        self.transaction_service.update_transaction(transaction.id, {"nomenclature": oatmeal}, allow_negative=True)
+
+        # Проверка
+        assert transaction.id in {t.id for t in added}
+        assert transaction.id not in {t.id for t in self.transaction_index.candidates({self.sugar.id})}
+        assert transaction.id in {t.id for t in self.transaction_index.candidates({oatmeal.id})}
+
+
+if __name__ == '__main__':
+    unittest.main()
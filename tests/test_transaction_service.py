@@ -0,0 +1,162 @@
+import unittest
+from datetime import datetime, timedelta
+
+from src.core.validator import OperationException
+from src.logics.transaction_service import TransactionService
+from src.models.transaction_model import TransactionModel
+from src.start_service import StartService
+
+
+class TestTransactionService(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка справочников без случайных транзакций"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.start_service.transactions.clear()
+        self.transaction_service = TransactionService(self.start_service)
+
+        self.storage = self.start_service.storages["main"]
+        self.sugar = self.start_service.nomenclatures["sugar"]
+        self.butter = self.start_service.nomenclatures["butter"]
+        self.gramm = self.start_service.units_measure["gramm"]
+        self.date = datetime.now() - timedelta(days=1)
+
+        for nomenclature in [self.sugar, self.butter]:
+            self.transaction_service.add_transaction(TransactionModel(
+                self.date - timedelta(days=1), nomenclature, self.storage, 100, self.gramm, "in"
+            ))
+
+    def test_write_off_enough_balance_transactions_written(self):
+        # Подготовка
+        items = [
+            {"nomenclature": self.sugar, "quantity": 60},
+            {"nomenclature": self.butter, "quantity": 100}
+        ]
+
+        # Действие
+        result = self.transaction_service.write_off(self.date, self.storage, items)
+
+        # Проверка
+        assert len(result) == 2
+        assert len(self.start_service.transactions) == 4
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == 40
+        assert self.transaction_service.get_balance(self.butter, self.storage, self.date) == 0
+
+    def test_write_off_not_enough_balance_nothing_written(self):
+        # Подготовка
+        items = [
+            {"nomenclature": self.sugar, "quantity": 60},
+            {"nomenclature": self.butter, "quantity": 150}
+        ]
+
+        # Действие и Проверка
+        with self.assertRaises(OperationException):
+            self.transaction_service.write_off(self.date, self.storage, items)
+
+        assert len(self.start_service.transactions) == 2
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == 100
+
+    def test_write_off_same_nomenclature_twice_quantities_summed(self):
+        # Подготовка
+        items = [
+            {"nomenclature": self.sugar, "quantity": 60},
+            {"nomenclature": self.sugar, "quantity": 60}
+        ]
+
+        # Действие и Проверка
+        with self.assertRaises(OperationException):
+            self.transaction_service.write_off(self.date, self.storage, items)
+
+    def test_write_off_allow_negative_balance_becomes_negative(self):
+        # Подготовка
+        items = [{"nomenclature": self.sugar, "quantity": 150}]
+
+        # Действие
+        self.transaction_service.write_off(self.date, self.storage, items, allow_negative=True)
+
+        # Проверка
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == -50
+
+    def test_add_transaction_back_dated_write_off_later_balance_protected(self):
+        # Подготовка
+        self.transaction_service.write_off(self.date, self.storage, [{"nomenclature": self.sugar, "quantity": 80}])
+        back_dated = TransactionModel(
+            self.date - timedelta(hours=1), self.sugar, self.storage, 50, self.gramm, "out"
+        )
+
+        # Действие и Проверка
+        # На дату списания остаток 100, но позже он уже уменьшен до 20
+        with self.assertRaises(OperationException):
+            self.transaction_service.add_transaction(back_dated)
+
+    def test_get_balance_transactions_added_directly_index_rebuilt(self):
+        # Подготовка
+        direct = TransactionModel(self.date, self.sugar, self.storage, 25, self.gramm, "in")
+
+        # Действие
+        self.start_service.transactions[direct.id] = direct
+
+        # Проверка
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == 125
+
+
+    def test_update_transaction_write_off_increased_beyond_balance_rejected(self):
+        # Подготовка
+        transaction = self.transaction_service.write_off(
+            self.date, self.storage, [{"nomenclature": self.sugar, "quantity": 80}]
+        )[0]
+
+        # Действие и Проверка
+        with self.assertRaises(OperationException):
+            self.transaction_service.update_transaction(transaction.id, {"quantity": 120})
+
+        assert transaction.quantity == 80
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == 20
+
+    def test_delete_transaction_balance_restored(self):
+        # Подготовка
+        transaction = self.transaction_service.write_off(
+            self.date, self.storage, [{"nomenclature": self.sugar, "quantity": 80}]
+        )[0]
+
+        # Действие
+        self.transaction_service.delete_transaction(transaction.id)
+
+        # Проверка
+        assert transaction.id not in self.start_service.transactions
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == 100
+
+    def test_update_transaction_income_decreased_below_later_write_off_rejected(self):
+        # Подготовка
+        self.transaction_service.write_off(self.date, self.storage, [{"nomenclature": self.sugar, "quantity": 80}])
+        income = next(t for t in self.start_service.transactions.values()
+                      if t.nomenclature is self.sugar and t.transaction_type == "in")
+
+        # Действие и Проверка
+        with self.assertRaises(OperationException):
+            self.transaction_service.update_transaction(income.id, {"quantity": 50})
+
+        assert income.quantity == 100
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == 20
+
+    def test_delete_transaction_income_with_later_write_off_rejected(self):
+        # Подготовка
+        self.transaction_service.write_off(self.date, self.storage, [{"nomenclature": self.sugar, "quantity": 80}])
+        income = next(t for t in self.start_service.transactions.values()
+                      if t.nomenclature is self.sugar and t.transaction_type == "in")
+
+        # Действие и Проверка
+        with self.assertRaises(OperationException):
+            self.transaction_service.delete_transaction(income.id)
+
+        assert income.id in self.start_service.transactions
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == 20
+
+        # Удаление "под сальдо" разрешено
+        self.transaction_service.delete_transaction(income.id, allow_negative=True)
+        assert self.transaction_service.get_balance(self.sugar, self.storage, self.date) == -80
+
+
+if __name__ == '__main__':
+    unittest.main()
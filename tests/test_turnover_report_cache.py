@@ -0,0 +1,109 @@
+import unittest
+from datetime import datetime, timedelta
+
+from src.dtos.filter_dto import FilterDto
+from src.logics.transaction_service import TransactionService
+from src.logics.turnover_report_cache import TurnoverReportCache
+from src.logics.turnover_report_service import TurnoverReportService
+from src.models.transaction_model import TransactionModel
+from src.start_service import StartService
+
+
+class TestTurnoverReportCache(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка справочников, стартовых транзакций и сервисов"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.turnover_service = TurnoverReportService(self.start_service)
+        self.transaction_service = TransactionService(self.start_service)
+
+        self.storage = self.start_service.storages["main"]
+        self.sugar = self.start_service.nomenclatures["sugar"]
+        self.gramm = self.start_service.units_measure["gramm"]
+
+        self.end_date = datetime.now() - timedelta(days=10)
+        self.start_date = self.end_date - timedelta(days=20)
+
+    def test_generate_turnover_report_same_request_taken_from_cache(self):
+        # Подготовка
+        first = self.turnover_service.generate_turnover_report(self.start_date, self.end_date)
+
+        # Действие
+        second = self.turnover_service.generate_turnover_report(self.start_date, self.end_date)
+
+        # Проверка
+        assert second == first
+        assert second is not first
+        assert self.turnover_service.report_cache.hits == 1
+        assert len(self.turnover_service.report_cache) == 1
+
+    def test_make_key_filters_order_does_not_matter(self):
+        # Подготовка
+        first = FilterDto.from_dict({"field_name": "nomenclature/name", "value": "sugar", "type": "EQUALS"})
+        second = FilterDto.from_dict({"field_name": "storage/name", "value": "main", "type": "LIKE"})
+
+        # Действие
+        key1 = TurnoverReportCache.make_key(self.start_date, self.end_date, filters=[first, second])
+        key2 = TurnoverReportCache.make_key(self.start_date, self.end_date, filters=[second, first])
+
+        # Проверка
+        assert key1 == key2
+
+    def test_add_transaction_after_period_cache_kept(self):
+        # Подготовка
+        self.turnover_service.generate_turnover_report(self.start_date, self.end_date)
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 100, self.gramm, "in")
+
+        # Действие
+        self.transaction_service.add_transaction(transaction)
+
+        # Проверка
+        assert len(self.turnover_service.report_cache) == 1
+
+    def test_add_transaction_inside_period_cache_invalidated(self):
+        # Подготовка
+        before = self.turnover_service.generate_turnover_report(self.start_date, self.end_date)
+        transaction = TransactionModel(self.end_date - timedelta(days=1), self.sugar, self.storage, 100, self.gramm, "in")
+
+        # Действие
+        self.transaction_service.add_transaction(transaction)
+        after = self.turnover_service.generate_turnover_report(self.start_date, self.end_date)
+
+        # Проверка
+        assert self.turnover_service.report_cache.hits == 0
+        row_before = next((r for r in before if r["nomenclature_id"] == self.sugar.id), {"income": 0})
+        row_after = next(r for r in after if r["nomenclature_id"] == self.sugar.id)
+        assert round(row_after["income"] - row_before["income"], 2) == 100
+
+    def test_put_more_than_max_entries_least_recently_used_evicted(self):
+        # Подготовка
+        cache = TurnoverReportCache(self.start_service, max_entries=2)
+        keys = [TurnoverReportCache.make_key(self.start_date - timedelta(days=i), self.end_date) for i in range(3)]
+        cache.put(keys[0], [{"nomenclature_id": "a"}])
+        cache.put(keys[1], [{"nomenclature_id": "b"}])
+        cache.get(keys[0])
+
+        # Действие
+        cache.put(keys[2], [{"nomenclature_id": "c"}])
+
+        # Проверка
+        assert len(cache) == 2
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+
+    def test_put_report_larger_than_memory_cap_not_stored(self):
+        # Подготовка
+        cache = TurnoverReportCache(self.start_service, max_bytes=64)
+        key = TurnoverReportCache.make_key(self.start_date, self.end_date)
+
+        # Действие
+        cache.put(key, [{"nomenclature_id": "x" * 100}])
+
+        # Проверка
+        assert len(cache) == 0
+        assert cache.size == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
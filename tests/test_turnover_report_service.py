@@ -1,9 +1,14 @@
+import types
 import unittest
 from datetime import datetime, timedelta
 from src.logics.turnover_report_service import TurnoverReportService
 from src.start_service import StartService
 from src.models.storage_model import StorageModel
 from src.core.validator import Validator, ArgumentException
+from src.models.period_type import PeriodType
+from src.models.reference_mode import ReferenceMode
+from src.core.prototype import Prototype
+from src.dtos.filter_dto import FilterDto
 
 class TestTurnoverReportService(unittest.TestCase):
 
@@ -140,4 +145,251 @@ class TestTurnoverReportService(unittest.TestCase):
         assert isinstance(income, (int, float))
         assert isinstance(outcome, (int, float))
         assert income >= 0
-        assert outcome >= 0
\ No newline at end of file
+        assert outcome >= 0
+
+    def test_generate_turnover_report_week_granularity_closing_carried_forward(self):
+        """Проверка разбивки ОСВ по неделям: конечный остаток переносится в следующий период"""
+        # Подготовка
+        start_date = datetime.now() - timedelta(days=30)
+        end_date = datetime.now()
+
+        # Действие
+        result = self.turnover_service.generate_turnover_report(start_date, end_date, granularity=PeriodType.WEEK)
+
+        # Проверка
+        assert len(result) == 5
+        assert result[0]["start_date"] == start_date.isoformat()
+        assert result[-1]["end_date"] == end_date.isoformat()
+
+        for previous, current in zip(result, result[1:]):
+            assert previous["end_date"] == current["start_date"]
+
+        # Номенклатура без движения в периоде не выводится - остаток переносится
+        # с последнего периода, где она была
+        closing = {}
+        for period in result:
+            for row in period["data"]:
+                if row["nomenclature_id"] in closing:
+                    assert abs(row["opening_balance"] - closing[row["nomenclature_id"]]) < 0.05
+                closing[row["nomenclature_id"]] = row["closing_balance"]
+
+    def test_generate_turnover_report_granularity_rows_match_flat_report(self):
+        """Проверка единого правила строк: в периоде разбивки те же номенклатуры, что и в ОСВ за этот период"""
+        # Подготовка
+        start_date = datetime.now() - timedelta(days=30)
+        end_date = datetime.now()
+
+        # Действие
+        result = self.turnover_service.generate_turnover_report(start_date, end_date, granularity=PeriodType.WEEK)
+
+        # Проверка
+        for period in result:
+            flat = self.turnover_service.generate_turnover_report(
+                datetime.fromisoformat(period["start_date"]), datetime.fromisoformat(period["end_date"])
+            )
+            rows = {row["nomenclature_id"] for row in period["data"]}
+            assert all(row["transaction_count"] > 0 for row in period["data"])
+            assert rows <= {row["nomenclature_id"] for row in flat}
+
+    def test_generate_turnover_report_granularity_totals_match_flat_report(self):
+        """Проверка совпадения сумм оборотов по периодам с ОСВ за весь период"""
+        # Подготовка
+        start_date = datetime.now() - timedelta(days=30)
+        end_date = datetime.now()
+        flat = self.turnover_service.generate_turnover_report(start_date, end_date)
+
+        # Действие
+        result = self.turnover_service.generate_turnover_report(start_date, end_date, granularity=PeriodType.DAY)
+
+        # Проверка
+        assert len(result) == 31
+        for row in flat:
+            rows = [r for period in result for r in period["data"] if r["nomenclature_id"] == row["nomenclature_id"]]
+            assert abs(sum(r["income"] for r in rows) - row["income"]) < 0.5
+            assert abs(sum(r["outcome"] for r in rows) - row["outcome"]) < 0.5
+            assert sum(r["transaction_count"] for r in rows) == row["transaction_count"]
+            assert abs(rows[-1]["closing_balance"] - row["closing_balance"]) < 0.05
+
+    def test_iter_turnover_report_rows_generated_same_as_report(self):
+        """Проверка построчной выдачи ОСВ генератором"""
+        # Подготовка
+        start_date = datetime.now() - timedelta(days=30)
+        end_date = datetime.now()
+        expected = self.turnover_service.generate_turnover_report(start_date, end_date)
+
+        # Действие
+        result = self.turnover_service.iter_turnover_report(start_date, end_date)
+
+        # Проверка
+        assert isinstance(result, types.GeneratorType)
+        assert list(result) == expected
+
+    def test_generate_turnover_report_fields_and_reference_name_projected(self):
+        """Проверка набора полей и вывода ссылок наименованием"""
+        # Подготовка
+        start_date = datetime.now() - timedelta(days=30)
+        end_date = datetime.now()
+
+        # Действие
+        result = self.turnover_service.generate_turnover_report(
+            start_date, end_date, fields=["nomenclature_name", "unit_measurement", "closing_balance"],
+            reference_mode=ReferenceMode.NAME
+        )
+
+        # Проверка
+        assert len(result) > 0
+        for row in result:
+            assert set(row.keys()) == {"nomenclature_name", "unit_measurement", "closing_balance"}
+            assert isinstance(row["nomenclature_name"], str)
+        assert result[0]["unit_measurement"] == "грамм"
+
+    def test_generate_comparison_report_base_matches_turnover_report(self):
+        """Проверка совпадения базового периода сравнительной ОСВ с обычной ОСВ"""
+        # Подготовка
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=15)
+        expected = {row["nomenclature_id"]: row for row in
+                    self.turnover_service.generate_turnover_report(start_date, end_date)}
+
+        # Действие
+        result = self.turnover_service.generate_comparison_report(
+            (start_date, end_date), [(start_date - timedelta(days=15), start_date)]
+        )
+
+        # Проверка
+        assert len(result) > 0
+        for row in result:
+            if row["base"]["transaction_count"] == 0:
+                continue
+            flat = expected[row["nomenclature_id"]]
+            for field in ["opening_balance", "income", "outcome", "closing_balance", "transaction_count"]:
+                assert abs(row["base"][field] - flat[field]) < 0.05
+
+    def test_generate_comparison_report_storage_matches_turnover_report(self):
+        """Проверка сравнительной ОСВ по складу: каждый период совпадает с обычной ОСВ по складу"""
+        # Подготовка
+        storage = list(self.start_service.storages.values())[0]
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=15)
+        periods = [(start_date, end_date), (start_date - timedelta(days=15), start_date)]
+
+        # Действие
+        result = self.turnover_service.generate_comparison_report(periods[0], periods[1:], storage)
+
+        # Проверка
+        for index, (period_start, period_end) in enumerate(periods):
+            expected = {row["nomenclature_id"]: row for row in
+                        self.turnover_service.generate_turnover_report(period_start, period_end, storage)}
+            for row in result:
+                figures = row["base"] if index == 0 else row["comparisons"][index - 1]
+                if figures["transaction_count"] == 0:
+                    assert row["nomenclature_id"] not in expected
+                    continue
+                flat = expected[row["nomenclature_id"]]
+                for field in ["opening_balance", "income", "outcome", "closing_balance", "transaction_count"]:
+                    assert abs(figures[field] - flat[field]) < 0.05
+
+    def test_generate_comparison_report_overlapping_periods_match_turnover_report(self):
+        """Проверка пересекающихся и вложенных периодов: общий проход по границам дает итоги каждого периода"""
+        # Подготовка
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=20)
+        periods = [(start_date, end_date),
+                   (start_date - timedelta(days=10), start_date + timedelta(days=5)),
+                   (start_date + timedelta(days=3), end_date - timedelta(days=7))]
+
+        # Действие
+        result = self.turnover_service.generate_comparison_report(periods[0], periods[1:])
+
+        # Проверка
+        assert len(result) > 0
+        for index, (period_start, period_end) in enumerate(periods):
+            expected = {row["nomenclature_id"]: row for row in
+                        self.turnover_service.generate_turnover_report(period_start, period_end)}
+            for row in result:
+                figures = row["base"] if index == 0 else row["comparisons"][index - 1]
+                if figures["transaction_count"] == 0:
+                    assert row["nomenclature_id"] not in expected
+                    continue
+                flat = expected[row["nomenclature_id"]]
+                for field in ["opening_balance", "income", "outcome", "closing_balance", "transaction_count"]:
+                    assert abs(figures[field] - flat[field]) < 0.05
+
+    def test_generate_comparison_report_delta_and_percent(self):
+        """Проверка расчета разницы и процента изменения относительно периода сравнения"""
+        # Подготовка
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=10)
+        periods = [(start_date - timedelta(days=10), start_date), (start_date - timedelta(days=20), start_date)]
+
+        # Действие
+        result = self.turnover_service.generate_comparison_report((start_date, end_date), periods)
+
+        # Проверка
+        assert len(result) > 0
+        for row in result:
+            assert len(row["comparisons"]) == 2
+            for comparison in row["comparisons"]:
+                for field in ["income", "outcome", "closing_balance"]:
+                    assert abs(comparison["delta"][field] - (row["base"][field] - comparison[field])) < 0.05
+                    if comparison[field]:
+                        expected = comparison["delta"][field] / abs(comparison[field]) * 100
+                        assert abs(comparison["change_percent"][field] - expected) < 1
+                    else:
+                        assert comparison["change_percent"][field] is None
+
+    def test_generate_comparison_report_without_comparisons_fail(self):
+        """Проверка ошибки при отсутствии периодов сравнения"""
+        # Подготовка
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=10)
+
+        # Действие и Проверка
+        with self.assertRaises(ArgumentException):
+            self.turnover_service.generate_comparison_report((start_date, end_date), [])
+
+    def test_generate_turnover_report_indexed_filters_same_as_full_scan(self):
+        """Проверка ОСВ с фильтрами по индексируемым путям против фильтрации всех транзакций"""
+        # Подготовка
+        start_date = datetime.now() - timedelta(days=30)
+        end_date = datetime.now()
+        group = self.start_service.nomenclatures["sugar"].group_nomenclature
+        storage = self.start_service.storages["main"]
+        indexed = [
+            FilterDto.from_dict({"field_name": "nomenclature/group_nomenclature/id", "value": group.id}),
+            FilterDto.from_dict({"field_name": "storage/id", "value": storage.id})
+        ]
+        residual = [FilterDto.from_dict({"field_name": "quantity", "value": "0", "type": "GREATER"})]
+
+        # Полный перебор: склад и фильтры применяются и к оборотам, и к начальному остатку
+        transactions = Prototype.filter(list(self.start_service.transactions.values()), indexed + residual)
+        totals = {}
+        for transaction in transactions:
+            if transaction.date > end_date:
+                continue
+            values = totals.setdefault(transaction.nomenclature.id, [0, 0, 0, 0])
+            quantity = transaction.get_quantity_in_base_units()
+            if transaction.date < start_date:
+                values[0] += quantity if transaction.transaction_type == "in" else -quantity
+            else:
+                values[1 if transaction.transaction_type == "in" else 2] += quantity
+                values[3] += 1
+        expected = [
+            {"nomenclature_id": nom_id, "opening_balance": opening, "income": income, "outcome": outcome,
+             "closing_balance": opening + income - outcome, "transaction_count": count}
+            for nom_id, (opening, income, outcome, count) in totals.items() if count > 0
+        ]
+
+        # Действие
+        result = self.turnover_service.generate_turnover_report(start_date, end_date, filters=indexed)
+        result_with_residual = self.turnover_service.generate_turnover_report(start_date, end_date,
+                                                                              filters=indexed + residual)
+
+        # Проверка
+        assert len(expected) > 0
+        for report in (result, result_with_residual):
+            rows = {row["nomenclature_id"]: row for row in report}
+            assert set(rows.keys()) == {row["nomenclature_id"] for row in expected}
+            for row in expected:
+                for field in ["opening_balance", "income", "outcome", "closing_balance", "transaction_count"]:
+                    assert abs(rows[row["nomenclature_id"]][field] - row[field]) < 0.05
@@ -0,0 +1,90 @@
+import unittest
+from datetime import datetime
+
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.validator import ArgumentException
+from src.logics.reference_service import ReferenceService
+from src.logics.unit_conversion_service import UnitConversionService
+from src.models.transaction_model import TransactionModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.start_service import StartService
+
+
+class TestUnitConversionService(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка справочников и цепочки тонна -> кг -> грамм"""
+        self.start_service = StartService()
+        self.start_service.start()
+        self.start_service.transactions.clear()
+        self.reference_service = ReferenceService(self.start_service)
+        self.conversion_service = UnitConversionService(self.start_service)
+        self.conversion_service.invalidate()
+
+        self.gramm = self.start_service.units_measure["gramm"]
+        self.kg = self.start_service.units_measure["kg"]
+        self.tonne = UnitMeasurement("тонна", 1000, self.kg)
+        self.start_service.units_measure["tonne"] = self.tonne
+
+        self.storage = self.start_service.storages["main"]
+        self.sugar = self.start_service.nomenclatures["sugar"]
+
+    def test_to_base_unit_chain_transitive_coefficient(self):
+        # Действие
+        result = self.conversion_service.to_base(2, self.tonne)
+
+        # Проверка
+        assert result == 2000000
+        assert self.conversion_service.resolve(self.tonne) == (self.gramm, 1000000)
+
+    def test_convert_compatible_units_converted(self):
+        # Действие
+        result = self.conversion_service.convert(1.5, self.tonne, self.kg)
+
+        # Проверка
+        assert result == 1500
+
+    def test_convert_incompatible_units_throws_argument_exception(self):
+        # Подготовка
+        piece = UnitMeasurement("штука", 1)
+
+        # Действие & Проверка
+        assert not self.conversion_service.is_compatible(piece, self.kg)
+        with self.assertRaises(ArgumentException):
+            self.conversion_service.convert(1, piece, self.kg)
+
+    def test_get_quantity_in_base_units_transaction_in_tonnes_full_chain_applied(self):
+        # Подготовка
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 1, self.tonne, "in")
+
+        # Действие
+        self.conversion_service.precompute(transaction)
+
+        # Проверка
+        assert transaction.get_quantity_in_base_units() == 1000000
+
+    def test_change_unit_event_cache_and_transactions_recalculated(self):
+        # Подготовка
+        transaction = TransactionModel(datetime.now(), self.sugar, self.storage, 1, self.tonne, "in")
+        self.start_service.transactions[transaction.id] = transaction
+        self.conversion_service.precompute(transaction)
+        self.tonne.coefficient = 500
+
+        # Действие
+        ObserveService.create_event(EventType.change_unit_key(), {"unit": self.tonne})
+
+        # Проверка
+        assert self.conversion_service.to_base(1, self.tonne) == 500000
+        assert transaction.get_quantity_in_base_units() == 500000
+
+    def test_update_unit_cyclic_base_unit_throws_argument_exception(self):
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            self.reference_service.update_reference_item("units", self.gramm.id, {"base_unit_id": self.tonne.id})
+
+        assert self.gramm.base_unit is None
+
+
+if __name__ == '__main__':
+    unittest.main()
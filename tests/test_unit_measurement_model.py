@@ -1,6 +1,6 @@
 import unittest
 
-from src.core.validator import ArgumentException
+from src.core.validator import ArgumentException, OperationException
 from src.models.unit_measurement_model import UnitMeasurement
 
 
@@ -59,4 +59,28 @@ class TestUnitMeasurementModel(unittest.TestCase):
         
         # Действие & Проверка
         with self.assertRaises(ArgumentException):
-            base_unit.base_unit = "123"
\ No newline at end of file
+            base_unit.base_unit = "123"
+
+    def test_resolve_base_unit_chain_coefficients_multiplied(self):
+        # Подготовка
+        gramm = UnitMeasurement("грамм", 1)
+        kg = UnitMeasurement("кг", 1000, gramm)
+        tonne = UnitMeasurement("тонна", 1000, kg)
+
+        # Действие
+        root, coefficient = tonne.resolve_base()
+
+        # Проверка
+        assert root == gramm
+        assert coefficient == 1000000
+        assert gramm.resolve_base() == (gramm, 1)
+
+    def test_resolve_base_cyclic_chain_throws_operation_exception(self):
+        # Подготовка
+        first = UnitMeasurement("первая", 10)
+        second = UnitMeasurement("вторая", 10, first)
+        first.base_unit = second
+
+        # Действие & Проверка
+        with self.assertRaises(OperationException):
+            first.resolve_base()